@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark ClauseIndex indexing and search latency
+
+Indexes synthetic reports (see benchmarks/report_formats.py) and times typical
+searches: selective text queries, text queries matching most clauses, text
+queries within one document, and filters without a text query. Each search is
+repeated and the best and median latencies are reported.
+
+Usage:
+    python -m benchmarks.clause_index --reports 1000 --clauses 40
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from benchmarks.report_formats import build_reports
+from src.clause_index import ClauseIndex
+
+# (label, search arguments); {ref} is a reference number taken from the corpus, so it matches few clauses
+SEARCHES = [
+    ("selective term", {"query": "{ref}"}),
+    ("selective term, risky", {"query": "{ref}", "risky": True}),
+    ("common term", {"query": "terminate"}),
+    ("common term, risky", {"query": "terminate", "risky": True}),
+    ("phrase words", {"query": "confidential information"}),
+    ("prefix", {"query": "insur*"}),
+    ("term within a document", {"query": "terminate", "document": "contract_00042.pdf"}),
+    ("risky, newest first", {"risky": True}),
+    ("analyzed since", {"since": 0.0, "risky": True}),
+    ("one document", {"document": "contract_00042.pdf"}),
+]
+
+
+def time_search(index: ClauseIndex, repeat: int, **kwargs: Any) -> Dict[str, Any]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        hits = index.search(**kwargs)
+        timings.append(time.perf_counter() - start)
+    return {
+        "hits": len(hits),
+        "best_ms": round(min(timings) * 1000, 3),
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=1000, help="Reports to index")
+    parser.add_argument("--clauses", type=int, default=40, help="Clauses per report")
+    parser.add_argument("--shared", type=float, default=0.3, help="Fraction of standard clauses")
+    parser.add_argument("--limit", type=int, default=20, help="Results per search")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs of each search")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="clause_index_benchmark.json", help="JSON results file")
+    args = parser.parse_args()
+
+    reports = build_reports(args.reports, args.clauses, args.shared, args.seed)
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        index = ClauseIndex(os.path.join(tmp_dir, "clause_index.sqlite3"))
+        start = time.perf_counter()
+        for number, (name, report) in enumerate(reports.items()):
+            index.add_report(name, report, analyzed_at=1_700_000_000 + number * 60)
+        index_seconds = time.perf_counter() - start
+        stats = index.stats()
+        print(f"⏱️  Indexed {stats['documents']} reports, {stats['clauses']} clauses in {index_seconds:.2f}s "
+              f"({os.path.getsize(index.path) / 2**20:.1f} MiB)")
+
+        print(f"\n{'search':<28}{'hits':>6}{'best':>11}{'median':>11}")
+        print("=" * 56)
+        ref = re.search(r"Ref (\d+)", str(next(iter(reports.values())).clauses[-1].clause)).group(1)
+        for label, kwargs in SEARCHES:
+            kwargs = {key: value.format(ref=ref) if isinstance(value, str) else value for key, value in kwargs.items()}
+            row = {"search": label, **time_search(index, args.repeat, limit=args.limit, **kwargs)}
+            results.append(row)
+            print(f"{label:<28}{row['hits']:>6}{row['best_ms']:>9.2f}ms{row['median_ms']:>9.2f}ms")
+        index.close()
+
+    output = {
+        "benchmark": "clause_index",
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "index_seconds": round(index_seconds, 3),
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2)
+    print(f"\n💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark ClauseSplitter on multi-megabyte synthetic contracts
+
+Compares the current single-scan splitter with the original implementation
+(one re.split per numbering pattern, a loop of header/footer regexes per
+clause and a substring scan per break keyword), checks that both produce
+identical clauses and reports throughput per input size to show scaling.
+
+Usage:
+    python -m benchmarks.clause_splitter --sizes 1 2 4 8
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import List
+
+from src.clause_splitter import ClauseSplitter
+
+SENTENCES = [
+    "The Receiving Party shall hold the Confidential Information in strict confidence.",
+    "Either party may terminate this Agreement upon thirty days written notice.",
+    "Provided that the Disclosing Party consents in writing, copies may be made.",
+    "The Company shall pay all undisputed invoices within forty-five days of receipt.",
+    "Notwithstanding the foregoing, either party may seek injunctive relief.",
+    "This Agreement shall be governed by the laws of the State of Delaware.",
+    "Moreover, the Contractor shall maintain adequate insurance at all times.",
+]
+
+
+class LegacyClauseSplitter:
+    """The original ClauseSplitter algorithm, kept as the benchmark baseline"""
+
+    def __init__(self):
+        self.clause_patterns = [
+            r'\n(?=\d+\.)', r'\n(?=\d+\))', r'\n(?=[A-Z]\.)', r'\n(?=[IVX]+\.)',
+            r'\n(?=Section \d+)', r'\n(?=Clause \d+)', r'\n(?=Article \d+)',
+        ]
+        self.sentence_pattern = r'(?<=[.!?])\s+(?=[A-Z])'
+
+    def split_clauses(self, contract_text: str) -> List[str]:
+        if not contract_text.strip():
+            return []
+        for pattern in self.clause_patterns:
+            clauses = re.split(pattern, contract_text)
+            if len(clauses) > 1:
+                cleaned_clauses = self._clean_clauses(clauses)
+                if len(cleaned_clauses) > 1:
+                    return cleaned_clauses
+        sentences = re.split(self.sentence_pattern, contract_text)
+        return self._group_sentences_into_clauses(self._clean_clauses(sentences))
+
+    def _clean_clauses(self, clauses):
+        cleaned = []
+        for clause in clauses:
+            clause = clause.strip()
+            if len(clause) < 10 or self._is_header_or_footer(clause):
+                continue
+            cleaned.append(clause)
+        return cleaned
+
+    def _is_header_or_footer(self, text):
+        text_lower = text.lower()
+        for pattern in [r'^page \d+$', r'^\d+$', r'^confidential$', r'^draft$', r'^final$',
+                        r'^version \d+', r'^revised', r'^effective date:', r'^execution date:']:
+            if re.match(pattern, text_lower):
+                return True
+        return False
+
+    def _group_sentences_into_clauses(self, sentences):
+        clauses, current_clause = [], []
+        for sentence in sentences:
+            current_clause.append(sentence)
+            if len(current_clause) >= 4 or self._contains_clause_break_keywords(sentence):
+                clause_text = " ".join(current_clause)
+                if len(clause_text.strip()) > 20:
+                    clauses.append(clause_text.strip())
+                current_clause = []
+        if current_clause:
+            clause_text = " ".join(current_clause)
+            if len(clause_text.strip()) > 20:
+                clauses.append(clause_text.strip())
+        return clauses
+
+    def _contains_clause_break_keywords(self, sentence):
+        sentence_lower = sentence.lower()
+        return any(keyword in sentence_lower for keyword in [
+            'provided that', 'provided, however,', 'further provided', 'in addition', 'moreover',
+            'furthermore', 'additionally', 'notwithstanding', 'subject to', 'except as', 'unless otherwise',
+        ])
+
+
+def build_contract(size_bytes: int, style: str, seed: int = 7) -> str:
+    """
+    Generate a contract of roughly size_bytes characters
+
+    Styles: "numbered" ("1. ..." lines), "article" ("Article 1 ..." lines, the last
+    pattern the original splitter tries) and "plain" (no numbering, newlines collapsed
+    as after PDF cleaning, so the sentence fallback is used).
+    """
+    rng = random.Random(seed)
+    parts = []
+    size = 0
+    number = 1
+    while size < size_bytes:
+        body = " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(2, 5)))
+        if style == "numbered":
+            clause = f"\n{number}. {body}"
+        elif style == "article":
+            clause = f"\nArticle {number} {body}"
+        else:
+            clause = f" {body}"
+        parts.append(clause)
+        size += len(clause)
+        number += 1
+    return "".join(parts)
+
+
+def best_time(func, text: str, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 2, 4, 8], help="Input sizes in MB")
+    parser.add_argument("--styles", nargs="+", default=["numbered", "article", "plain"])
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best time is reported)")
+    args = parser.parse_args()
+
+    legacy = LegacyClauseSplitter()
+    current = ClauseSplitter()
+
+    print("📊 ClauseSplitter throughput (MB/s, higher is better)")
+    print("=" * 78)
+    print(f"{'style':<10}{'size':>8}{'legacy s':>11}{'current s':>11}{'legacy MB/s':>13}{'current MB/s':>14}{'speedup':>9}")
+    all_identical = True
+    for style in args.styles:
+        for size_mb in args.sizes:
+            text = build_contract(int(size_mb * 1024 * 1024), style)
+            legacy_time, legacy_clauses = best_time(legacy.split_clauses, text, args.repeat)
+            current_time, current_clauses = best_time(current.split_clauses, text, args.repeat)
+            all_identical &= legacy_clauses == current_clauses
+            megabytes = len(text) / (1024 * 1024)
+            print(f"{style:<10}{size_mb:>6.1f}MB{legacy_time:>11.3f}{current_time:>11.3f}"
+                  f"{megabytes / legacy_time:>13.1f}{megabytes / current_time:>14.1f}"
+                  f"{legacy_time / current_time:>8.2f}x")
+
+    print(f"\n✅ Identical output: {all_identical}")
+
+
+if __name__ == "__main__":
+    main()
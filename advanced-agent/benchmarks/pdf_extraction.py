@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark PDF text extraction on a large synthetic contract
+
+Compares the original page loop (string concatenation), the current
+PDFLoader.load_pdf and the process-pool PDFLoader.extract_pdf.
+
+Usage:
+    python -m benchmarks.pdf_extraction --pages 600 --workers 4
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import fitz
+
+from src.pdf_loader import PDFLoader
+
+CLAUSE_TEXT = (
+    "{n}. CONFIDENTIALITY. The Receiving Party shall hold and maintain the Confidential "
+    "Information in strictest confidence for the sole and exclusive benefit of the Disclosing "
+    "Party and shall not, without prior written approval, use for its own benefit, publish, "
+    "copy or otherwise disclose to others any Confidential Information. "
+)
+
+
+def build_synthetic_pdf(path: str, pages: int, clauses_per_page: int = 6) -> None:
+    """Write a PDF with the given number of text-dense pages"""
+    doc = fitz.open()
+    number = 1
+    for _ in range(pages):
+        page = doc.new_page()
+        text = ""
+        for _ in range(clauses_per_page):
+            text += CLAUSE_TEXT.format(n=number) + "\n"
+            number += 1
+        page.insert_textbox(fitz.Rect(50, 50, 550, 800), text, fontsize=9)
+    doc.save(path)
+    doc.close()
+
+
+def legacy_load_pdf(loader: PDFLoader, file_path: str) -> str:
+    """The original load_pdf loop, kept as the baseline"""
+    doc = fitz.open(file_path)
+    text_content = ""
+    for page_num in range(len(doc)):
+        page = doc.load_page(page_num)
+        text_content += page.get_text()
+    doc.close()
+    return loader._clean_text(text_content)
+
+
+def time_call(func, repeat: int):
+    """Best wall time over several runs, plus the last result"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=600, help="Number of pages in the synthetic PDF")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes for extract_pdf")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per method (best time is reported)")
+    args = parser.parse_args()
+
+    loader = PDFLoader()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pdf_path = os.path.join(tmp_dir, "synthetic_contract.pdf")
+        print(f"📄 Building synthetic {args.pages}-page PDF...")
+        build_synthetic_pdf(pdf_path, args.pages)
+
+        legacy_time, legacy_text = time_call(lambda: legacy_load_pdf(loader, pdf_path), args.repeat)
+        current_time, current_text = time_call(lambda: loader.load_pdf(pdf_path), args.repeat)
+        serial_time, serial = time_call(lambda: loader.extract_pdf(pdf_path, workers=1), args.repeat)
+        parallel_time, parallel = time_call(lambda: loader.extract_pdf(pdf_path, workers=args.workers), args.repeat)
+
+    print(f"\n📊 Extraction of {args.pages} pages ({len(legacy_text):,} characters, {os.cpu_count()} CPUs)")
+    print("=" * 60)
+    rows = [
+        ("legacy loop (+=)", legacy_time),
+        ("load_pdf", current_time),
+        ("extract_pdf, 1 worker", serial_time),
+        (f"extract_pdf, {args.workers} workers", parallel_time),
+    ]
+    for name, seconds in rows:
+        print(f"{name:<28} {seconds:8.3f}s   {legacy_time / seconds:5.2f}x")
+
+    identical = legacy_text == current_text == serial.text == parallel.text
+    print(f"\n✅ Outputs identical: {identical}")
+    print(f"📑 Page offsets recorded: {len(parallel.page_offsets)}")
+
+
+if __name__ == "__main__":
+    main()
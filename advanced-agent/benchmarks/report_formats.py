@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark report serialization at corpus scale
+
+Builds synthetic reports in which a share of the clauses are standard clauses
+that recur across contracts (with the same analysis, as the cache and the
+pre-screening tier produce them), then compares the size, write time and read
+time of the formats in src/report_formats.py: indented JSON (one file per
+report, the historical format), NDJSON and msgpack per report, and one
+columnar msgpack corpus for all reports.
+
+Usage:
+    python -m benchmarks.report_formats --reports 1000 --clauses 40 --shared 0.3
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+
+from benchmarks.clause_splitter import SENTENCES
+from src.models import ClauseAnalysis, ContractReport
+from src.report_formats import read_clause_table, read_corpus, read_report, write_corpus, write_report
+
+
+def _text(rng: random.Random, sentences: int) -> str:
+    return " ".join(rng.choice(SENTENCES) + f" Ref {rng.randrange(10**6)}." for _ in range(sentences))
+
+
+def _analysis(rng: random.Random, number: int) -> ClauseAnalysis:
+    is_risky = rng.random() < 0.3
+    return ClauseAnalysis(
+        clause=f"{number}. {_text(rng, rng.randint(2, 6))}",
+        summary=_text(rng, 3),
+        is_risky=is_risky,
+        risk_reason=_text(rng, 2) if is_risky else "None",
+        suggestion=_text(rng, 3),
+    )
+
+
+def build_reports(count: int, clauses: int, shared: float, seed: int) -> Dict[str, ContractReport]:
+    """Synthetic reports; each clause is a standard clause from a shared pool with probability `shared`"""
+    rng = random.Random(seed)
+    standard = [_analysis(rng, number) for number in range(1, 201)]
+    reports = {}
+    for document in range(count):
+        analyses = [
+            rng.choice(standard) if rng.random() < shared else _analysis(rng, number)
+            for number in range(1, clauses + 1)
+        ]
+        reports[f"contract_{document:05d}.pdf"] = ContractReport(
+            total_clauses=len(analyses),
+            risky_clauses_count=sum(1 for analysis in analyses if analysis.is_risky),
+            suggestions_count=len(analyses),
+            clauses=analyses,
+        )
+    return reports
+
+
+def _timed(action: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    action()
+    return time.perf_counter() - start
+
+
+def benchmark_per_report(reports: Dict[str, ContractReport], tmp_dir: str, extension: str) -> Dict[str, Any]:
+    """One file per report, written and read with write_report/read_report"""
+    paths = {name: os.path.join(tmp_dir, f"contract_analysis_{name}{extension}") for name in reports}
+    write_seconds = _timed(lambda: [write_report(report, paths[name]) for name, report in reports.items()])
+    read_seconds = _timed(lambda: [read_report(path) for path in paths.values()])
+    return {
+        "format": f"{extension[1:]} per report",
+        "bytes": sum(os.path.getsize(path) for path in paths.values()),
+        "write_seconds": round(write_seconds, 4),
+        "read_seconds": round(read_seconds, 4),
+    }
+
+
+def benchmark_corpus(reports: Dict[str, ContractReport], tmp_dir: str) -> List[Dict[str, Any]]:
+    """All reports in one columnar msgpack file, read back as models and as a clause table"""
+    path = os.path.join(tmp_dir, "corpus.msgpack")
+    write_seconds = _timed(lambda: write_corpus(reports, path))
+    size = os.path.getsize(path)
+    return [
+        {
+            "format": "msgpack corpus",
+            "bytes": size,
+            "write_seconds": round(write_seconds, 4),
+            "read_seconds": round(_timed(lambda: read_corpus(path)), 4),
+        },
+        {
+            "format": "msgpack corpus (table)",
+            "bytes": size,
+            "write_seconds": round(write_seconds, 4),
+            "read_seconds": round(_timed(lambda: read_clause_table(path)), 4),
+        },
+    ]
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    baseline = results[0]
+    print(f"\n{'format':<26}{'size':>12}{'vs json':>9}{'write':>10}{'read':>10}")
+    print("=" * 67)
+    for row in results:
+        print(
+            f"{row['format']:<26}{row['bytes'] / 2**20:>9.1f}MiB{row['bytes'] / baseline['bytes']:>8.0%}"
+            f"{row['write_seconds']:>9.3f}s{row['read_seconds']:>9.3f}s"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reports", type=int, default=1000, help="Reports in the corpus")
+    parser.add_argument("--clauses", type=int, default=40, help="Clauses per report")
+    parser.add_argument("--shared", type=float, default=0.3,
+                        help="Fraction of clauses that are standard clauses recurring across contracts")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="report_formats_benchmark.json", help="JSON results file")
+    args = parser.parse_args()
+
+    print(f"⏱️  Building {args.reports} reports of {args.clauses} clauses ({args.shared:.0%} standard clauses)...")
+    reports = build_reports(args.reports, args.clauses, args.shared, args.seed)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results = [benchmark_per_report(reports, tmp_dir, extension) for extension in (".json", ".ndjson", ".msgpack")]
+        results += benchmark_corpus(reports, tmp_dir)
+
+    print_results(results)
+    output = {
+        "benchmark": "report_formats",
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2)
+    print(f"\n💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark plain-text contract loading on multi-hundred-megabyte files
+
+Compares the original PDFLoader.load_text_file (file.read() followed by a
+split/join and replace calls over the whole text) and the original line-based
+iter_text_file with the memory-mapped, chunked loader, for loading the cleaned
+text and for streaming it through ClauseSplitter.iter_clauses. Every run happens
+in a fresh process, so its peak resident memory can be measured; the outputs of
+the original and current loaders are checked to be identical.
+
+Usage:
+    python -m benchmarks.text_loading --sizes-mb 50 200
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, Iterator
+
+from benchmarks.clause_splitter import build_contract
+
+MODES = ("load", "stream")
+
+
+def legacy_load_text_file(file_path: str) -> str:
+    """The original load_text_file and _clean_text, kept as the benchmark baseline"""
+    with open(file_path, 'r', encoding='utf-8') as file:
+        content = file.read()
+    text = " ".join(content.split())
+    text = text.replace("\n\n", "\n").replace("\n \n", "\n")
+    text = text.replace("  ", " ")
+    return text.strip()
+
+
+def legacy_iter_text_file(file_path: str, chunk_lines: int = 1000) -> Iterator[str]:
+    """The original line-based iter_text_file"""
+    with open(file_path, 'r', encoding='utf-8') as file:
+        lines = []
+        for line in file:
+            lines.append(line)
+            if len(lines) >= chunk_lines:
+                text = " ".join("".join(lines).split())
+                lines = []
+                if text:
+                    yield text
+        text = " ".join("".join(lines).split())
+        if text:
+            yield text
+
+
+def _peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_child(loader: str, mode: str, path: str) -> Dict[str, object]:
+    """Load (or stream and split) one file in this process and measure it"""
+    from src.clause_splitter import ClauseSplitter
+    from src.pdf_loader import PDFLoader
+
+    splitter = ClauseSplitter()
+    baseline = _peak_rss_bytes()
+    start = time.perf_counter()
+    digest = hashlib.sha256()
+    if mode == "load":
+        text = legacy_load_text_file(path) if loader == "original" else PDFLoader().load_text_file(path)
+        digest.update(text.encode("utf-8"))
+        count = len(text)
+    else:
+        chunks = legacy_iter_text_file(path) if loader == "original" else PDFLoader().iter_text_file(path)
+        count = 0
+        for clause in splitter.iter_clauses(chunks):
+            digest.update(clause.encode("utf-8"))
+            count += 1
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": round(seconds, 3),
+        "peak_mb": round((_peak_rss_bytes() - baseline) / 2**20, 1),
+        "count": count,
+        "sha256": digest.hexdigest(),
+    }
+
+
+def measure(loader: str, mode: str, path: str) -> Dict[str, object]:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.text_loading", "--child", loader, mode, path],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(output.stdout)
+
+
+def write_contract(path: str, size_mb: int) -> None:
+    """Write a numbered contract of about size_mb MiB, 8 MiB at a time"""
+    piece = build_contract(8 * 2**20, "numbered")
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(max(1, size_mb // 8)):
+            f.write(piece)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes-mb", type=int, nargs="*", default=[50, 200], help="File sizes in MiB")
+    parser.add_argument("--child", nargs=3, metavar=("LOADER", "MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(*args.child)))
+        return
+
+    print(f"\n{'file':>8}  {'mode':<8}{'loader':<10}{'time':>9}{'peak memory':>14}")
+    print("=" * 51)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size_mb in args.sizes_mb:
+            path = os.path.join(tmp_dir, f"contract_{size_mb}mb.txt")
+            write_contract(path, size_mb)
+            for mode in MODES:
+                results = {loader: measure(loader, mode, path) for loader in ("original", "mmap")}
+                for loader, row in results.items():
+                    print(f"{size_mb:>6}MB  {mode:<8}{loader:<10}{row['seconds']:>8.2f}s{row['peak_mb']:>11.0f}MiB")
+                if results["original"]["sha256"] != results["mmap"]["sha256"]:
+                    print(f"❌ {mode}: outputs differ")
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
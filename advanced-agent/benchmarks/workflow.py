@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Benchmark the complete analysis workflow against a local fake chat model
+
+Runs ContractAnalysisWorkflow.run over the bundled PDFs, the sample contract
+and synthetic numbered contracts of the requested sizes, with FakeChatModel in
+place of ChatOpenAI (configurable latency, jitter, error rate and response
+size, no API key needed). Reports per-stage timings and clauses/second, and
+writes them as JSON so runs can be compared with --compare.
+
+Usage:
+    python -m benchmarks.workflow --synthetic-kb 32 128 --latency 0.02 --concurrency 8
+    python -m benchmarks.workflow --output after.json --compare before.json
+"""
+
+import argparse
+import contextlib
+import glob
+import json
+import os
+import platform
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from benchmarks.clause_splitter import build_contract
+from src.fake_llm import FakeChatModel
+from src.models import ContractState
+from src.workflow import ContractAnalysisWorkflow
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Graph nodes in execution order
+STAGES = ("load_contract", "split_clauses", "analyze_clauses", "generate_report")
+
+
+class TimedWorkflow(ContractAnalysisWorkflow):
+    """Workflow that accumulates the wall time spent in each graph node"""
+
+    def __init__(self, **kwargs: Any):
+        self.stage_seconds: Dict[str, float] = defaultdict(float)
+        super().__init__(**kwargs)
+
+    def _timed(self, stage: str, step, *args):
+        start = time.perf_counter()
+        try:
+            return step(*args)
+        finally:
+            self.stage_seconds[stage] += time.perf_counter() - start
+
+    def _load_contract_step(self, state: ContractState) -> Dict[str, Any]:
+        return self._timed("load_contract", super()._load_contract_step, state)
+
+    def _split_clauses_step(self, state: ContractState) -> Dict[str, Any]:
+        return self._timed("split_clauses", super()._split_clauses_step, state)
+
+    def _analyze_clauses_step(self, state: ContractState, config) -> Dict[str, Any]:
+        return self._timed("analyze_clauses", super()._analyze_clauses_step, state, config)
+
+    async def _aanalyze_clauses_step(self, state: ContractState, config) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            return await super()._aanalyze_clauses_step(state, config)
+        finally:
+            self.stage_seconds["analyze_clauses"] += time.perf_counter() - start
+
+    def _generate_report_step(self, state: ContractState) -> Dict[str, Any]:
+        return self._timed("generate_report", super()._generate_report_step, state)
+
+
+def find_documents(tmp_dir: str, synthetic_kb: List[int], include_bundled: bool) -> List[str]:
+    """Bundled contracts plus synthetic numbered contracts written to tmp_dir"""
+    documents = []
+    if include_bundled:
+        documents += sorted(glob.glob(os.path.join(ROOT, "src", "*.pdf")))
+        documents.append(os.path.join(ROOT, "sample_contract.txt"))
+    for size in synthetic_kb:
+        path = os.path.join(tmp_dir, f"synthetic_{size}kb.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(build_contract(size * 1024, "numbered"))
+        documents.append(path)
+    return documents
+
+
+def benchmark_document(file_path: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Analyze one document with a fresh fake model and workflow, and collect its timings"""
+    llm = FakeChatModel(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        response_chars=args.response_chars,
+        seed=args.seed,
+    )
+    workflow = TimedWorkflow(
+        llm=llm,
+        max_concurrency=args.concurrency,
+        engine=args.engine,
+        preserve_layout=args.preserve_layout,
+    )
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        report = workflow.run(file_path)
+    total = time.perf_counter() - start
+
+    llm_stats = llm.stats
+    return {
+        "document": os.path.basename(file_path),
+        "bytes": os.path.getsize(file_path),
+        "clauses": report.total_clauses,
+        "failed_clauses": sum(1 for a in report.clauses if a.summary == ContractAnalysisWorkflow.FALLBACK_SUMMARY),
+        "stages": {stage: round(workflow.stage_seconds.get(stage, 0.0), 6) for stage in STAGES},
+        "total_seconds": round(total, 6),
+        "clauses_per_second": round(report.total_clauses / total, 3) if total else None,
+        "llm_requests": llm_stats["requests"],
+        "llm_errors": llm_stats["errors"],
+    }
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    print(f"\n{'document':<26}{'clauses':>8}{'load':>9}{'split':>9}{'analyze':>10}{'report':>9}{'total':>9}{'clauses/s':>11}")
+    print("=" * 91)
+    for row in results:
+        stages = row["stages"]
+        print(
+            f"{row['document'][:25]:<26}{row['clauses']:>8}"
+            f"{stages['load_contract']:>8.3f}s{stages['split_clauses']:>8.3f}s"
+            f"{stages['analyze_clauses']:>9.3f}s{stages['generate_report']:>8.3f}s"
+            f"{row['total_seconds']:>8.3f}s{row['clauses_per_second']:>11.1f}"
+        )
+
+
+def print_comparison(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    """Print the clauses/s change of every document also present in a previous results file"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {row["document"]: row for row in json.load(f)["results"]}
+    print(f"\n📈 Compared with {baseline_path}")
+    for row in results:
+        before = baseline.get(row["document"])
+        if not before or not before["clauses_per_second"]:
+            print(f"   {row['document']}: no baseline")
+            continue
+        change = row["clauses_per_second"] / before["clauses_per_second"] - 1
+        print(f"   {row['document']}: {before['clauses_per_second']:.1f} -> "
+              f"{row['clauses_per_second']:.1f} clauses/s ({change:+.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--synthetic-kb", type=int, nargs="*", default=[32, 128],
+                        help="Sizes of the synthetic contracts in KiB")
+    parser.add_argument("--no-bundled", action="store_true", help="Skip the bundled PDFs and sample contract")
+    parser.add_argument("--engine", choices=ContractAnalysisWorkflow.ENGINES, default="three_call")
+    parser.add_argument("--concurrency", type=int, default=8, help="Workflow max_concurrency")
+    parser.add_argument("--preserve-layout", action="store_true", help="Use layout-aware PDF extraction")
+    parser.add_argument("--latency", type=float, default=0.02, help="Fake model latency per request in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01, help="Extra random latency per request, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of fake requests failing with 503")
+    parser.add_argument("--response-chars", type=int, default=400, help="Length of fake text responses")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="workflow_benchmark.json", help="JSON results file")
+    parser.add_argument("--compare", metavar="RESULTS", help="Previous results file to compare against")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for file_path in find_documents(tmp_dir, args.synthetic_kb, not args.no_bundled):
+            print(f"⏱️  {os.path.basename(file_path)}...")
+            try:
+                results.append(benchmark_document(file_path, args))
+            except Exception as e:
+                # e.g. scanned PDFs without a text layer
+                print(f"❌ Skipped {os.path.basename(file_path)}: {str(e)}")
+
+    print_results(results)
+    output = {
+        "benchmark": "workflow",
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2)
+    print(f"\n💾 Results written to {args.output}")
+
+    if args.compare:
+        print_comparison(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,14 @@
 from dotenv import load_dotenv
 from src.workflow import ContractAnalysisWorkflow
+from src.cache import ClauseCache
+from src.dedup import NearDuplicateIndex
+from src.prescreen import ClausePrescreener
+from src.sizing import ClauseSizer
+from src.batch import BatchAnalyzer
+from src.clause_index import ClauseIndex
+from src.report_formats import EXTENSIONS, read_report, write_report
+from datetime import datetime
+import argparse
 import json
 import sys
 import os
@@ -7,19 +16,33 @@ import os
 load_dotenv()
 
 
+# Searchable index of the clauses of saved reports
+CLAUSE_INDEX_PATH = "clause_index.sqlite3"
+
+
 def print_clause_analysis(analysis, clause_number):
     """Print a formatted clause analysis"""
     print(f"\n📋 Clause {clause_number}")
     print("=" * 60)
     print(f"📄 Original: {analysis.clause[:200]}{'...' if len(analysis.clause) > 200 else ''}")
     print(f"📝 Summary: {analysis.summary}")
+    if analysis.borrowed_from:
+        print(f"♻️  Analysis reused from near-duplicate clause {analysis.borrowed_from}")
+    if analysis.change == "unchanged":
+        print("🔁 Unchanged since the previous version (analysis carried forward)")
+    elif analysis.change is not None:
+        print(f"✏️  {analysis.change.capitalize()} since the previous version")
+    if analysis.tier == "prescreen":
+        print(f"🏷️  Pre-screened as {analysis.clause_type.replace('_', ' ')} (no LLM call)")
     
     if analysis.is_risky:
         print(f"⚠️  RISKY: {analysis.risk_reason}")
     else:
         print(f"✅ Safe: {analysis.risk_reason}")
     
-    if analysis.suggestion != "None":
+    if analysis.suggestion_pending:
+        print("💡 Suggestion: pending (generated on request)")
+    elif analysis.suggestion != "None":
         print(f"💡 Suggestion: {analysis.suggestion}")
     else:
         print("💡 Suggestion: No specific suggestions")
@@ -33,6 +56,12 @@ def print_summary_report(report):
     print(f"📋 Total Clauses: {report.total_clauses}")
     print(f"⚠️  Risky Clauses: {report.risky_clauses_count}")
     print(f"💡 Suggestions Provided: {report.suggestions_count}")
+    if report.pending_suggestions:
+        print(f"⏳ Suggestions Pending: {report.pending_suggestions}")
+    if report.revision is not None:
+        revision = report.revision
+        print(f"🔁 Since Previous Version: {revision.unchanged} unchanged, {revision.modified} modified, "
+              f"{revision.added} added, {revision.removed} removed")
     
     if report.risky_clauses_count > 0:
         risk_percentage = (report.risky_clauses_count / report.total_clauses) * 100
@@ -42,17 +71,248 @@ def print_summary_report(report):
 
 
 def save_report_to_json(report, output_file):
-    """Save the complete report to a JSON file"""
+    """Save the complete report to a JSON file; returns whether it was saved"""
     try:
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(report.model_dump(), f, indent=2, ensure_ascii=False)
         print(f"\n💾 Report saved to: {output_file}")
+        return True
     except Exception as e:
         print(f"❌ Error saving report: {str(e)}")
+        return False
+
+
+def index_saved_report(output_file, file_path):
+    """Add a saved report to the clause index, so --search finds its clauses"""
+    try:
+        index = ClauseIndex(CLAUSE_INDEX_PATH)
+        try:
+            index.add_report_file(output_file, metadata={"source": os.path.abspath(file_path)})
+        finally:
+            index.close()
+    except Exception as e:
+        print(f"⚠️  Report not added to the clause index: {str(e)}")
+
+
+def print_clause_hit(hit):
+    """Print one search result"""
+    analyzed = datetime.fromtimestamp(hit.analyzed_at).strftime("%Y-%m-%d")
+    risk = "⚠️  RISKY" if hit.analysis.is_risky else "✅ Not risky"
+    print(f"\n📄 {hit.document} - clause {hit.position + 1} (analyzed {analyzed}) {risk}")
+    print(f"   {hit.snippet or str(hit.analysis.clause)[:200]}")
+    print(f"   📝 {hit.analysis.summary}")
+    if hit.analysis.is_risky:
+        print(f"   🚨 {hit.analysis.risk_reason}")
+
+
+def _timestamp(value):
+    """argparse type for dates like 2026-07-01 (or full ISO timestamps), as Unix time"""
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a date: {value}")
+
+
+def parse_args(argv=None):
+    """Parse command line options; without --batch the interactive mode is used"""
+    parser = argparse.ArgumentParser(description="Contract Analyzer & Negotiation Advisor")
+    parser.add_argument("--batch", metavar="SOURCE",
+                        help="Analyze a directory of contracts (or a manifest with one path per line) non-interactively")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run the HTTP service (submit, poll and stream analyses) instead of the interactive mode")
+    parser.add_argument("--host", default="127.0.0.1", help="Service address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Service port (default: 8000)")
+    parser.add_argument("--concurrent-jobs", type=int, default=2, help="Contracts the service analyzes at the same time")
+    parser.add_argument("--fake-llm", action="store_true",
+                        help="Serve with a local fake chat model instead of OpenAI, for tests and load tests")
+    parser.add_argument("--output-dir", default=".", help="Where batch reports are written (default: current directory)")
+    parser.add_argument("--report-format", choices=list(EXTENSIONS), default="json",
+                        help="Batch report format: json, ndjson (written clause by clause) or msgpack (compact)")
+    parser.add_argument("--export-corpus", metavar="PATH",
+                        help="After a batch, collect all of its reports into one compact msgpack file for analytics")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for batch mode (default: CPU count)")
+    parser.add_argument("--llm-concurrency", type=int, default=8,
+                        help="Maximum LLM requests in flight across all batch workers (per job in service mode)")
+    parser.add_argument("--requests-per-minute", type=float, default=None,
+                        help="Provider request limit; batch workers pace and retry requests to stay under it")
+    parser.add_argument("--tokens-per-minute", type=float, default=None,
+                        help="Provider token limit; batch workers pace and retry requests to stay under it")
+    parser.add_argument("--engine", choices=ContractAnalysisWorkflow.ENGINES, default="three_call",
+                        help="Clause analysis engine for batch and service modes")
+    parser.add_argument("--defer-suggestions", action="store_true",
+                        help="Skip suggestion calls during analysis; generate them later on request (three_call engine)")
+    parser.add_argument("--suggest", metavar="REPORT",
+                        help="Generate the pending suggestions of a saved report (risky clauses, or --clause) in place")
+    parser.add_argument("--clause", type=int, action="append", metavar="N",
+                        help="Clause number (1-based) to generate a suggestion for with --suggest; repeatable")
+    parser.add_argument("--search", metavar="QUERY",
+                        help="Search the clauses of all saved reports in --output-dir (\"\" with filters only)")
+    parser.add_argument("--risky", action="store_true", help="With --search, only risky clauses")
+    parser.add_argument("--since", type=_timestamp, metavar="DATE", help="With --search, only reports analyzed since DATE")
+    parser.add_argument("--until", type=_timestamp, metavar="DATE", help="With --search, only reports analyzed before DATE")
+    parser.add_argument("--document", metavar="NAME", help="With --search, only clauses of this document")
+    parser.add_argument("--limit", type=int, default=20, help="Maximum --search results (default: 20)")
+    parser.add_argument("--metrics-jsonl", metavar="PATH",
+                        help="Append stage, clause and LLM request spans (timings, tokens, cost) to a JSON lines file")
+    parser.add_argument("--metrics-prom", metavar="PATH",
+                        help="Write Prometheus text-format counters after each interactive analysis")
+    parser.add_argument("--quiet", action="store_true", help="Hide analysis progress in interactive mode")
+    parser.add_argument("--extraction-workers", type=int, default=1, metavar="N",
+                        help="Interactive mode: processes extracting PDF pages in parallel (ignored with --preserve-layout)")
+    # Opt-in optimizations of interactive mode; batch and service modes always use them
+    parser.add_argument("--cache", action="store_true",
+                        help="Interactive mode: reuse clause analyses cached in clause_cache.sqlite3")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Interactive mode: reuse the analysis of a near-duplicate clause of the same document")
+    parser.add_argument("--prescreen", action="store_true",
+                        help="Interactive mode: answer boilerplate clauses with templated analyses, without the LLM")
+    parser.add_argument("--size-clauses", action="store_true",
+                        help="Interactive mode: split oversized clauses and merge fragments to the model's token budget")
+    parser.add_argument("--preserve-layout", action="store_true",
+                        help="Interactive mode: extract PDFs with their layout, so numbered clauses are detected")
+    parser.add_argument("--checkpoints", action="store_true",
+                        help="Interactive mode: checkpoint analyses in analysis_checkpoints.sqlite3 and resume interrupted ones")
+    parser.add_argument("--force", action="store_true", help="Re-analyze documents whose report already exists")
+    parser.add_argument("--verbose", action="store_true", help="Show per-clause progress of batch workers")
+    args = parser.parse_args(argv)
+    if args.defer_suggestions and args.engine != "three_call":
+        parser.error("--defer-suggestions requires the three_call engine")
+    if args.export_corpus and not args.batch:
+        parser.error("--export-corpus requires --batch")
+    return args
+
+
+def run_batch(args):
+    """Analyze every contract of a directory or manifest across a process pool"""
+    analyzer = BatchAnalyzer(
+        output_dir=args.output_dir,
+        workers=args.workers,
+        llm_concurrency=args.llm_concurrency,
+        cache_path="clause_cache.sqlite3",
+        checkpoint_path="analysis_checkpoints.sqlite3",
+        dedup=True,
+        force=args.force,
+        quiet=not args.verbose,
+        requests_per_minute=args.requests_per_minute,
+        tokens_per_minute=args.tokens_per_minute,
+        metrics_path=args.metrics_jsonl,
+        report_format=args.report_format,
+        index_path=CLAUSE_INDEX_PATH,
+        engine=args.engine,
+        preserve_layout=True,
+        prescreen=ClausePrescreener(),
+        sizer=ClauseSizer(),
+        defer_suggestions=args.defer_suggestions,
+    )
+    summary = analyzer.run(args.batch)
+    if args.export_corpus:
+        exported = analyzer.export_corpus(args.batch, args.export_corpus)
+        print(f"📦 Exported {exported} reports to {args.export_corpus}")
+    return 1 if summary.failed else 0
+
+
+def run_service(args):
+    """Serve one warm workflow over HTTP until interrupted"""
+    import uvicorn
+    from src.fake_llm import FakeChatModel
+    from src.metrics import WorkflowMetrics
+    from src.service import AnalysisService, create_app
+    
+    workflow = ContractAnalysisWorkflow(
+        max_concurrency=args.llm_concurrency,
+        engine=args.engine,
+        cache=ClauseCache(),
+        dedup=NearDuplicateIndex(),
+        prescreen=ClausePrescreener(),
+        sizer=ClauseSizer(),
+        preserve_layout=True,
+        defer_suggestions=args.defer_suggestions,
+        llm=FakeChatModel() if args.fake_llm else None,
+        metrics=WorkflowMetrics(jsonl_path=args.metrics_jsonl),
+        console=not args.quiet,
+    )
+    service = AnalysisService(workflow, concurrent_jobs=args.concurrent_jobs)
+    try:
+        uvicorn.run(create_app(service), host=args.host, port=args.port)
+    finally:
+        service.close()
+
+
+def run_search(args):
+    """Bring the clause index up to date with the saved reports, then search it"""
+    index = ClauseIndex(CLAUSE_INDEX_PATH)
+    try:
+        indexed = index.update(args.output_dir)
+        if indexed:
+            print(f"🗂️  Indexed {indexed} new or updated reports")
+        hits = index.search(
+            args.search or None,
+            risky=True if args.risky else None,
+            document=args.document,
+            since=args.since,
+            until=args.until,
+            limit=args.limit,
+        )
+        stats = index.stats()
+    finally:
+        index.close()
+    print(f"🔎 {len(hits)} matching clauses (of {stats['clauses']} in {stats['documents']} reports)")
+    for hit in hits:
+        print_clause_hit(hit)
+    return 0
+
+
+def run_suggest(args):
+    """Generate the pending suggestions of a saved report and write them back into it"""
+    report = read_report(args.suggest)
+    workflow = ContractAnalysisWorkflow(cache=ClauseCache(), console=not args.quiet)
+    indices = [number - 1 for number in args.clause] if args.clause else None
+    try:
+        workflow.resolve_suggestions(report, indices)
+    except IndexError as e:
+        print(f"❌ {str(e)}")
+        return 1
+    write_report(report, args.suggest)
+    for i in indices if indices is not None else range(len(report.clauses)):
+        analysis = report.clauses[i]
+        if indices is not None or analysis.is_risky:
+            print(f"\n💡 Clause {i + 1}: {analysis.suggestion}")
+    print(f"\n💾 Report updated: {args.suggest} ({report.pending_suggestions} suggestions still pending)")
+    return 0
+
+
+def build_interactive_workflow(args):
+    """Workflow of the interactive mode; cache, deduplication, pre-screening, sizing, layout and checkpoints are opt-in"""
+    from src.checkpoints import AnalysisCheckpoints
+    from src.metrics import WorkflowMetrics
+    
+    return ContractAnalysisWorkflow(
+        cache=ClauseCache() if args.cache else None,
+        dedup=NearDuplicateIndex() if args.dedup else None,
+        prescreen=ClausePrescreener() if args.prescreen else None,
+        sizer=ClauseSizer() if args.size_clauses else None,
+        preserve_layout=args.preserve_layout,
+        extraction_workers=args.extraction_workers,
+        checkpoints=AnalysisCheckpoints() if args.checkpoints else None,
+        defer_suggestions=args.defer_suggestions,
+        metrics=WorkflowMetrics(jsonl_path=args.metrics_jsonl) if args.metrics_jsonl or args.metrics_prom else None,
+        console=not args.quiet,
+    )
 
 
 def main():
-    workflow = ContractAnalysisWorkflow()
+    args = parse_args()
+    if args.batch:
+        sys.exit(run_batch(args))
+    if args.suggest:
+        sys.exit(run_suggest(args))
+    if args.search is not None:
+        sys.exit(run_search(args))
+    if args.serve:
+        run_service(args)
+        return
+    
+    workflow = None
     print("🤖 Contract Analyzer & Negotiation Advisor")
     print("=" * 60)
 
@@ -72,12 +332,28 @@ def main():
             print(f"❌ File not found: {file_path}")
             continue
 
+        # A report of an earlier version lets unchanged clauses keep their analyses
+        previous = None
+        previous_path = input("📚 Report of the previous version, to re-analyze only changed clauses (Enter to skip): ").strip()
+        if previous_path:
+            try:
+                previous = read_report(previous_path)
+            except Exception as e:
+                print(f"❌ Could not load previous report, analyzing every clause: {str(e)}")
+
         try:
             print(f"\n🔍 Analyzing contract: {file_path}")
             print("=" * 60)
             
+            # Built on the first analysis, so the prompt appears before LangGraph and OpenAI are loaded
+            if workflow is None:
+                workflow = build_interactive_workflow(args)
+            
             # Run the analysis
-            report = workflow.run(file_path)
+            # With --checkpoints, picks up where an interrupted analysis of the same file stopped
+            report = workflow.run(file_path, resume=True, previous=previous)
+            if args.metrics_prom:
+                workflow.metrics.write_prometheus(args.metrics_prom)
             
             # Print detailed analysis
             print("\n📋 DETAILED CLAUSE ANALYSIS")
@@ -89,6 +365,14 @@ def main():
             # Print summary report
             print_summary_report(report)
             
+            if any(analysis.suggestion_pending and analysis.is_risky for analysis in report.clauses):
+                suggest_choice = input("\n💡 Generate suggestions for the risky clauses? (y/n): ").strip().lower()
+                if suggest_choice in {"y", "yes"}:
+                    workflow.resolve_suggestions(report)
+                    for i, clause_analysis in enumerate(report.clauses, 1):
+                        if clause_analysis.is_risky:
+                            print(f"\n💡 Clause {i}: {clause_analysis.suggestion}")
+            
             # Ask if user wants to save the report
             save_choice = input("\n💾 Save detailed report to JSON? (y/n): ").strip().lower()
             if save_choice in {"y", "yes"}:
@@ -96,7 +380,8 @@ def main():
                 output_file = input(f"📁 Output filename (default: {default_filename}): ").strip()
                 if not output_file:
                     output_file = default_filename
-                save_report_to_json(report, output_file)
+                if save_report_to_json(report, output_file):
+                    index_saved_report(output_file, file_path)
             
             # Ask if user wants to analyze another contract
             another = input("\n🔄 Analyze another contract? (y/n): ").strip().lower()
@@ -0,0 +1,317 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cache import ClauseCache
+from .clause_index import ClauseIndex
+from .dedup import NearDuplicateIndex
+from .models import BatchSummary
+from .report_formats import EXTENSIONS, NDJSONReportWriter, read_report, report_format, write_corpus, write_report
+from .scheduler import RequestScheduler
+from .workflow import ContractAnalysisWorkflow
+
+# File types picked up when a directory is given
+CONTRACT_EXTENSIONS = (".pdf", ".txt")
+
+# Threads waiting for a slot of a shared semaphore on behalf of async calls
+_slot_waiters = ThreadPoolExecutor(thread_name_prefix="llm-slot")
+
+
+class SharedLimitLLM:
+    """
+    Chat model proxy that holds a slot of a shared semaphore during every call
+
+    With a multiprocessing.Manager semaphore, all worker processes of a batch
+    draw from the same pool of slots, so the number of in-flight LLM requests
+    stays under one global limit.
+    """
+
+    def __init__(self, llm: Any, semaphore: Any):
+        """
+        Args:
+            llm: Chat model or runnable to wrap
+            semaphore: Semaphore (or Manager semaphore proxy) limiting concurrent calls
+        """
+        self.llm = llm
+        self.semaphore = semaphore
+
+    def invoke(self, messages: Any, **kwargs: Any) -> Any:
+        with self.semaphore:
+            return self.llm.invoke(messages, **kwargs)
+
+    async def ainvoke(self, messages: Any, **kwargs: Any) -> Any:
+        # Acquiring may block on another process, so keep it off the event loop
+        acquiring = _slot_waiters.submit(self.semaphore.acquire)
+        try:
+            await asyncio.wrap_future(acquiring)
+        except asyncio.CancelledError:
+            # A wait already under way still takes its slot; hand it back once it does
+            acquiring.add_done_callback(lambda f: f.cancelled() or f.exception() or self.semaphore.release())
+            raise
+        try:
+            return await self.llm.ainvoke(messages, **kwargs)
+        finally:
+            self.semaphore.release()
+
+    def with_structured_output(self, schema: Any, **kwargs: Any) -> "SharedLimitLLM":
+        return SharedLimitLLM(self.llm.with_structured_output(schema, **kwargs), self.semaphore)
+
+    def __getattr__(self, name: str) -> Any:
+        # model_name and other attributes of the wrapped model
+        return getattr(self.llm, name)
+
+
+class BatchAnalyzer:
+    """Analyze many contracts non-interactively across a process pool"""
+
+    def __init__(
+        self,
+        output_dir: str = ".",
+        workers: Optional[int] = None,
+        llm_concurrency: int = 8,
+        cache_path: Optional[str] = None,
+        checkpoint_path: Optional[str] = None,
+        dedup: bool = False,
+        force: bool = False,
+        quiet: bool = True,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        metrics_path: Optional[str] = None,
+        report_format: str = "json",
+        index_path: Optional[str] = None,
+        **workflow_options: Any,
+    ):
+        """
+        Args:
+            output_dir: Directory receiving one contract_analysis_<name>.<format> per document
+            workers: Worker processes (defaults to the number of CPUs)
+            llm_concurrency: Maximum LLM requests in flight across all workers
+            cache_path: SQLite clause cache shared by the workers (None disables caching)
+            checkpoint_path: SQLite checkpoint store; interrupted documents resume from
+                their last checkpoint on the next run (None disables checkpointing)
+            dedup: Reuse analyses of near-duplicate clauses within each worker
+            force: Re-analyze documents whose report already exists
+            quiet: Hide the per-clause progress output of the workers
+            requests_per_minute: Provider request limit, split evenly across the workers,
+                each of which schedules its requests with adaptive concurrency and backoff
+            tokens_per_minute: Provider token limit, split across the workers the same way
+            metrics_path: JSON lines file all workers append their stage, clause and LLM request spans to
+            report_format: "json", "ndjson" (streamed clause by clause while the document is
+                analyzed; interrupted documents start over instead of resuming from a
+                checkpoint) or "msgpack" (compact columnar file, see write_corpus)
+            index_path: SQLite clause index that each report is added to as soon as it is written
+            workflow_options: Extra ContractAnalysisWorkflow arguments, e.g. engine="batched"
+        """
+        if llm_concurrency < 1:
+            raise ValueError("llm_concurrency must be at least 1")
+        if report_format not in EXTENSIONS:
+            raise ValueError(f"Unknown report format: {report_format}")
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.llm_concurrency = llm_concurrency
+        self.cache_path = cache_path
+        self.checkpoint_path = checkpoint_path
+        self.dedup = dedup
+        self.force = force
+        self.quiet = quiet
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.metrics_path = metrics_path
+        self.report_format = report_format
+        self.index_path = index_path
+        self.workflow_options = workflow_options
+
+    @staticmethod
+    def find_documents(source: str) -> List[str]:
+        """
+        List the contracts to analyze
+
+        Args:
+            source: A directory (its PDF and text files are used) or a manifest
+                file with one path per line; relative paths are resolved against
+                the manifest's directory, blank lines and lines starting with # are ignored
+
+        Returns:
+            Document paths in a stable order
+        """
+        if os.path.isdir(source):
+            return sorted(
+                os.path.join(source, name)
+                for name in os.listdir(source)
+                if name.lower().endswith(CONTRACT_EXTENSIONS) and os.path.isfile(os.path.join(source, name))
+            )
+        base_dir = os.path.dirname(os.path.abspath(source))
+        documents = []
+        with open(source, "r", encoding="utf-8") as manifest:
+            for line in manifest:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    documents.append(os.path.join(base_dir, line))
+        return documents
+
+    def output_path(self, file_path: str) -> str:
+        """Report location for a document, named like the interactive mode's default"""
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        return os.path.join(self.output_dir, f"contract_analysis_{name}{EXTENSIONS[self.report_format]}")
+
+    def plan(self, source: str) -> Tuple[List[str], List[str]]:
+        """
+        Split the documents of a source into those to analyze and those already complete
+
+        Returns:
+            (pending documents, skipped documents)
+        """
+        documents = self.find_documents(source)
+        outputs: Dict[str, str] = {}
+        for file_path in documents:
+            output = self.output_path(file_path)
+            if output in outputs:
+                raise ValueError(f"{file_path} and {outputs[output]} would both be written to {output}")
+            outputs[output] = file_path
+
+        if self.force:
+            return documents, []
+        pending = [file_path for file_path in documents if not os.path.exists(self.output_path(file_path))]
+        skipped = [file_path for file_path in documents if os.path.exists(self.output_path(file_path))]
+        return pending, skipped
+
+    def run(self, source: str) -> BatchSummary:
+        """Analyze every pending document of a directory or manifest and print the throughput"""
+        pending, skipped = self.plan(source)
+        os.makedirs(self.output_dir, exist_ok=True)
+        print(f"📂 {len(pending)} documents to analyze, {len(skipped)} already complete")
+
+        summary = BatchSummary(total_documents=len(pending) + len(skipped), skipped=len(skipped))
+        index = ClauseIndex(self.index_path) if self.index_path and pending else None
+        start = time.perf_counter()
+        if pending:
+            with multiprocessing.Manager() as manager:
+                semaphore = manager.BoundedSemaphore(self.llm_concurrency)
+                options = {
+                    "max_concurrency": self.llm_concurrency,
+                    "console": not self.quiet,
+                    **self.workflow_options,
+                }
+                workers = min(self.workers, len(pending))
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    initializer=_init_worker,
+                    initargs=(semaphore, options, self.cache_path, self.checkpoint_path, self.dedup,
+                              self._worker_rate_limits(workers), self.metrics_path),
+                ) as pool:
+                    futures = {
+                        pool.submit(_analyze_document, file_path, self.output_path(file_path)): file_path
+                        for file_path in pending
+                    }
+                    for done, future in enumerate(as_completed(futures), 1):
+                        file_path = futures[future]
+                        try:
+                            clauses = future.result()
+                        except Exception as e:
+                            summary.failed.append(file_path)
+                            print(f"❌ [{done}/{len(pending)}] {file_path}: {str(e)}")
+                            continue
+                        summary.analyzed += 1
+                        summary.clauses += clauses
+                        print(f"✅ [{done}/{len(pending)}] {file_path} ({clauses} clauses)")
+                        if index is not None:
+                            self._index_report(index, file_path)
+        summary.elapsed_seconds = time.perf_counter() - start
+        if index is not None:
+            index.close()
+
+        self._print_summary(summary)
+        return summary
+
+    def _index_report(self, index: ClauseIndex, file_path: str) -> None:
+        """Make a finished report searchable; a failure here does not fail the document"""
+        try:
+            index.add_report_file(self.output_path(file_path), metadata={"source": os.path.abspath(file_path)})
+        except Exception as e:
+            print(f"⚠️  Could not index {self.output_path(file_path)}: {str(e)}")
+
+    def export_corpus(self, source: str, path: str) -> int:
+        """
+        Collect the reports of a source's documents into one compact corpus file
+
+        Documents without a report (not analyzed yet, or failed) are left out.
+
+        Returns:
+            Number of reports exported
+        """
+        reports = {}
+        for file_path in self.find_documents(source):
+            output = self.output_path(file_path)
+            if os.path.exists(output):
+                reports[os.path.basename(file_path)] = read_report(output)
+        write_corpus(reports, path)
+        return len(reports)
+
+    def _worker_rate_limits(self, workers: int) -> Optional[Dict[str, float]]:
+        """Each worker's share of the provider limits, or None when no limits are set"""
+        if self.requests_per_minute is None and self.tokens_per_minute is None:
+            return None
+        return {
+            "requests_per_minute": self.requests_per_minute / workers if self.requests_per_minute else None,
+            "tokens_per_minute": self.tokens_per_minute / workers if self.tokens_per_minute else None,
+        }
+
+    @staticmethod
+    def _print_summary(summary: BatchSummary) -> None:
+        seconds = max(summary.elapsed_seconds, 1e-9)
+        print("\n📊 Batch complete")
+        print(f"   Analyzed: {summary.analyzed}, skipped: {summary.skipped}, failed: {len(summary.failed)}")
+        print(f"   Elapsed: {summary.elapsed_seconds:.1f}s")
+        print(f"   Throughput: {summary.analyzed / seconds * 60:.1f} documents/min, "
+              f"{summary.clauses / seconds:.2f} clauses/s")
+
+
+# Per-process workflow of the pool workers
+_worker_workflow: Optional[ContractAnalysisWorkflow] = None
+
+
+def _init_worker(
+    semaphore: Any,
+    options: Dict[str, Any],
+    cache_path: Optional[str],
+    checkpoint_path: Optional[str],
+    dedup: bool,
+    rate_limits: Optional[Dict[str, float]] = None,
+    metrics_path: Optional[str] = None,
+) -> None:
+    """Build one workflow per worker process, sharing the global LLM semaphore"""
+    from .checkpoints import AnalysisCheckpoints
+    from .metrics import WorkflowMetrics
+    
+    global _worker_workflow
+    scheduler = RequestScheduler(**rate_limits) if rate_limits else None
+    workflow = ContractAnalysisWorkflow(
+        cache=ClauseCache(cache_path) if cache_path else None,
+        checkpoints=AnalysisCheckpoints(checkpoint_path) if checkpoint_path else None,
+        dedup=NearDuplicateIndex() if dedup else None,
+        scheduler=scheduler,
+        metrics=WorkflowMetrics(jsonl_path=metrics_path) if metrics_path else None,
+        **options,
+    )
+    if scheduler is None:
+        workflow.llm = SharedLimitLLM(workflow.llm, semaphore)
+    else:
+        # Back off outside the shared semaphore, so a throttled worker does not hold a slot while it waits
+        workflow.llm = scheduler.wrap(SharedLimitLLM(workflow.llm.llm, semaphore))
+    _worker_workflow = workflow
+
+
+def _analyze_document(file_path: str, output_file: str) -> int:
+    """Analyze one document in a worker and write its report; returns the clause count"""
+    if report_format(output_file) == "ndjson":
+        # Each clause is written as soon as it is analyzed
+        with NDJSONReportWriter(output_file) as writer:
+            report = asyncio.run(_worker_workflow.arun_streaming(file_path, on_analysis=writer.write_clause))
+            writer.finish(report)
+        return report.total_clauses
+    report = _worker_workflow.run(file_path, resume=True)
+    write_report(report, output_file)
+    return report.total_clauses
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from .models import ClauseAnalysis
+from .spans import Clause
+
+
+class ClauseCache:
+    """Persistent, content-addressed cache of clause analyses backed by SQLite"""
+
+    # Run eviction after this many writes
+    EVICTION_INTERVAL = 100
+
+    def __init__(
+        self,
+        path: str = "clause_cache.sqlite3",
+        max_entries: int = 50_000,
+        max_age_seconds: Optional[float] = 30 * 24 * 3600,
+    ):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+            max_entries: Least recently used entries beyond this count are evicted
+            max_age_seconds: Entries older than this are evicted (None disables age eviction)
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS clause_analyses (
+                    key TEXT PRIMARY KEY,
+                    prompt_version TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    analysis TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_clause_analyses_accessed ON clause_analyses (accessed_at)"
+            )
+        self.evict()
+
+    @staticmethod
+    def normalize(clause: Clause) -> str:
+        """Normalize clause text so formatting-only differences share a cache entry"""
+        return " ".join(str(clause).split())
+
+    @classmethod
+    def make_key(cls, clause: Clause, prompt_version: str, model: str, engine: str) -> str:
+        """Build the content address for a clause analysis"""
+        digest = hashlib.sha256()
+        for part in (engine, prompt_version, model, cls.normalize(clause)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def get(self, clause: Clause, prompt_version: str, model: str, engine: str) -> Optional[ClauseAnalysis]:
+        """
+        Look up a cached analysis
+
+        Returns:
+            The cached ClauseAnalysis (with ``clause`` set to the given text), or None on a miss
+        """
+        key = self.make_key(clause, prompt_version, model, engine)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT analysis, created_at FROM clause_analyses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self._is_expired(row[1], now):
+                self._conn.execute("DELETE FROM clause_analyses WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE clause_analyses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return ClauseAnalysis(clause=clause, **json.loads(row[0]))
+
+    def put(self, analysis: ClauseAnalysis, prompt_version: str, model: str, engine: str) -> None:
+        """Store an analysis for its clause text"""
+        key = self.make_key(analysis.clause, prompt_version, model, engine)
+        payload = json.dumps(analysis.model_dump(exclude={"clause"}), ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO clause_analyses
+                   (key, prompt_version, model, analysis, created_at, accessed_at)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (key, prompt_version, model, payload, now, now),
+            )
+            self._conn.commit()
+            self._writes += 1
+            should_evict = self._writes % self.EVICTION_INTERVAL == 0
+        if should_evict:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Remove expired entries and trim the cache to max_entries
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        with self._lock, self._conn:
+            if self.max_age_seconds is not None:
+                cutoff = time.time() - self.max_age_seconds
+                removed += self._conn.execute(
+                    "DELETE FROM clause_analyses WHERE created_at < ?", (cutoff,)
+                ).rowcount
+            overflow = self._count() - self.max_entries
+            if overflow > 0:
+                removed += self._conn.execute(
+                    """DELETE FROM clause_analyses WHERE key IN (
+                           SELECT key FROM clause_analyses ORDER BY accessed_at ASC LIMIT ?
+                       )""",
+                    (overflow,),
+                ).rowcount
+        return removed
+
+    def invalidate(self, current_prompt_version: Optional[str] = None) -> int:
+        """
+        Drop cached analyses produced by outdated prompts
+
+        Args:
+            current_prompt_version: Keep only entries with this prompt version.
+                If None, the whole cache is cleared.
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock, self._conn:
+            if current_prompt_version is None:
+                return self._conn.execute("DELETE FROM clause_analyses").rowcount
+            return self._conn.execute(
+                "DELETE FROM clause_analyses WHERE prompt_version != ?", (current_prompt_version,)
+            ).rowcount
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for this process plus the number of stored entries"""
+        with self._lock:
+            entries = self._count()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM clause_analyses").fetchone()[0]
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.max_age_seconds is not None and created_at < now - self.max_age_seconds
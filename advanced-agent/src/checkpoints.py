@@ -0,0 +1,158 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Mapping, Sequence
+
+import aiosqlite
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+from .models import ClauseAlignment, ClauseAnalysis, ContractReport, ContractState, RevisionSummary
+from .spans import Clause
+
+
+class AnalysisCheckpoints:
+    """
+    Durable LangGraph checkpoints of contract analyses, stored in SQLite
+
+    Each document is a checkpoint thread. The graph is checkpointed after each of
+    its few stages, and every clause analysis is saved on its own row as soon as
+    it finishes, so an interrupted run loses no completed clause and the data
+    written grows linearly with the number of clauses. A thread is deleted once
+    its report is done, so the database only holds interrupted analyses.
+    """
+
+    def __init__(self, path: str = "analysis_checkpoints.sqlite3"):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+        """
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # Clause spans are not msgpack types and fall back to pickle
+        self.serde = JsonPlusSerializer(
+            pickle_fallback=True,
+            allowed_msgpack_modules=[(model.__module__, model.__name__) for model in (ClauseAnalysis, ContractReport, ContractState, ClauseAlignment, RevisionSummary)],
+        )
+        self.saver = SqliteSaver(sqlite3.connect(path, check_same_thread=False), serde=self.serde)
+        # Clause analyses get their own connection; the savers' connections commit graph checkpoints
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            # A commit per finished clause; WAL keeps each one to an append without an fsync
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS clause_checkpoints (
+                       thread_id TEXT NOT NULL,
+                       position INTEGER NOT NULL,
+                       analysis TEXT NOT NULL,
+                       PRIMARY KEY (thread_id, position)
+                   )"""
+            )
+            self._conn.commit()
+
+    @asynccontextmanager
+    async def async_saver(self) -> AsyncIterator[AsyncSqliteSaver]:
+        """Async checkpointer on the same database, for graphs run with ainvoke"""
+        conn = await aiosqlite.connect(self.path)
+        try:
+            yield AsyncSqliteSaver(conn, serde=self.serde)
+        finally:
+            await conn.close()
+
+    @staticmethod
+    def thread_id(file_path: str, *settings: str) -> str:
+        """
+        Checkpoint thread of a document
+
+        The file's path, size and modification time are part of the id, so an edited
+        contract starts over instead of resuming from analyses of the old version.
+
+        Args:
+            file_path: Contract file
+            settings: Analysis settings that must match to resume (engine, prompt version, ...)
+        """
+        stat = os.stat(file_path)
+        digest = hashlib.sha256()
+        for part in (os.path.abspath(file_path), str(stat.st_size), str(stat.st_mtime_ns), *settings):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()[:32]
+
+    def save_analyses(self, thread_id: str, analyses: Mapping[int, ClauseAnalysis]) -> None:
+        """
+        Make finished clause analyses durable
+
+        Args:
+            thread_id: Checkpoint thread of the document
+            analyses: Analyses by clause index; their clause text is not stored
+        """
+        if not analyses:
+            return
+        rows = [
+            (thread_id, position, analysis.model_dump_json(exclude={"clause"}))
+            for position, analysis in analyses.items()
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO clause_checkpoints (thread_id, position, analysis) VALUES (?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    async def asave_analyses(self, thread_id: str, analyses: Mapping[int, ClauseAnalysis]) -> None:
+        """
+        save_analyses() for graphs run with ainvoke
+
+        Runs in a worker thread: writing on the event loop would block the async
+        checkpointer from committing its pending write, so both connections would
+        wait on the database lock until SQLite gives up.
+        """
+        await asyncio.to_thread(self.save_analyses, thread_id, analyses)
+
+    def load_analyses(self, thread_id: str, clauses: Sequence[Clause]) -> Dict[int, ClauseAnalysis]:
+        """
+        Clause analyses saved for a thread, by clause index
+
+        Args:
+            thread_id: Checkpoint thread of the document
+            clauses: Clauses of the document, whose text the analyses are restored with
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT position, analysis FROM clause_checkpoints WHERE thread_id = ?", (thread_id,)
+            ).fetchall()
+        return {
+            position: ClauseAnalysis.model_validate({**json.loads(analysis), "clause": clauses[position]})
+            for position, analysis in rows
+            if position < len(clauses)
+        }
+
+    async def aload_analyses(self, thread_id: str, clauses: Sequence[Clause]) -> Dict[int, ClauseAnalysis]:
+        """load_analyses() for graphs run with ainvoke, in a worker thread like asave_analyses"""
+        return await asyncio.to_thread(self.load_analyses, thread_id, clauses)
+
+    def count_analyses(self, thread_id: str) -> int:
+        """Number of clause analyses saved for a thread"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM clause_checkpoints WHERE thread_id = ?", (thread_id,)
+            ).fetchone()[0]
+
+    def delete(self, thread_id: str) -> None:
+        """Forget a thread, e.g. once its report is complete"""
+        self.saver.delete_thread(thread_id)
+        with self._lock:
+            self._conn.execute("DELETE FROM clause_checkpoints WHERE thread_id = ?", (thread_id,))
+            self._conn.commit()
+
+    def close(self) -> None:
+        self.saver.conn.close()
+        self._conn.close()
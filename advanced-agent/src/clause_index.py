@@ -0,0 +1,380 @@
+import glob
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from .models import ClauseAnalysis, ClauseHit, ContractReport
+from .report_formats import FORMATS, document_name, read_corpus, read_report, report_format
+
+# Clause fields with their own columns; the other fields are kept as JSON
+_COLUMNS = ("clause", "summary", "is_risky", "risk_reason", "suggestion")
+
+# Columns of a search result, in the order _hit expects them
+_HIT_COLUMNS = "d.name, d.report_path, d.analyzed_at, d.metadata, c.position, " + ", ".join(f"c.{c}" for c in _COLUMNS) + ", c.extra"
+
+# Words of a search, with an optional trailing * for prefix matches
+_TERM = re.compile(r"\w+\*?", re.UNICODE)
+
+
+class ClauseIndex:
+    """
+    Persistent full-text index of clause analyses across reports, backed by SQLite FTS5
+
+    Clause text, summary and risk reason are searchable (with stemming, so
+    "indemnify" also finds "indemnified"), and results can be filtered on
+    riskiness, document, analysis date and document metadata. Reports are indexed
+    one document at a time; re-indexing a document replaces its clauses, so the
+    index can be kept current as reports are produced.
+    """
+
+    def __init__(self, path: str = "clause_index.sqlite3"):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    id INTEGER PRIMARY KEY,
+                    key TEXT NOT NULL UNIQUE,
+                    name TEXT NOT NULL,
+                    report_path TEXT,
+                    analyzed_at REAL NOT NULL,
+                    file_mtime_ns INTEGER,
+                    file_size INTEGER,
+                    metadata TEXT NOT NULL DEFAULT '{}'
+                );
+                CREATE INDEX IF NOT EXISTS idx_documents_analyzed ON documents (analyzed_at);
+                CREATE INDEX IF NOT EXISTS idx_documents_name ON documents (name);
+
+                CREATE TABLE IF NOT EXISTS clauses (
+                    id INTEGER PRIMARY KEY,
+                    document_id INTEGER NOT NULL REFERENCES documents (id),
+                    position INTEGER NOT NULL,
+                    clause TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    is_risky INTEGER NOT NULL,
+                    risk_reason TEXT NOT NULL,
+                    suggestion TEXT NOT NULL,
+                    extra TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_clauses_document ON clauses (document_id, position);
+                CREATE INDEX IF NOT EXISTS idx_clauses_risky ON clauses (is_risky, document_id);
+
+                CREATE VIRTUAL TABLE IF NOT EXISTS clause_text USING fts5(
+                    clause, summary, risk_reason,
+                    content='clauses', content_rowid='id', tokenize='porter unicode61'
+                );
+                CREATE TRIGGER IF NOT EXISTS clauses_insert AFTER INSERT ON clauses BEGIN
+                    INSERT INTO clause_text (rowid, clause, summary, risk_reason)
+                    VALUES (new.id, new.clause, new.summary, new.risk_reason);
+                END;
+                CREATE TRIGGER IF NOT EXISTS clauses_delete AFTER DELETE ON clauses BEGIN
+                    INSERT INTO clause_text (clause_text, rowid, clause, summary, risk_reason)
+                    VALUES ('delete', old.id, old.clause, old.summary, old.risk_reason);
+                END;
+                """
+            )
+
+    def add_report(
+        self,
+        document: str,
+        report: ContractReport,
+        report_path: Optional[str] = None,
+        analyzed_at: Optional[float] = None,
+        metadata: Optional[Mapping[str, Any]] = None,
+        key: Optional[str] = None,
+    ) -> None:
+        """
+        Index the clauses of a report, replacing any earlier version of the document
+
+        Args:
+            document: Document name shown in search results
+            report: Report to index
+            report_path: File the report was saved to, if any
+            analyzed_at: Time the report was produced (defaults to now)
+            metadata: Document attributes to filter on, e.g. {"client": "Acme", "type": "NDA"}
+            key: Identity of the document in the index (defaults to report_path, then document)
+        """
+        self._add_report(key or report_path or document, document, report, report_path, analyzed_at, metadata, None)
+
+    def add_report_file(self, report_path: str, metadata: Optional[Mapping[str, Any]] = None) -> int:
+        """
+        Index a saved report (JSON, NDJSON or msgpack corpus) unless it is already indexed unchanged
+
+        Returns:
+            Number of reports (re)indexed
+        """
+        report_path = os.path.abspath(report_path)
+        stat = os.stat(report_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if report_format(report_path) == "msgpack":
+            reports = [(f"{report_path}#{name}", name, report) for name, report in read_corpus(report_path).items()]
+            # Documents dropped from a rewritten corpus
+            with self._lock:
+                known = self._conn.execute(
+                    "SELECT key FROM documents WHERE report_path = ? AND file_mtime_ns IS NOT ?",
+                    (report_path, stat.st_mtime_ns),
+                ).fetchall()
+            current = {key for key, _, _ in reports}
+            for (key,) in known:
+                if key not in current:
+                    self.remove(key)
+        else:
+            reports = [(report_path, document_name(report_path), None)]
+
+        indexed = 0
+        for key, name, report in reports:
+            if self._signature(key) == signature:
+                continue
+            if report is None:
+                report = read_report(report_path)
+            self._add_report(key, name, report, report_path, stat.st_mtime, metadata, signature)
+            indexed += 1
+        return indexed
+
+    def update(self, directory: str, pattern: str = "contract_analysis_*") -> int:
+        """
+        Bring the index up to date with the reports saved in a directory
+
+        New and modified report files are (re)indexed and documents whose report
+        file was deleted are removed, so repeated calls only cost a directory scan.
+
+        Returns:
+            Number of reports (re)indexed
+        """
+        directory = os.path.abspath(directory)
+        paths = [
+            path for path in sorted(glob.glob(os.path.join(directory, pattern)))
+            if os.path.splitext(path)[1].lower() in FORMATS
+        ]
+        indexed = sum(self.add_report_file(path) for path in paths)
+
+        with self._lock:
+            known = self._conn.execute(
+                "SELECT key, report_path FROM documents WHERE report_path LIKE ? ESCAPE '\\'",
+                (_like_prefix(directory + os.sep),),
+            ).fetchall()
+        for key, report_path in known:
+            if os.path.dirname(report_path) == directory and not os.path.exists(report_path):
+                self.remove(key)
+        return indexed
+
+    def remove(self, key: str) -> bool:
+        """Drop a document and its clauses; returns whether it was indexed"""
+        with self._lock, self._conn:
+            return self._delete(key)
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        risky: Optional[bool] = None,
+        document: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        metadata: Optional[Mapping[str, Any]] = None,
+        limit: int = 50,
+    ) -> List[ClauseHit]:
+        """
+        Find clause analyses
+
+        Args:
+            query: Words that must all occur in the clause text, summary or risk reason;
+                a trailing * matches word prefixes ("indemn*"). None lists clauses without ranking
+            risky: Only risky (True) or only non-risky (False) clauses
+            document: Only clauses of the document with this name
+            since: Only reports analyzed at or after this Unix time
+            until: Only reports analyzed before this Unix time
+            metadata: Only documents whose metadata has these values
+            limit: Maximum number of results
+
+        Returns:
+            Matches, best first for a text query, otherwise newest document first in clause order
+        """
+        terms = _fts_query(query) if query else None
+        if query and not terms:
+            return []
+        document_filters: List[str] = []
+        document_params: List[Any] = []
+        if document is not None:
+            document_filters.append("d.name = ?")
+            document_params.append(document)
+        if since is not None:
+            document_filters.append("d.analyzed_at >= ?")
+            document_params.append(since)
+        if until is not None:
+            document_filters.append("d.analyzed_at < ?")
+            document_params.append(until)
+        for name, value in (metadata or {}).items():
+            document_filters.append("json_extract(d.metadata, ?) = ?")
+            document_params.extend([f'$."{name}"', value])
+        clause_filters = ["c.is_risky = ?"] if risky is not None else []
+        clause_params = [int(risky)] if risky is not None else []
+
+        with self._lock:
+            if terms:
+                return self._ranked_search(terms, document, document_filters, document_params,
+                                           clause_filters, clause_params, limit)
+            # Documents newest first, each in clause order; the join order lets SQLite
+            # walk the indexes instead of sorting every matching clause
+            where = " AND ".join(document_filters + clause_filters) or "1"
+            rows = self._conn.execute(
+                f"""SELECT {_HIT_COLUMNS}, NULL, NULL
+                    FROM documents d CROSS JOIN clauses c ON c.document_id = d.id
+                    WHERE {where} ORDER BY d.analyzed_at DESC, d.id DESC, c.position LIMIT ?""",
+                (*document_params, *clause_params, limit),
+            ).fetchall()
+        return [self._hit(row) for row in rows]
+
+    def _ranked_search(
+        self,
+        terms: str,
+        document: Optional[str],
+        document_filters: List[str],
+        document_params: List[Any],
+        clause_filters: List[str],
+        clause_params: List[Any],
+        limit: int,
+    ) -> List[ClauseHit]:
+        """Text search ranked by BM25; the caller holds the lock"""
+        conditions = ["clause_text MATCH ?"] + clause_filters + document_filters
+        params: List[Any] = [terms, *clause_params, *document_params]
+        if document is not None:
+            # A document's clauses have consecutive ids, so FTS5 only has to look at that range
+            first, last = self._conn.execute(
+                "SELECT MIN(c.id), MAX(c.id) FROM documents d JOIN clauses c ON c.document_id = d.id WHERE d.name = ?",
+                (document,),
+            ).fetchone()
+            if first is None:
+                return []
+            conditions.append("clause_text.rowid BETWEEN ? AND ?")
+            params.extend([first, last])
+        joins = ""
+        if clause_filters or document_filters:
+            joins += " JOIN clauses c ON c.id = clause_text.rowid"
+        if document_filters:
+            joins += " JOIN documents d ON d.id = c.document_id"
+        ranked = self._conn.execute(
+            f"""SELECT clause_text.rowid, bm25(clause_text) AS score FROM clause_text{joins}
+                WHERE {" AND ".join(conditions)} ORDER BY score LIMIT ?""",
+            (*params, limit),
+        ).fetchall()
+        if not ranked:
+            return []
+
+        # Details and snippets of the returned clauses only
+        ids = [clause_id for clause_id, _ in ranked]
+        rows = {
+            row[0]: row[1:]
+            for row in self._conn.execute(
+                f"""SELECT c.id, {_HIT_COLUMNS} FROM clauses c JOIN documents d ON d.id = c.document_id
+                    WHERE c.id IN ({", ".join("?" * len(ids))})""",
+                ids,
+            )
+        }
+        hits = []
+        for clause_id, score in ranked:
+            snippet = self._conn.execute(
+                "SELECT snippet(clause_text, -1, '[', ']', '…', 16) FROM clause_text WHERE clause_text MATCH ? AND rowid = ?",
+                (terms, clause_id),
+            ).fetchone()[0]
+            hits.append(self._hit((*rows[clause_id], score, snippet)))
+        return hits
+
+    def stats(self) -> Dict[str, int]:
+        """Number of indexed documents, clauses and risky clauses"""
+        with self._lock:
+            documents = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            clauses, risky = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(is_risky), 0) FROM clauses").fetchone()
+        return {"documents": documents, "clauses": clauses, "risky_clauses": risky}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _add_report(
+        self,
+        key: str,
+        name: str,
+        report: ContractReport,
+        report_path: Optional[str],
+        analyzed_at: Optional[float],
+        metadata: Optional[Mapping[str, Any]],
+        signature: Optional[Tuple[int, int]],
+    ) -> None:
+        mtime_ns, size = signature or (None, None)
+        rows = []
+        for position, analysis in enumerate(report.clauses):
+            values = analysis.model_dump(mode="json")
+            extra = {field: value for field, value in values.items() if field not in _COLUMNS}
+            rows.append((
+                position, values["clause"], analysis.summary, int(analysis.is_risky), analysis.risk_reason,
+                analysis.suggestion, json.dumps(extra, ensure_ascii=False),
+            ))
+        # One transaction per document, so searches never see it half indexed
+        with self._lock, self._conn:
+            self._delete(key)
+            document_id = self._conn.execute(
+                """INSERT INTO documents (key, name, report_path, analyzed_at, file_mtime_ns, file_size, metadata)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (key, name, report_path, analyzed_at if analyzed_at is not None else time.time(), mtime_ns, size,
+                 json.dumps(dict(metadata or {}), ensure_ascii=False)),
+            ).lastrowid
+            self._conn.executemany(
+                """INSERT INTO clauses (document_id, position, clause, summary, is_risky, risk_reason, suggestion, extra)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                [(document_id, *row) for row in rows],
+            )
+
+    def _delete(self, key: str) -> bool:
+        row = self._conn.execute("SELECT id FROM documents WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return False
+        self._conn.execute("DELETE FROM clauses WHERE document_id = ?", (row[0],))
+        self._conn.execute("DELETE FROM documents WHERE id = ?", (row[0],))
+        return True
+
+    def _signature(self, key: str) -> Optional[Tuple[int, int]]:
+        """Modification time and size of the report file when the document was indexed"""
+        with self._lock:
+            row = self._conn.execute("SELECT file_mtime_ns, file_size FROM documents WHERE key = ?", (key,)).fetchone()
+        return (row[0], row[1]) if row is not None and row[0] is not None else None
+
+    @staticmethod
+    def _hit(row: Tuple[Any, ...]) -> ClauseHit:
+        name, report_path, analyzed_at, metadata, position = row[:5]
+        clause, summary, is_risky, risk_reason, suggestion, extra, score, snippet = row[5:]
+        analysis = ClauseAnalysis(
+            clause=clause, summary=summary, is_risky=bool(is_risky), risk_reason=risk_reason,
+            suggestion=suggestion, **json.loads(extra),
+        )
+        return ClauseHit(
+            document=name, report_path=report_path, position=position, analysis=analysis,
+            analyzed_at=analyzed_at, metadata=json.loads(metadata), score=score, snippet=snippet,
+        )
+
+
+def _fts_query(query: str) -> str:
+    """FTS5 query requiring every word of a free-text search; quoting keeps punctuation from being parsed as syntax"""
+    terms = []
+    for term in _TERM.findall(query):
+        prefix = term.endswith("*")
+        word = term.rstrip("*")
+        terms.append(f'"{word}"*' if prefix else f'"{word}"')
+    return " ".join(terms)
+
+
+def _like_prefix(prefix: str) -> str:
+    """LIKE pattern matching strings that start with prefix"""
+    return prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
@@ -1,24 +1,81 @@
 import re
-from typing import List
+from typing import Iterable, Iterator, List, Optional, Pattern, Tuple, TypeVar
+
+from .spans import ClauseSpans
+
+T = TypeVar("T")
 
 
 class ClauseSplitter:
     """Split contract text into individual clauses using regex patterns"""
     
     def __init__(self):
-        # Common clause numbering patterns
-        self.clause_patterns = [
-            r'\n(?=\d+\.)',  # Numbered clauses: "1.", "2.", etc.
-            r'\n(?=\d+\))',  # Numbered clauses with parentheses: "1)", "2)", etc.
-            r'\n(?=[A-Z]\.)',  # Lettered clauses: "A.", "B.", etc.
-            r'\n(?=[IVX]+\.)',  # Roman numeral clauses: "I.", "II.", "III.", etc.
-            r'\n(?=Section \d+)',  # Section clauses: "Section 1", "Section 2", etc.
-            r'\n(?=Clause \d+)',  # Explicit clause markers: "Clause 1", "Clause 2", etc.
-            r'\n(?=Article \d+)',  # Article clauses: "Article 1", "Article 2", etc.
+        # Common clause numbering markers, in order of preference
+        self.clause_markers = [
+            r'\d+\.',  # Numbered clauses: "1.", "2.", etc.
+            r'\d+\)',  # Numbered clauses with parentheses: "1)", "2)", etc.
+            r'[A-Z]\.',  # Lettered clauses: "A.", "B.", etc.
+            r'[IVX]+\.',  # Roman numeral clauses: "I.", "II.", "III.", etc.
+            r'Section \d+',  # Section clauses: "Section 1", "Section 2", etc.
+            r'Clause \d+',  # Explicit clause markers: "Clause 1", "Clause 2", etc.
+            r'Article \d+',  # Article clauses: "Article 1", "Article 2", etc.
         ]
         
+        # A clause starts on a new line that begins with one of the markers
+        self.clause_patterns = [rf'\n(?={marker})' for marker in self.clause_markers]
+        
         # Alternative sentence-based splitting for contracts without clear numbering
         self.sentence_pattern = r'(?<=[.!?])\s+(?=[A-Z])'
+        
+        # Common header/footer patterns (matched against lowercased text)
+        self.header_footer_patterns = [
+            r'page \d+$',
+            r'\d+$',
+            r'confidential$',
+            r'draft$',
+            r'final$',
+            r'version \d+',
+            r'revised',
+            r'effective date:',
+            r'execution date:',
+        ]
+        
+        # Keywords that suggest a clause break in unnumbered text
+        self.break_keywords = [
+            'provided that',
+            'provided, however,',
+            'further provided',
+            'in addition',
+            'moreover',
+            'furthermore',
+            'additionally',
+            'notwithstanding',
+            'subject to',
+            'except as',
+            'unless otherwise',
+        ]
+        
+        # Amount of text iter_clauses reads before choosing a numbering pattern
+        self.decision_window = 20000
+        
+        self._compile()
+    
+    def _compile(self):
+        """
+        Precompile the matchers used on every document
+        
+        The boundary scanner matches any newline followed by a clause marker and
+        records, in one capture group per marker, which numbering schemes start
+        there. A single pass therefore finds the split points of every scheme.
+        """
+        self._clause_regexes = [re.compile(pattern) for pattern in self.clause_patterns]
+        self._boundary_regex = re.compile(
+            r'\n(?=' + '|'.join(self.clause_markers) + ')'
+            + ''.join(f'(?:(?=({marker}))|)' for marker in self.clause_markers)
+        )
+        self._sentence_regex = re.compile(self.sentence_pattern)
+        self._header_footer_regex = re.compile('|'.join(f'(?:{pattern})' for pattern in self.header_footer_patterns))
+        self._break_keyword_regex = re.compile('|'.join(re.escape(keyword) for keyword in self.break_keywords))
     
     def split_clauses(self, contract_text: str) -> List[str]:
         """
@@ -30,24 +87,157 @@ class ClauseSplitter:
         Returns:
             List of individual clauses
         """
-        if not contract_text.strip():
-            return []
+        return self.split_clause_spans(contract_text).to_list()
+    
+    def split_clause_spans(self, contract_text: str) -> ClauseSpans:
+        """
+        Split contract text into clauses without copying their text
+        
+        Produces the same clauses as split_clauses, stored as offsets into
+        contract_text; text is only built when a clause is used.
+        
+        Args:
+            contract_text: Raw contract text
+            
+        Returns:
+            ClauseSpans over contract_text
+        """
+        if not contract_text or contract_text.isspace():
+            return ClauseSpans(contract_text)
         
         # Try numbered clause patterns first
-        for pattern in self.clause_patterns:
-            clauses = re.split(pattern, contract_text)
-            if len(clauses) > 1:
-                # Filter out empty clauses and clean up
-                cleaned_clauses = self._clean_clauses(clauses)
-                if len(cleaned_clauses) > 1:
-                    return cleaned_clauses
+        spans, _ = self._split_numbered(contract_text)
+        if spans is not None:
+            return spans
         
         # Fallback to sentence-based splitting
-        sentences = re.split(self.sentence_pattern, contract_text)
-        cleaned_sentences = self._clean_clauses(sentences)
+        spans = ClauseSpans(contract_text)
+        sentences = self._iter_clean_spans(contract_text, self._iter_sentence_bounds(contract_text))
         
         # Group sentences into logical clauses (3-5 sentences per clause)
-        return self._group_sentences_into_clauses(cleaned_sentences)
+        for group in self._iter_sentence_group_members(
+            (contract_text[start:end], (start, end)) for start, end in sentences
+        ):
+            spans.append(group)
+        return spans
+    
+    def _split_numbered(self, text: str) -> Tuple[Optional[ClauseSpans], Optional[int]]:
+        """
+        Split text on the first numbering scheme that yields more than one clause
+        
+        Equivalent to trying re.split with each clause pattern in turn, but the
+        text is scanned only once for boundaries.
+        
+        Returns:
+            (cleaned clause spans, index of the scheme used), or (None, None) if no scheme applies
+        """
+        boundaries = [[] for _ in self.clause_markers]
+        for match in self._boundary_regex.finditer(text):
+            position = match.start()
+            for scheme, marker in enumerate(match.groups()):
+                if marker is not None:
+                    boundaries[scheme].append(position)
+        
+        for scheme, positions in enumerate(boundaries):
+            if not positions:
+                continue
+            bounds = list(self._iter_clean_spans(text, self._iter_piece_bounds(text, positions)))
+            if len(bounds) > 1:
+                spans = ClauseSpans(text)
+                spans.extend(bounds)
+                return spans, scheme
+        return None, None
+    
+    @staticmethod
+    def _iter_piece_bounds(text: str, positions: List[int]) -> Iterator[Tuple[int, int]]:
+        """Bounds of the pieces re.split would return when splitting on the newlines at positions"""
+        start = 0
+        for position in positions:
+            yield start, position
+            start = position + 1  # the newline itself is dropped, like re.split
+        yield start, len(text)
+    
+    def _iter_sentence_bounds(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Bounds of the pieces returned by splitting text into sentences"""
+        start = 0
+        for match in self._sentence_regex.finditer(text):
+            yield start, match.start()
+            start = match.end()
+        yield start, len(text)
+    
+    def _iter_clean_spans(self, text: str, bounds: Iterable[Tuple[int, int]]) -> Iterator[Tuple[int, int]]:
+        """Span counterpart of _clean_clauses: bounds of the kept, stripped pieces"""
+        for start, end in bounds:
+            piece = text[start:end]
+            clause = self._clean_clause(piece)
+            if clause is not None:
+                start += len(piece) - len(piece.lstrip())
+                yield start, start + len(clause)
+    
+    def iter_clauses(self, chunks: Iterable[str], separator: str = " ") -> Iterator[str]:
+        """
+        Incrementally split a stream of text chunks (e.g. pages) into clauses
+        
+        Each clause is yielded as soon as the start of the next one has been seen.
+        The numbering pattern is chosen from the first decision_window characters,
+        so for documents shorter than that the output matches split_clauses on the
+        joined chunks.
+        
+        Args:
+            chunks: Consecutive pieces of contract text
+            separator: Text inserted between chunks (" " for cleaned pages, "" for raw text)
+            
+        Yields:
+            Individual clauses
+        """
+        chunks = iter(chunks)
+        buffer, regex = self._choose_stream_pattern(chunks, separator)
+        
+        if regex is not None:
+            for clause in self._iter_split(buffer, chunks, regex, separator):
+                clause = self._clean_clause(clause)
+                if clause is not None:
+                    yield clause
+            return
+        
+        sentences = (
+            cleaned
+            for cleaned in map(self._clean_clause, self._iter_split(buffer, chunks, self._sentence_regex, separator))
+            if cleaned is not None
+        )
+        yield from self._iter_sentence_groups(sentences)
+    
+    def _choose_stream_pattern(self, chunks: Iterator[str], separator: str) -> Tuple[str, Optional[Pattern]]:
+        """
+        Read up to decision_window characters and pick the clause pattern for a stream
+        
+        Returns:
+            (text read so far, compiled clause pattern or None for sentence splitting)
+        """
+        parts = []
+        size = 0
+        for chunk in chunks:
+            parts.append(chunk)
+            size += len(chunk) + len(separator)
+            if size >= self.decision_window:
+                break
+        buffer = separator.join(parts)
+        
+        _, scheme = self._split_numbered(buffer)
+        if scheme is None:
+            return buffer, None
+        return buffer, self._clause_regexes[scheme]
+    
+    def _iter_split(self, buffer: str, chunks: Iterator[str], regex: Pattern, separator: str) -> Iterator[str]:
+        """
+        Split streamed text on a pattern, holding back the last piece until more text arrives
+        """
+        for chunk in chunks:
+            pieces = regex.split(buffer)
+            buffer = pieces.pop()
+            yield from pieces
+            buffer = f"{buffer}{separator}{chunk}" if buffer else chunk
+        yield from regex.split(buffer)
     
     def _clean_clauses(self, clauses: List[str]) -> List[str]:
         """
@@ -61,21 +251,35 @@ class ClauseSplitter:
         """
         cleaned = []
         for clause in clauses:
-            # Remove leading/trailing whitespace
-            clause = clause.strip()
-            
-            # Skip empty or very short clauses
-            if len(clause) < 10:
-                continue
-            
-            # Skip common headers/footers
-            if self._is_header_or_footer(clause):
-                continue
-            
-            cleaned.append(clause)
+            clause = self._clean_clause(clause)
+            if clause is not None:
+                cleaned.append(clause)
         
         return cleaned
     
+    def _clean_clause(self, clause: str) -> Optional[str]:
+        """
+        Clean a single clause
+        
+        Args:
+            clause: Raw clause text
+            
+        Returns:
+            Stripped clause, or None if it should be skipped
+        """
+        # Remove leading/trailing whitespace
+        clause = clause.strip()
+        
+        # Skip empty or very short clauses
+        if len(clause) < 10:
+            return None
+        
+        # Skip common headers/footers
+        if self._is_header_or_footer(clause):
+            return None
+        
+        return clause
+    
     def _is_header_or_footer(self, text: str) -> bool:
         """
         Check if text appears to be a header or footer
@@ -86,26 +290,7 @@ class ClauseSplitter:
         Returns:
             True if text appears to be header/footer
         """
-        text_lower = text.lower()
-        
-        # Common header/footer patterns
-        header_footer_patterns = [
-            r'^page \d+$',
-            r'^\d+$',
-            r'^confidential$',
-            r'^draft$',
-            r'^final$',
-            r'^version \d+',
-            r'^revised',
-            r'^effective date:',
-            r'^execution date:',
-        ]
-        
-        for pattern in header_footer_patterns:
-            if re.match(pattern, text_lower):
-                return True
-        
-        return False
+        return self._header_footer_regex.match(text.lower()) is not None
     
     def _group_sentences_into_clauses(self, sentences: List[str]) -> List[str]:
         """
@@ -117,31 +302,50 @@ class ClauseSplitter:
         Returns:
             List of grouped clauses
         """
-        if not sentences:
-            return []
+        return list(self._iter_sentence_groups(sentences))
+    
+    def _iter_sentence_groups(self, sentences: Iterable[str]) -> Iterator[str]:
+        """
+        Lazily group sentences into clauses, yielding each group once it is complete
         
-        clauses = []
+        Args:
+            sentences: Iterable of individual (cleaned) sentences
+            
+        Yields:
+            Grouped clauses
+        """
+        for group in self._iter_sentence_group_members((sentence, sentence) for sentence in sentences):
+            yield " ".join(group)
+    
+    def _iter_sentence_group_members(self, sentences: Iterable[Tuple[str, T]]) -> Iterator[List[T]]:
+        """
+        Group cleaned sentences into clauses
+        
+        Args:
+            sentences: (sentence text, member) pairs; the members of each group are yielded
+            
+        Yields:
+            Members of each clause, to be joined with single spaces
+        """
         current_clause = []
+        length = -1  # length of the members joined with spaces
         
-        for sentence in sentences:
-            current_clause.append(sentence)
+        for sentence, member in sentences:
+            current_clause.append(member)
+            length += len(sentence) + 1
             
             # Create a clause every 3-5 sentences, or when we hit certain keywords
             if (len(current_clause) >= 4 or 
                 self._contains_clause_break_keywords(sentence)):
                 
-                clause_text = " ".join(current_clause)
-                if len(clause_text.strip()) > 20:  # Minimum clause length
-                    clauses.append(clause_text.strip())
+                if length > 20:  # Minimum clause length
+                    yield current_clause
                 current_clause = []
+                length = -1
         
         # Add any remaining sentences as the last clause
-        if current_clause:
-            clause_text = " ".join(current_clause)
-            if len(clause_text.strip()) > 20:
-                clauses.append(clause_text.strip())
-        
-        return clauses
+        if current_clause and length > 20:
+            yield current_clause
     
     def _contains_clause_break_keywords(self, sentence: str) -> bool:
         """
@@ -153,20 +357,4 @@ class ClauseSplitter:
         Returns:
             True if sentence contains clause break keywords
         """
-        sentence_lower = sentence.lower()
-        
-        break_keywords = [
-            'provided that',
-            'provided, however,',
-            'further provided',
-            'in addition',
-            'moreover',
-            'furthermore',
-            'additionally',
-            'notwithstanding',
-            'subject to',
-            'except as',
-            'unless otherwise',
-        ]
-        
-        return any(keyword in sentence_lower for keyword in break_keywords) 
\ No newline at end of file
+        return self._break_keyword_regex.search(sentence.lower()) is not None 
\ No newline at end of file
@@ -0,0 +1,136 @@
+import random
+import re
+import zlib
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index of analyzed clauses for reusing analyses of near-identical text
+
+    Clauses are reduced to sets of word shingles, summarized as MinHash signatures
+    and bucketed with locality-sensitive hashing, so lookups only compare against
+    a handful of candidates instead of every clause seen so far. Each indexed
+    clause carries a payload, normally its ClauseAnalysis.
+    """
+
+    # Modulus for the universal hash family (a Mersenne prime larger than any crc32 value)
+    _PRIME = (1 << 61) - 1
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 3,
+        min_shingles: int = 5,
+        seed: int = 1,
+    ):
+        """
+        Args:
+            threshold: Minimum estimated Jaccard similarity for two clauses to count as duplicates
+            num_perm: Number of hash permutations per signature
+            bands: Number of LSH bands (must divide num_perm)
+            shingle_size: Number of consecutive words per shingle
+            min_shingles: Clauses with fewer shingles are too short to match reliably and are ignored
+            seed: Seed for the hash permutations
+        """
+        if num_perm % bands:
+            raise ValueError("bands must divide num_perm")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.min_shingles = min_shingles
+        self.seed = seed
+
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randrange(1, self._PRIME), rng.randrange(0, self._PRIME)) for _ in range(num_perm)
+        ]
+        self._entries: List[Tuple[List[int], str, Any]] = []
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def empty_like(self) -> "NearDuplicateIndex":
+        """Create an empty index with the same settings (signatures stay comparable)"""
+        return NearDuplicateIndex(
+            threshold=self.threshold,
+            num_perm=self.num_perm,
+            bands=self.bands,
+            shingle_size=self.shingle_size,
+            min_shingles=self.min_shingles,
+            seed=self.seed,
+        )
+
+    def signature(self, text: str) -> Optional[List[int]]:
+        """
+        Compute the MinHash signature of a clause
+
+        Returns:
+            The signature, or None if the clause is too short to deduplicate
+        """
+        words = re.findall(r"\w+", text.lower())
+        shingles = {
+            zlib.crc32(" ".join(words[i:i + self.shingle_size]).encode("utf-8"))
+            for i in range(max(len(words) - self.shingle_size + 1, 0))
+        }
+        if len(shingles) < self.min_shingles:
+            return None
+        return [
+            min((a * shingle + b) % self._PRIME for shingle in shingles)
+            for a, b in self._permutations
+        ]
+
+    def similarity(self, first: List[int], second: List[int]) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return sum(1 for x, y in zip(first, second) if x == y) / self.num_perm
+
+    def add(self, text: str, payload: Any, source: str, signature: Optional[List[int]] = None) -> None:
+        """
+        Index an analyzed clause
+
+        Args:
+            text: Clause text
+            payload: Value returned for near-duplicates of this clause, normally its ClauseAnalysis
+            source: Reference recorded in borrowed_from, e.g. "BasicNDA.pdf#3"
+            signature: Precomputed signature of text, if available
+        """
+        signature = signature or self.signature(text)
+        if signature is None:
+            return
+        entry_id = len(self._entries)
+        self._entries.append((signature, source, payload))
+        for band_key in self._band_keys(signature):
+            self._buckets[band_key].append(entry_id)
+
+    def find(self, text: str, signature: Optional[List[int]] = None) -> Optional[Tuple[str, Any, float]]:
+        """
+        Find the most similar indexed clause above the threshold
+
+        Returns:
+            (source, payload, similarity) of the best match, or None
+        """
+        signature = signature or self.signature(text)
+        if signature is None:
+            return None
+        candidates = set()
+        for band_key in self._band_keys(signature):
+            candidates.update(self._buckets.get(band_key, ()))
+
+        best = None
+        for entry_id in candidates:
+            entry_signature, source, payload = self._entries[entry_id]
+            score = self.similarity(signature, entry_signature)
+            if score >= self.threshold and (best is None or score > best[2]):
+                best = (source, payload, score)
+        return best
+
+    def _band_keys(self, signature: List[int]):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, tuple(signature[start:start + self.rows])
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+from typing import Any, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+from pydantic import PrivateAttr
+
+from .models import BatchAssessment
+from .tokens import estimate_tokens
+
+FILLER_WORDS = (
+    "the party shall provide reasonable written notice before terminating this agreement and "
+    "may negotiate a cap on liability together with a mutual confidentiality obligation"
+).split()
+
+
+class FakeAPIError(Exception):
+    """Error shaped like openai.APIStatusError: a status_code and a response with headers"""
+
+    def __init__(self, message: str, status_code: int, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        headers = {"retry-after": f"{retry_after:.3f}"} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=status_code, headers=headers)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Local stand-in for ChatOpenAI with configurable latency, failures and rate limits
+
+    Answers every prompt of ContractAnalysisPrompts with plausible output (plain
+    text summaries and suggestions, risk JSON, structured assessments) without
+    network access. Requests beyond the configured limits fail with 429 errors,
+    and a fraction of requests can fail with 503 errors.
+    """
+
+    model_name: str = "fake-chat"
+    latency: float = 0.05  # seconds per request
+    jitter: float = 0.0  # extra random latency, up to this many seconds
+    error_rate: float = 0.0  # probability of a 503 error
+    requests_per_window: Optional[int] = None  # requests accepted per window before 429s
+    window_seconds: float = 60.0
+    max_concurrent_requests: Optional[int] = None  # concurrent requests accepted before 429s
+    response_chars: int = 400  # length of text responses
+    risky_rate: float = 0.3  # fraction of clauses reported as risky
+    seed: Optional[int] = None
+
+    _rng: random.Random = PrivateAttr(default=None)
+    _lock: Any = PrivateAttr(default=None)
+    _recent: Any = PrivateAttr(default=None)
+    _in_flight: int = PrivateAttr(default=0)
+    _counts: Any = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+        self._recent = deque()
+        self._counts = {"requests": 0, "throttled": 0, "errors": 0}
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @property
+    def stats(self) -> dict:
+        """Requests received, and how many were rejected with 429 or failed with 503"""
+        with self._lock:
+            return dict(self._counts)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        delay = self._admit()
+        try:
+            time.sleep(delay)
+            return self._result(messages, kwargs.get("structured_schema"))
+        finally:
+            self._finish()
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        delay = self._admit()
+        try:
+            await asyncio.sleep(delay)
+            return self._result(messages, kwargs.get("structured_schema"))
+        finally:
+            self._finish()
+
+    def with_structured_output(self, schema: Any, **kwargs: Any) -> RunnableLambda:
+        """Runnable returning schema instances, with the latency and limits of a normal call"""
+        def parse(message: AIMessage) -> Any:
+            return schema.model_validate(json.loads(message.content))
+
+        def run(messages: List[BaseMessage]) -> Any:
+            return parse(self.invoke(messages, structured_schema=schema))
+
+        async def arun(messages: List[BaseMessage]) -> Any:
+            return parse(await self.ainvoke(messages, structured_schema=schema))
+
+        return RunnableLambda(run, afunc=arun)
+
+    def _admit(self) -> float:
+        """Apply the rate limits and error rate; returns the simulated latency"""
+        now = time.monotonic()
+        with self._lock:
+            self._counts["requests"] += 1
+            while self._recent and self._recent[0] <= now - self.window_seconds:
+                self._recent.popleft()
+            if self.requests_per_window is not None and len(self._recent) >= self.requests_per_window:
+                self._counts["throttled"] += 1
+                retry_after = self._recent[0] + self.window_seconds - now
+                raise FakeAPIError("Rate limit reached for requests", 429, retry_after)
+            if self.max_concurrent_requests is not None and self._in_flight >= self.max_concurrent_requests:
+                self._counts["throttled"] += 1
+                raise FakeAPIError("Too many concurrent requests", 429)
+            if self._rng.random() < self.error_rate:
+                self._counts["errors"] += 1
+                raise FakeAPIError("The server is overloaded", 503)
+            self._recent.append(now)
+            self._in_flight += 1
+            return self.latency + self._rng.uniform(0, self.jitter)
+
+    def _finish(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _result(self, messages: List[BaseMessage], structured_schema: Any = None) -> ChatResult:
+        prompt = "\n".join(str(message.content) for message in messages)
+        content = self._respond(prompt, structured_schema)
+        message = AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": estimate_tokens(prompt),
+                "output_tokens": estimate_tokens(content),
+                "total_tokens": estimate_tokens(prompt) + estimate_tokens(content),
+            },
+            response_metadata={"model_name": self.model_name},
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _respond(self, prompt: str, schema: Any) -> str:
+        """Answer in the format the prompt (or structured-output schema) asks for"""
+        if schema is BatchAssessment:
+            numbers = [int(n) for n in re.findall(r"^Clause (\d+):", prompt, re.MULTILINE)]
+            return json.dumps({"analyses": [self._assessment(clause_number=n) for n in numbers]})
+        if schema is not None:
+            return json.dumps(self._assessment())
+        if '"is_risky"' in prompt:
+            is_risky = self._is_risky()
+            return json.dumps({"is_risky": is_risky, "risk_reason": self._text() if is_risky else "None"})
+        return self._text()
+
+    def _is_risky(self) -> bool:
+        with self._lock:
+            return self._rng.random() < self.risky_rate
+
+    def _assessment(self, clause_number: Optional[int] = None) -> dict:
+        is_risky = self._is_risky()
+        assessment = {
+            "summary": self._text(),
+            "is_risky": is_risky,
+            "risk_reason": self._text() if is_risky else "None",
+            "suggestion": self._text(),
+        }
+        if clause_number is not None:
+            assessment["clause_number"] = clause_number
+        return assessment
+
+    def _text(self) -> str:
+        words = []
+        length = 0
+        while length < self.response_chars:
+            word = FILLER_WORDS[len(words) % len(FILLER_WORDS)]
+            words.append(word)
+            length += len(word) + 1
+        return " ".join(words)[:self.response_chars].strip().capitalize() + "."
@@ -0,0 +1,256 @@
+import contextvars
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+# USD per million (prompt, completion) tokens; models not listed are priced at zero
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+# Prometheus metadata of every exported metric: (type, help)
+METRIC_INFO = {
+    "contract_stage_seconds_total": ("counter", "Wall time spent in each workflow stage"),
+    "contract_stage_runs_total": ("counter", "Workflow stage executions"),
+    "contract_clause_seconds_total": ("counter", "Wall time spent analyzing clauses, summed over analysis units"),
+    "contract_clauses_analyzed_total": ("counter", "Clauses analyzed, by outcome"),
+    "contract_llm_requests_total": ("counter", "LLM requests, by model and status"),
+    "contract_llm_request_seconds_total": ("counter", "Wall time of LLM requests"),
+    "contract_llm_tokens_total": ("counter", "Tokens used by LLM requests"),
+    "contract_llm_cost_usd_total": ("counter", "Estimated cost of LLM requests in USD"),
+    "contract_cache_lookups_total": ("counter", "Clause cache lookups, by result"),
+    "contract_dedup_reused_total": ("counter", "Clause analyses reused from near-duplicate clauses"),
+    "contract_prescreened_total": ("counter", "Benign clauses answered by the local pre-screening tier without the LLM"),
+    "contract_carried_forward_total": ("counter", "Unchanged clauses whose analysis was carried forward from a previous version"),
+    "contract_llm_retries_total": ("counter", "Requests retried by the request scheduler"),
+    "contract_llm_throttled_total": ("counter", "Rate-limit responses seen by the request scheduler"),
+    "contract_llm_concurrency_limit": ("gauge", "Current adaptive concurrency limit of the request scheduler"),
+}
+
+# Document the current run is analyzing; attached to every span recorded meanwhile
+_current_document: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_document", default=None)
+
+
+class WorkflowMetrics:
+    """
+    Spans and counters describing where a workflow spends time and money
+
+    Records one span per workflow stage, per analysis unit (a clause, or a batch
+    of clauses) and per LLM request, the latter with token usage and an estimated
+    cost. Spans can be streamed to a JSON lines file as they finish; counters are
+    exported in the Prometheus text format.
+    """
+
+    def __init__(
+        self,
+        jsonl_path: Optional[str] = None,
+        prices: Optional[Dict[str, Tuple[float, float]]] = None,
+        max_spans: int = 10_000,
+    ):
+        """
+        Args:
+            jsonl_path: File each finished span is appended to as one JSON line (None to only keep them in memory)
+            prices: USD per million (prompt, completion) tokens by model, added to MODEL_PRICES
+            max_spans: Most recent spans kept in memory
+        """
+        self.jsonl_path = jsonl_path
+        self.prices = {**MODEL_PRICES, **(prices or {})}
+        self.spans: deque = deque(maxlen=max_spans)
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = defaultdict(float)
+        self._lock = threading.Lock()
+        self.callback_handler = MetricsCallbackHandler(self)
+
+    def instrument(self, llm: Any) -> Any:
+        """Register the LLM request callbacks on a LangChain chat model; returns the model"""
+        if hasattr(llm, "callbacks"):
+            callbacks = llm.callbacks if isinstance(llm.callbacks, list) else []
+            if self.callback_handler not in callbacks:
+                llm.callbacks = [*callbacks, self.callback_handler]
+        return llm
+
+    @contextmanager
+    def document(self, file_path: str) -> Iterator[None]:
+        """Attribute spans recorded inside the block to a document"""
+        token = _current_document.set(file_path)
+        try:
+            yield
+        finally:
+            _current_document.reset(token)
+
+    @contextmanager
+    def span(self, kind: str, name: str, **attributes: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Time a block as a span
+
+        Yields the span's attribute dict, so the block can add results such as a
+        clause count. The span is recorded with status "error" if the block raises.
+        """
+        start = time.time()
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            yield attributes
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            self.record_span(kind, name, start, time.perf_counter() - started, status=status, **attributes)
+
+    def record_span(self, kind: str, name: str, start: float, duration: float, **attributes: Any) -> None:
+        """Store a finished span, update the counters derived from it and append it to the JSON lines file"""
+        span = {
+            "kind": kind,
+            "name": name,
+            "document": _current_document.get(),
+            "start": round(start, 6),
+            "duration_ms": round(duration * 1000, 3),
+            **attributes,
+        }
+        with self._lock:
+            self.spans.append(span)
+            if kind == "stage":
+                self._add("contract_stage_seconds_total", duration, stage=name)
+                self._add("contract_stage_runs_total", 1, stage=name)
+            elif kind == "clause":
+                self._add("contract_clause_seconds_total", duration)
+            elif kind == "llm":
+                model = span.get("model", "unknown")
+                self._add("contract_llm_requests_total", 1, model=model, status=span.get("status", "ok"))
+                self._add("contract_llm_request_seconds_total", duration, model=model)
+                self._add("contract_llm_tokens_total", span.get("prompt_tokens", 0), model=model, type="prompt")
+                self._add("contract_llm_tokens_total", span.get("completion_tokens", 0), model=model, type="completion")
+                self._add("contract_llm_cost_usd_total", span.get("cost_usd", 0.0), model=model)
+            if self.jsonl_path:
+                with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(span, default=str) + "\n")
+
+    def count(self, name: str, amount: float = 1, **labels: str) -> None:
+        """Increase a counter, e.g. count("contract_cache_lookups_total", result="hit")"""
+        with self._lock:
+            self._add(name, amount, **labels)
+
+    def observe_scheduler(self, stats: Dict[str, int]) -> None:
+        """Take the cumulative retry and throttle counts of a RequestScheduler"""
+        with self._lock:
+            self._counters[("contract_llm_retries_total", ())] = stats["retries"]
+            self._counters[("contract_llm_throttled_total", ())] = stats["throttled"]
+            self._counters[("contract_llm_concurrency_limit", ())] = stats["concurrency"]
+
+    def cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """Estimated USD cost of a request; dated model names (gpt-4o-mini-2024-07-18) use their base price"""
+        price = self.prices.get(model)
+        if price is None:
+            # Longest listed name the model starts with, so gpt-4o-mini-... is not priced as gpt-4o
+            matches = [name for name in self.prices if model.startswith(name)]
+            price = self.prices[max(matches, key=len)] if matches else (0.0, 0.0)
+        return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
+
+    def summary(self) -> Dict[str, float]:
+        """Totals across all labels of every counter"""
+        with self._lock:
+            totals: Dict[str, float] = defaultdict(float)
+            for (name, _), value in self._counters.items():
+                totals[name] += value
+            return dict(totals)
+
+    def prometheus_text(self) -> str:
+        """Counters in the Prometheus text exposition format"""
+        with self._lock:
+            counters = sorted(self._counters.items())
+        lines: List[str] = []
+        last_name = None
+        for (name, labels), value in counters:
+            if name != last_name:
+                metric_type, help_text = METRIC_INFO.get(name, ("untyped", name))
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                last_name = name
+            label_text = ",".join(f'{key}="{_escape_label(str(val))}"' for key, val in labels)
+            lines.append(f"{name}{{{label_text}}} {value:g}" if labels else f"{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Write the counters to a file, e.g. for node_exporter's textfile collector"""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+
+    def _add(self, name: str, amount: float, **labels: str) -> None:
+        """Increase a counter (called with the lock held)"""
+        self._counters[(name, tuple(sorted(labels.items())))] += amount
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """LangChain callbacks turning every chat model request into an "llm" span"""
+
+    # Record inline, in the caller's context, so spans see the current document
+    run_inline = True
+
+    def __init__(self, metrics: WorkflowMetrics):
+        self.metrics = metrics
+        self._running: Dict[UUID, Tuple[float, float, str]] = {}
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *, run_id: UUID, **kwargs: Any) -> None:
+        params = kwargs.get("invocation_params") or {}
+        metadata = kwargs.get("metadata") or {}
+        model = metadata.get("ls_model_name") or params.get("model_name") or params.get("model") or "unknown"
+        self._running[run_id] = (time.time(), time.perf_counter(), model)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        running = self._running.pop(run_id, None)
+        if running is None:
+            return
+        start, started, model = running
+        model = (response.llm_output or {}).get("model_name") or model
+        prompt_tokens, completion_tokens = self._token_usage(response)
+        self.metrics.record_span(
+            "llm",
+            "chat",
+            start,
+            time.perf_counter() - started,
+            model=model,
+            status="ok",
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cost_usd=round(self.metrics.cost(model, prompt_tokens, completion_tokens), 8),
+        )
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        running = self._running.pop(run_id, None)
+        if running is None:
+            return
+        start, started, model = running
+        status_code = getattr(error, "status_code", None)
+        self.metrics.record_span(
+            "llm",
+            "chat",
+            start,
+            time.perf_counter() - started,
+            model=model,
+            status=f"error_{status_code}" if status_code else "error",
+            error=type(error).__name__,
+        )
+
+    @staticmethod
+    def _token_usage(response: LLMResult) -> Tuple[int, int]:
+        """(prompt, completion) tokens from the message usage metadata or the provider's token_usage"""
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        return token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
@@ -1,14 +1,61 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Union
 from pydantic import BaseModel, Field
+from .spans import ClauseSpans, ClauseText
 
 
 class ClauseAnalysis(BaseModel):
     """Structured output for individual clause analysis"""
-    clause: str
+    clause: Union[str, ClauseText]  # ClauseText is materialized when the analysis is serialized
     summary: str
     is_risky: bool
     risk_reason: str
     suggestion: str
+    borrowed_from: Optional[str] = None  # Clause whose analysis was reused, e.g. "BasicNDA.pdf#3"
+    tier: str = "llm"  # "llm", or "prescreen" for templated analyses of benign boilerplate
+    clause_type: Optional[str] = None  # Boilerplate type recognised by the pre-screening tier
+    suggestion_pending: bool = False  # Suggestion deferred until requested (see resolve_suggestions)
+    change: Optional[str] = None  # Incremental runs: "unchanged", "modified" or "added" since the previous version
+
+
+class ClauseClassification(BaseModel):
+    """Clause type assigned by the local pre-screening tier"""
+    clause_type: str
+    confidence: float
+    source: str  # "rules" or "model"
+
+
+class ClauseAssessment(BaseModel):
+    """Structured LLM output for the single-call analysis engine"""
+    summary: str = Field(description="Plain-English explanation of the clause in 2-3 sentences")
+    is_risky: bool = Field(description="Whether the clause is risky for the reviewing party")
+    risk_reason: str = Field(description="Why the clause is risky, or 'None' if it is not risky")
+    suggestion: str = Field(description="Specific, actionable negotiation suggestion for the clause")
+
+
+class BatchClauseAssessment(ClauseAssessment):
+    """Structured LLM output for one clause of a multi-clause request"""
+    clause_number: int = Field(description="Number of the clause this analysis belongs to, as given in the request")
+
+
+class BatchAssessment(BaseModel):
+    """Structured LLM output for the batched analysis engine"""
+    analyses: List[BatchClauseAssessment] = Field(description="One analysis per clause in the request")
+
+
+class RevisionSummary(BaseModel):
+    """How a contract version differs from the previous one, by clause"""
+    unchanged: int = 0  # analyses carried forward from the previous report
+    modified: int = 0
+    added: int = 0
+    removed: int = 0
+    removed_clauses: List[str] = []
+
+
+class ClauseAlignment(BaseModel):
+    """Clauses of a new contract version aligned with those of the previous version"""
+    changes: List[str] = []  # per new clause: "unchanged", "modified" or "added"
+    previous_indices: List[Optional[int]] = []  # per new clause: matching clause of the previous version
+    removed: List[int] = []  # clauses of the previous version that are gone
 
 
 class ContractReport(BaseModel):
@@ -17,12 +64,56 @@ class ContractReport(BaseModel):
     risky_clauses_count: int
     suggestions_count: int
     clauses: List[ClauseAnalysis]
+    pending_suggestions: int = 0  # Clauses whose suggestion has not been generated yet
+    revision: Optional[RevisionSummary] = None  # Incremental runs: changes since the previous version
+
+
+class ClauseHit(BaseModel):
+    """Clause analysis found by a ClauseIndex search"""
+    document: str  # Document name, e.g. "lease" for contract_analysis_lease.json
+    report_path: Optional[str] = None
+    position: int  # 0-based index of the clause in its report
+    analysis: ClauseAnalysis
+    analyzed_at: float  # When the report was produced (its file's modification time unless given)
+    metadata: Dict[str, Any] = {}
+    score: Optional[float] = None  # BM25 rank of a text search, lower is better
+    snippet: Optional[str] = None  # Matching text with the query terms in [brackets]
+
+
+class ExtractedText(BaseModel):
+    """Text extracted from a document together with the offset of each page"""
+    text: str
+    page_offsets: List[int] = []
+
+
+class BatchSummary(BaseModel):
+    """Outcome of analyzing a directory or manifest of contracts"""
+    total_documents: int = 0
+    analyzed: int = 0
+    skipped: int = 0  # reports that already existed
+    failed: List[str] = []
+    clauses: int = 0
+    elapsed_seconds: float = 0.0
+
+
+class AnalysisJob(BaseModel):
+    """Status of a contract submitted to the analysis service"""
+    job_id: str
+    file_name: str
+    status: str = "queued"  # queued, running, done or failed
+    clauses_analyzed: int = 0
+    error: Optional[str] = None
+    submitted_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
 
 
 class ContractState(BaseModel):
     """State management for contract analysis workflow"""
     file_path: str = ""
     contract_text: str = ""
-    clauses: List[str] = []
+    clauses: Union[ClauseSpans, List[str]] = []  # spans share contract_text instead of copying it
     clause_analyses: List[ClauseAnalysis] = []
-    report: Optional[ContractReport] = None
\ No newline at end of file
+    report: Optional[ContractReport] = None
+    previous_report: Optional[ContractReport] = None  # Incremental runs: report of the previous version
+    alignment: Optional[ClauseAlignment] = None
\ No newline at end of file
@@ -1,11 +1,58 @@
-import fitz  # PyMuPDF
+import mmap
 import os
-from typing import Optional
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+from .models import ExtractedText
+
+
+def _open_pdf(file_path: str):
+    """Open a PDF with PyMuPDF, imported on first use so text-only runs never load it"""
+    import fitz  # PyMuPDF
+
+    return fitz.open(file_path)
+
+
+def _extract_page_range(file_path: str, start: int, stop: int) -> List[str]:
+    """
+    Extract cleaned text for pages [start, stop) of a PDF
+
+    Runs in a worker process, so it opens its own fitz document.
+    """
+    loader = PDFLoader()
+    with _open_pdf(file_path) as doc:
+        return [loader._clean_text(doc.load_page(page_num).get_text()) for page_num in range(start, stop)]
 
 
 class PDFLoader:
     """Load and extract text from PDF files using PyMuPDF"""
     
+    # Line starts recognised as a new clause by ClauseSplitter.clause_patterns
+    CLAUSE_START_PATTERN = re.compile(
+        r'^(?:\d+(?:\.\d+)*[.)]|[A-Z]\.|[IVX]+\.|Section \d+|Clause \d+|Article \d+)(?=\s|$)'
+    )
+    
+    # Text that can end the line before a clause start
+    CLAUSE_END_CHARS = '.:;)"”'
+    
+    # Fraction of the page height treated as header/footer margin
+    MARGIN_FRACTION = 0.08
+    
+    # Longest line considered as a running header/footer
+    MAX_MARGIN_LINE_LENGTH = 120
+    
+    # PyMuPDF span flag for bold text
+    BOLD_FLAG = 16
+    
+    # Bytes of a plain text file cleaned at a time
+    TEXT_CHUNK_BYTES = 1 << 20
+    
+    # ASCII whitespace a text chunk may end after; these bytes never occur inside a
+    # multi-byte UTF-8 character, so every chunk decodes on its own
+    CHUNK_BREAK_BYTES = (b" ", b"\n", b"\t", b"\r")
+    
     def __init__(self):
         pass
     
@@ -24,13 +71,10 @@ class PDFLoader:
                 raise FileNotFoundError(f"PDF file not found: {file_path}")
             
             # Open the PDF
-            doc = fitz.open(file_path)
-            text_content = ""
+            doc = _open_pdf(file_path)
             
-            # Extract text from each page
-            for page_num in range(len(doc)):
-                page = doc.load_page(page_num)
-                text_content += page.get_text()
+            # Extract text from each page and join once
+            text_content = "".join(doc.load_page(page_num).get_text() for page_num in range(len(doc)))
             
             doc.close()
             
@@ -42,6 +86,263 @@ class PDFLoader:
             print(f"Error loading PDF {file_path}: {str(e)}")
             return None
     
+    def extract_pdf(self, file_path: str, workers: Optional[int] = None,
+                    pages_per_task: int = 16) -> Optional[ExtractedText]:
+        """
+        Extract text from a PDF using a pool of worker processes
+        
+        Each worker opens its own fitz document and extracts a contiguous range of
+        pages. Pages are cleaned individually and joined once, and the offset of
+        every page in the joined text is recorded.
+        
+        Args:
+            file_path: Path to the PDF file
+            workers: Number of worker processes (defaults to the CPU count);
+                1 extracts in the current process
+            pages_per_task: Number of pages handed to a worker at a time
+            
+        Returns:
+            Extracted text with page offsets, or None if loading fails
+        """
+        try:
+            if not os.path.exists(file_path):
+                raise FileNotFoundError(f"PDF file not found: {file_path}")
+            
+            with _open_pdf(file_path) as doc:
+                page_count = len(doc)
+            
+            workers = workers or os.cpu_count() or 1
+            ranges = [
+                (start, min(start + pages_per_task, page_count))
+                for start in range(0, page_count, pages_per_task)
+            ]
+            
+            if workers == 1 or len(ranges) <= 1:
+                page_texts = _extract_page_range(file_path, 0, page_count)
+            else:
+                with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+                    chunks = pool.map(
+                        _extract_page_range,
+                        [file_path] * len(ranges),
+                        [start for start, _ in ranges],
+                        [stop for _, stop in ranges],
+                    )
+                    page_texts = [text for chunk in chunks for text in chunk]
+            
+            return self._join_pages(page_texts)
+            
+        except Exception as e:
+            print(f"Error loading PDF {file_path}: {str(e)}")
+            return None
+    
+    @staticmethod
+    def _join_pages(page_texts: List[str]) -> ExtractedText:
+        """
+        Join cleaned page texts with single spaces, recording where each page starts
+        
+        Empty pages add no text; their offset is where the next page starts.
+        """
+        page_offsets = []
+        parts = []
+        position = 0
+        for text in page_texts:
+            if text and parts:
+                position += 1  # separating space
+            page_offsets.append(position)
+            if text:
+                parts.append(text)
+                position += len(text)
+        return ExtractedText(text=" ".join(parts), page_offsets=page_offsets)
+    
+    def iter_pdf_pages(self, file_path: str) -> Iterator[str]:
+        """
+        Lazily extract cleaned text from a PDF, one page at a time
+
+        Unlike load_pdf, errors are raised rather than swallowed, and only the
+        current page is held in memory.
+
+        Args:
+            file_path: Path to the PDF file
+            
+        Yields:
+            Cleaned text of each non-empty page
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"PDF file not found: {file_path}")
+        
+        with _open_pdf(file_path) as doc:
+            for page in doc:
+                text = self._clean_text(page.get_text())
+                if text:
+                    yield text
+
+    def load_pdf_layout(self, file_path: str) -> Optional[str]:
+        """
+        Load a PDF while preserving clause structure
+        
+        Uses the fitz block/line/span layout instead of plain text extraction.
+        Every numbered clause start and every heading begins on a new line, so the
+        numbering patterns in ClauseSplitter can match. All other whitespace is
+        collapsed, and running headers/footers repeated across pages are removed.
+        
+        Args:
+            file_path: Path to the PDF file
+            
+        Returns:
+            Extracted text with one line per clause/heading, or None if loading fails
+        """
+        try:
+            return " ".join(self.iter_pdf_layout_pages(file_path)).strip()
+        except Exception as e:
+            print(f"Error loading PDF {file_path}: {str(e)}")
+            return None
+    
+    def iter_pdf_layout_pages(self, file_path: str) -> Iterator[str]:
+        """
+        Lazily extract structure-preserving text from a PDF, one page at a time
+        
+        Running headers and footers are detected by comparing each page's margin
+        lines with its neighbours, so at most two pages are held in memory.
+        
+        Args:
+            file_path: Path to the PDF file
+            
+        Yields:
+            Text of each non-empty page; clause starts and headings begin with a newline
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"PDF file not found: {file_path}")
+        
+        with _open_pdf(file_path) as doc:
+            pages = (self._layout_lines(page) for page in doc)
+            previous_margins = set()
+            current = next(pages, None)
+            while current is not None:
+                following = next(pages, None)
+                following_margins = {key for key, _, _, in_margin in following or [] if in_margin}
+                repeated = previous_margins | following_margins
+                text = self._join_layout_lines(
+                    [(line, starts_block) for key, line, starts_block, in_margin in current
+                     if not (in_margin and key in repeated)]
+                )
+                if text.strip():
+                    yield text
+                previous_margins = {key for key, _, _, in_margin in current if in_margin}
+                current = following
+    
+    def _layout_lines(self, page) -> List[Tuple[str, str, bool, bool]]:
+        """
+        Read the text lines of a page in reading order
+        
+        Returns:
+            (header/footer key, line text, starts a new paragraph or heading, lies in the
+            top/bottom margin) per line. Headings are prefixed with a newline.
+        """
+        blocks = [block for block in page.get_text("dict", sort=True)["blocks"] if block["type"] == 0]
+        
+        # Body text size is the size used by most characters on the page
+        sizes = Counter()
+        for block in blocks:
+            for line in block["lines"]:
+                for span in line["spans"]:
+                    sizes[round(span["size"], 1)] += len(span["text"])
+        body_size = sizes.most_common(1)[0][0] if sizes else 0
+        
+        top = page.rect.height * self.MARGIN_FRACTION
+        bottom = page.rect.height * (1 - self.MARGIN_FRACTION)
+        lines = []
+        for block in blocks:
+            for line_number, line in enumerate(block["lines"]):
+                spans = [span for span in line["spans"] if span["text"].strip()]
+                text = " ".join("".join(span["text"] for span in spans).split())
+                if not text:
+                    continue
+                # Clause starts are never treated as running headers/footers
+                in_margin = (
+                    (line["bbox"][3] <= top or line["bbox"][1] >= bottom)
+                    and len(text) <= self.MAX_MARGIN_LINE_LENGTH
+                    and not self.CLAUSE_START_PATTERN.match(text)
+                )
+                is_heading = len(text) < 100 and all(
+                    span["flags"] & self.BOLD_FLAG or span["size"] >= body_size * 1.15 for span in spans
+                )
+                key = re.sub(r'\d+', '#', text.lower())
+                if is_heading:
+                    text = "\n" + text
+                lines.append((key, text, line_number == 0 or is_heading, in_margin))
+        return lines
+    
+    def _join_layout_lines(self, lines: List[Tuple[str, bool]]) -> str:
+        """
+        Join layout lines with spaces, starting numbered clauses on a new line
+        
+        A line only counts as a clause start if it opens a paragraph or follows a
+        line that ends a sentence, so wrapped text such as "... within\n30. days"
+        is not mistaken for a new clause.
+        """
+        parts = []
+        previous = ""
+        for text, starts_block in lines:
+            if not text.startswith("\n") and self.CLAUSE_START_PATTERN.match(text) and (
+                starts_block or not previous or previous.startswith("\n")
+                or previous.rstrip()[-1] in self.CLAUSE_END_CHARS
+            ):
+                text = "\n" + text
+            parts.append(text)
+            previous = text
+        return " ".join(parts)
+    
+    def iter_text_file(self, file_path: str, chunk_bytes: int = TEXT_CHUNK_BYTES) -> Iterator[str]:
+        """
+        Lazily read a plain text file in cleaned chunks
+        
+        The file is memory-mapped and cut after whitespace into chunks of about
+        chunk_bytes, each decoded and cleaned on its own, so memory use does not
+        grow with the file (or with the length of its lines). Joined with single
+        spaces, the chunks equal the cleaned text of the whole file.
+        
+        Args:
+            file_path: Path to the text file
+            chunk_bytes: Approximate size of each chunk in bytes
+            
+        Yields:
+            Cleaned text of each non-empty chunk
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Text file not found: {file_path}")
+        
+        with open(file_path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return  # empty files cannot be mapped
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if hasattr(mmap, "MADV_SEQUENTIAL"):
+                    data.madvise(mmap.MADV_SEQUENTIAL)
+                start = released = 0
+                while start < len(data):
+                    end = self._chunk_end(data, start, chunk_bytes)
+                    text = self._clean_text(data[start:end].decode('utf-8'))
+                    start = end
+                    # Mapped pages stay resident until released, so drop the ones already read
+                    if hasattr(mmap, "MADV_DONTNEED"):
+                        page_end = start - start % mmap.PAGESIZE
+                        if page_end > released:
+                            data.madvise(mmap.MADV_DONTNEED, released, page_end - released)
+                            released = page_end
+                    if text:
+                        yield text
+    
+    def _chunk_end(self, data: mmap.mmap, start: int, chunk_bytes: int) -> int:
+        """End of the chunk starting at start: just after the last whitespace byte within chunk_bytes"""
+        limit = start + chunk_bytes
+        if limit >= len(data):
+            return len(data)
+        cut = max(data.rfind(byte, start, limit) for byte in self.CHUNK_BREAK_BYTES)
+        if cut < 0:
+            # A single word longer than a chunk; extend the chunk to the next whitespace
+            following = [position for position in (data.find(byte, limit) for byte in self.CHUNK_BREAK_BYTES) if position >= 0]
+            cut = min(following) if following else len(data) - 1
+        return cut + 1
+
     def _clean_text(self, text: str) -> str:
         """
         Clean and normalize extracted text
@@ -52,16 +353,8 @@ class PDFLoader:
         Returns:
             Cleaned text
         """
-        # Remove excessive whitespace
-        text = " ".join(text.split())
-        
-        # Normalize line breaks
-        text = text.replace("\n\n", "\n").replace("\n \n", "\n")
-        
-        # Remove common PDF artifacts
-        text = text.replace("  ", " ")
-        
-        return text.strip()
+        # Collapse every run of whitespace, line breaks included, into one space
+        return " ".join(text.split())
     
     def load_text_file(self, file_path: str) -> Optional[str]:
         """
@@ -77,10 +370,8 @@ class PDFLoader:
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"Text file not found: {file_path}")
             
-            with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-            
-            return self._clean_text(content)
+            # Cleaned chunk by chunk from a memory map, so the raw text is never held in full
+            return " ".join(self.iter_text_file(file_path))
             
         except Exception as e:
             print(f"Error loading text file {file_path}: {str(e)}")
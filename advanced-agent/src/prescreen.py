@@ -0,0 +1,219 @@
+import re
+from typing import Callable, Dict, List, NamedTuple, Optional, Pattern, Tuple
+
+from .models import ClauseAnalysis, ClauseClassification
+from .spans import Clause
+
+
+class ClauseRule(NamedTuple):
+    """Lexicon rule recognising one type of boilerplate clause"""
+    clause_type: str
+    signals: Tuple[Pattern[str], ...]  # evidence for the type; each match raises the confidence
+    required: int  # signals that must match before the rule applies
+    summary: str  # summary of the templated analysis
+
+
+def _patterns(*patterns: str) -> Tuple[Pattern[str], ...]:
+    return tuple(re.compile(pattern, re.IGNORECASE) for pattern in patterns)
+
+
+# Clause types that carry no obligations worth an LLM review
+BENIGN_RULES: Tuple[ClauseRule, ...] = (
+    ClauseRule(
+        "copyright_notice",
+        _patterns(r"copyright|©|\(c\)", r"(?:copyright|©|\(c\))\s*\d{4}", r"all rights reserved"),
+        2,
+        "Copyright notice of the document; it creates no obligations for either party.",
+    ),
+    ClauseRule(
+        "signature_block",
+        _patterns(
+            r"in witness whereof",
+            r"signature\s*:|signed\s*:|\bby\s*:\s*_",
+            r"(?:printed |typed )?name\s*:",
+            r"\btitle\s*:",
+            r"\bdate\s*:",
+            r"_{5,}",
+        ),
+        2,
+        "Signature block where the parties sign and date the agreement.",
+    ),
+    ClauseRule(
+        "party_details",
+        _patterns(
+            r"_{5,}|\[[^\]]{2,40}\]",
+            r"\baddress\b",
+            r"\b(?:e-?mail|phone|telephone|fax|attn|attention)\b",
+            r"\b(?:party|company|name)\s*:",
+        ),
+        2,
+        "Identifies the parties and their contact details; it sets no terms of the agreement.",
+    ),
+    ClauseRule(
+        "entire_agreement",
+        _patterns(
+            r"entire (?:agreement|understanding)",
+            r"supersedes?",
+            r"prior (?:agreements?|understandings?|negotiations?|representations?)",
+            r"written or oral|oral or written",
+        ),
+        2,
+        "Standard entire-agreement clause: this document replaces all earlier agreements "
+        "and discussions on the same subject.",
+    ),
+    ClauseRule(
+        "counterparts",
+        _patterns(
+            r"counterparts?",
+            r"\boriginal\b",
+            r"one and the same (?:instrument|agreement)",
+            r"(?:electronic|facsimile|pdf) signatures?",
+        ),
+        2,
+        "Allows the agreement to be signed in separate copies that together form one agreement.",
+    ),
+    ClauseRule(
+        "headings",
+        _patterns(r"\b(?:headings?|captions?)\b", r"convenience|reference only", r"not (?:affect|be used|limit)"),
+        2,
+        "States that section headings are for convenience and do not change the meaning of the agreement.",
+    ),
+)
+
+# Terms that signal obligations, money or risk; a clause containing one is not benign boilerplate
+SUBSTANCE_TERMS = re.compile(
+    r"indemnif|liabl|liabilit|terminat|penalt|damages|\bfees?\b|\bpay|salary|compensat|exclusiv|"
+    r"non-?compet|non-?solicit|\bwaive|assign|renew|confidential|warrant|arbitrat|jurisdiction|"
+    r"governed by|intellectual property|licen[cs]e|insurance|interest|breach|default|\bagrees? to\b|"
+    r"\bas[- ]is\b|disclaim|\breleas|refund",
+    re.IGNORECASE,
+)
+
+# Headings are short noun phrases; all-caps text with these words is a clause set in capitals (disclaimers, waivers)
+HEADING_MAX_WORDS = 8
+NON_HEADING_WORDS = re.compile(
+    r"\b(?:shall|will|must|may|can|is|are|be|been|was|were|not|no|all|any|without|final)\b",
+    re.IGNORECASE,
+)
+
+HEADING_SUMMARY = "Title or heading of the document; it has no contractual content."
+
+# A rule's boilerplate must make up the clause; each sentence needs a signal of the rule unless it is a short title
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?;])\s+")
+TITLE_MAX_WORDS = 4
+
+
+class ClausePrescreener:
+    """
+    Local classification tier that answers clearly benign clauses without the LLM
+
+    Copyright lines, signature blocks, party and address placeholders, headings and
+    standard boilerplate (entire agreement, counterparts) are recognised with
+    lexicon rules, and optionally with a local model, and get a templated
+    ClauseAnalysis. Clauses that are long or mention obligations, money or risk are
+    always left to the LLM.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        max_chars: int = 600,
+        classifier: Optional[Callable[[str], Tuple[str, float]]] = None,
+        summaries: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Args:
+            threshold: Minimum confidence for a clause to skip the LLM
+            max_chars: Longer clauses are never pre-screened
+            classifier: Optional local model consulted when no rule applies; maps clause
+                text to (clause type, confidence), e.g. a small scikit-learn pipeline
+            summaries: Templated summaries of the classifier's benign clause types;
+                other labels it returns are sent to the LLM
+        """
+        self.threshold = threshold
+        self.max_chars = max_chars
+        self.classifier = classifier
+        self.summaries = {rule.clause_type: rule.summary for rule in BENIGN_RULES}
+        self.summaries["heading"] = HEADING_SUMMARY
+        self.summaries.update(summaries or {})
+
+    def classify(self, text: str) -> Optional[ClauseClassification]:
+        """
+        Label a clause with the most likely benign type
+
+        Returns:
+            The classification, or None if the clause does not look like boilerplate
+        """
+        text = text.strip()
+        if not text or len(text) > self.max_chars:
+            return None
+        candidates: List[ClauseClassification] = []
+        if self._is_heading(text):
+            candidates.append(ClauseClassification(clause_type="heading", confidence=0.95, source="rules"))
+        for rule in BENIGN_RULES:
+            matched = sum(1 for signal in rule.signals if signal.search(text))
+            if matched >= rule.required and self._covers(rule, text):
+                # Rounded, so two signals reach exactly 0.9 rather than 0.8999...
+                confidence = min(1.0, round(0.7 + 0.1 * matched, 2))
+                candidates.append(ClauseClassification(clause_type=rule.clause_type, confidence=confidence, source="rules"))
+        if not candidates and self.classifier is not None:
+            clause_type, confidence = self.classifier(text)
+            if clause_type in self.summaries:
+                candidates.append(ClauseClassification(clause_type=clause_type, confidence=confidence, source="model"))
+        if not candidates:
+            return None
+
+        best = max(candidates, key=lambda candidate: candidate.confidence)
+        if SUBSTANCE_TERMS.search(text):
+            # Boilerplate wording around real terms, e.g. a signature line after a payment clause
+            best.confidence = round(best.confidence * 0.5, 3)
+        return best
+
+    def screen(self, clause: Clause) -> Optional[ClauseAnalysis]:
+        """Templated analysis of a clearly benign clause, or None if it needs the LLM"""
+        classification = self.classify(str(clause))
+        if classification is None or classification.confidence < self.threshold:
+            return None
+        return ClauseAnalysis(
+            clause=clause,
+            summary=self.summaries[classification.clause_type],
+            is_risky=False,
+            risk_reason="None",
+            suggestion="None",
+            tier="prescreen",
+            clause_type=classification.clause_type,
+        )
+
+    @classmethod
+    def _covers(cls, rule: ClauseRule, text: str) -> bool:
+        """
+        Whether the rule's boilerplate is the whole clause rather than a line next to real terms,
+        e.g. a date placeholder after a working-hours clause or a copyright footer before a preamble
+        """
+        return all(
+            any(signal.search(sentence) for signal in rule.signals) or cls._is_title(sentence)
+            for sentence in SENTENCE_BOUNDARY.split(text)
+        )
+
+    @staticmethod
+    def _is_title(sentence: str) -> bool:
+        """Short title-case caption inside a clause, e.g. "Entire Agreement." or "3." """
+        words = sentence.split()
+        return (
+            0 < len(words) <= TITLE_MAX_WORDS
+            and all(word[0].isupper() or word[0].isdigit() for word in words)
+            and not NON_HEADING_WORDS.search(sentence)
+        )
+
+    @staticmethod
+    def _is_heading(text: str) -> bool:
+        """Short upper-case noun phrase without sentence punctuation, e.g. "NON-DISCLOSURE AGREEMENT" """
+        return (
+            len(text) <= 80
+            and len(text.split()) <= HEADING_MAX_WORDS
+            and text.upper() == text
+            and any(c.isalpha() for c in text)
+            and not re.search(r"[.;:,]\s+\S", text)
+            and not NON_HEADING_WORDS.search(text)
+            and not SUBSTANCE_TERMS.search(text)
+        )
@@ -1,7 +1,33 @@
 
+import hashlib
+from typing import List
+
+
 class ContractAnalysisPrompts:
     """Collection of prompts for analyzing contract clauses"""
 
+    @classmethod
+    def version(cls) -> str:
+        """
+        Fingerprint of all prompt texts
+
+        Changes whenever any system prompt or user template is edited, so cached
+        analyses produced with older prompts can be told apart and invalidated.
+        """
+        placeholder = "{clause}"
+        parts = [
+            cls.SUMMARY_SYSTEM,
+            cls.summary_user(placeholder),
+            cls.RISK_SYSTEM,
+            cls.risk_user(placeholder),
+            cls.SUGGESTION_SYSTEM,
+            cls.suggestion_user(placeholder, True, "{risk_reason}"),
+            cls.STRUCTURED_SYSTEM,
+            cls.structured_user(placeholder),
+            cls.batch_user([placeholder]),
+        ]
+        return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()[:16]
+
     # Summary prompt
     SUMMARY_SYSTEM = """You are a legal expert who explains complex contract language in plain English. 
     Your goal is to make legal terms accessible to non-lawyers while maintaining accuracy."""
@@ -65,4 +91,36 @@ Provide a practical negotiation suggestion that:
 
 If the clause is not risky, suggest any improvements that would make it more favorable.
 
-Suggestion:"""
\ No newline at end of file
+Suggestion:"""
+
+    # Single-call structured analysis prompt
+    STRUCTURED_SYSTEM = """You are a legal expert, risk analyst and contract negotiation advisor. 
+    For each contract clause you explain it in plain English, identify potentially problematic, vague or one-sided terms, 
+    and offer practical advice for negotiating better terms."""
+
+    @staticmethod
+    def structured_user(clause: str) -> str:
+        return f"""Analyze the following contract clause:
+
+Clause: {clause}
+
+Provide:
+- summary: a clear, concise plain-English explanation of what the clause means and the key obligations or rights (2-3 sentences maximum)
+- is_risky: whether the clause is risky, considering vague or ambiguous language, overly broad terms, one-sided obligations, unreasonable restrictions and missing protections
+- risk_reason: a detailed explanation of why the clause is risky, or 'None' if it is not risky
+- suggestion: a specific, actionable negotiation suggestion with concrete language changes; if the clause is not risky, suggest improvements that would make it more favorable"""
+
+    # Multi-clause batch analysis prompt (uses STRUCTURED_SYSTEM)
+    @staticmethod
+    def batch_user(clauses: List[str]) -> str:
+        numbered = "\n\n".join(f"Clause {number}: {clause}" for number, clause in enumerate(clauses, 1))
+        return f"""Analyze each of the following {len(clauses)} contract clauses independently:
+
+{numbered}
+
+For every clause, return one analysis with:
+- clause_number: the number of the clause as given above
+- summary: a clear, concise plain-English explanation of what the clause means and the key obligations or rights (2-3 sentences maximum)
+- is_risky: whether the clause is risky, considering vague or ambiguous language, overly broad terms, one-sided obligations, unreasonable restrictions and missing protections
+- risk_reason: a detailed explanation of why the clause is risky, or 'None' if it is not risky
+- suggestion: a specific, actionable negotiation suggestion with concrete language changes; if the clause is not risky, suggest improvements that would make it more favorable"""
@@ -0,0 +1,261 @@
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Any, Dict, Iterator, List, Mapping, Optional
+
+import ormsgpack
+
+from .models import ClauseAnalysis, ContractReport
+
+# Report format of each output extension
+FORMATS = {".json": "json", ".ndjson": "ndjson", ".jsonl": "ndjson", ".msgpack": "msgpack"}
+EXTENSIONS = {"json": ".json", "ndjson": ".ndjson", "msgpack": ".msgpack"}
+
+CORPUS_FORMAT = "contract-analysis-corpus"
+CORPUS_VERSION = 1
+
+# Clause fields stored as-is in a corpus; every other field is an index into the string table
+_RAW_TYPES = (bool, int, float)
+
+
+def report_format(path: str) -> str:
+    """Format of a report file, from its extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Unknown report format: {path} (expected one of {', '.join(FORMATS)})")
+    return FORMATS[extension]
+
+
+@contextmanager
+def _atomic_file(path: str, mode: str) -> Iterator[IO[Any]]:
+    """Write a file under a temporary name and move it into place once complete"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".contract_analysis_", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, **({} if "b" in mode else {"encoding": "utf-8"})) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _report_totals(report: ContractReport) -> Dict[str, Any]:
+    """Report fields other than the clause analyses"""
+    return report.model_dump(mode="json", exclude={"clauses"})
+
+
+class NDJSONReportWriter:
+    """
+    Write a report as newline-delimited JSON while its clauses are analyzed
+
+    Each clause is written and flushed as soon as its analysis is available, as a
+    {"event": "clause", "index": ..., "analysis": ...} line like the service's
+    stream; a final {"event": "report", ...} line carries the totals. The file is
+    written under a temporary name and only appears at its path once the report
+    line is written, so a partial file never looks complete.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Report file to write
+        """
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, self._tmp_path = tempfile.mkstemp(dir=directory, prefix=".contract_analysis_", suffix=".tmp")
+        self._file = os.fdopen(fd, "w", encoding="utf-8")
+        self.clauses_written = 0
+
+    def write_clause(self, index: int, analysis: ClauseAnalysis) -> None:
+        """Append the analysis of one clause; matches the on_analysis callback of arun_streaming"""
+        self._write_line({"event": "clause", "index": index, "analysis": analysis.model_dump(mode="json")})
+        self.clauses_written += 1
+
+    def finish(self, report: ContractReport) -> None:
+        """Write the report totals and move the file into place"""
+        self._write_line({"event": "report", **_report_totals(report)})
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        """Discard a report that will not be completed"""
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.unlink(self._tmp_path)
+
+    def __enter__(self) -> "NDJSONReportWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if not self._file.closed:
+            self.abort()
+
+    def _write_line(self, event: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+
+def write_report_ndjson(report: ContractReport, path: str) -> None:
+    """Write a finished report as newline-delimited JSON"""
+    with NDJSONReportWriter(path) as writer:
+        for index, analysis in enumerate(report.clauses):
+            writer.write_clause(index, analysis)
+        writer.finish(report)
+
+
+def read_report_ndjson(path: str) -> ContractReport:
+    """
+    Load a report written by NDJSONReportWriter
+
+    Raises:
+        ValueError: The file has no final report line
+    """
+    clauses: List[Dict[str, Any]] = []
+    totals: Optional[Dict[str, Any]] = None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            if event.get("event") == "clause":
+                clauses.append(event["analysis"])
+            elif event.get("event") == "report":
+                totals = {key: value for key, value in event.items() if key != "event"}
+    if totals is None:
+        raise ValueError(f"Incomplete NDJSON report: {path}")
+    return ContractReport.model_validate({**totals, "clauses": clauses})
+
+
+def _clause_fields() -> Dict[str, bool]:
+    """Clause fields of a corpus, mapped to whether they are interned strings"""
+    return {name: field.annotation not in _RAW_TYPES for name, field in ClauseAnalysis.model_fields.items()}
+
+
+def write_corpus(reports: Mapping[str, ContractReport], path: str) -> None:
+    """
+    Write many reports as one compact, columnar msgpack file
+
+    Clauses of all reports form one table with a column per ClauseAnalysis field.
+    Text fields are indices into a shared string table, so a clause, summary or
+    suggestion that appears in many reports (standard boilerplate, templated
+    pre-screening analyses) is stored once.
+
+    Args:
+        reports: Reports by document name
+        path: Corpus file to write
+    """
+    fields = _clause_fields()
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+    columns: Dict[str, List[Any]] = {name: [] for name in fields}
+    documents = []
+
+    def intern(value: Any) -> int:
+        if value is None:
+            return -1
+        value = str(value)
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    for name, report in reports.items():
+        start = len(columns["clause"])
+        for analysis in report.clauses:
+            for field, interned in fields.items():
+                value = getattr(analysis, field)
+                columns[field].append(intern(value) if interned else value)
+        documents.append({"name": name, "start": start, "stop": len(columns["clause"]), **_report_totals(report)})
+
+    corpus = {
+        "format": CORPUS_FORMAT,
+        "version": CORPUS_VERSION,
+        "strings": strings,
+        "documents": documents,
+        "columns": columns,
+    }
+    with _atomic_file(path, "wb") as f:
+        f.write(ormsgpack.packb(corpus))
+
+
+def _load_corpus(path: str) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        corpus = ormsgpack.unpackb(f.read())
+    if corpus.get("format") != CORPUS_FORMAT or corpus.get("version") != CORPUS_VERSION:
+        raise ValueError(f"Not a version {CORPUS_VERSION} contract analysis corpus: {path}")
+    return corpus
+
+
+def read_clause_table(path: str) -> Dict[str, List[Any]]:
+    """
+    Clause columns of a corpus with the strings resolved, plus a "document" column
+
+    Loads without building any models, e.g. for pandas.DataFrame(read_clause_table(path)).
+    """
+    return _clause_table(_load_corpus(path))
+
+
+def _clause_table(corpus: Dict[str, Any]) -> Dict[str, List[Any]]:
+    strings = corpus["strings"]
+    fields = _clause_fields()
+    table: Dict[str, List[Any]] = {"document": []}
+    for document in corpus["documents"]:
+        table["document"].extend([document["name"]] * (document["stop"] - document["start"]))
+    for field, values in corpus["columns"].items():
+        if fields.get(field, True):
+            table[field] = [strings[value] if value >= 0 else None for value in values]
+        else:
+            table[field] = values
+    return table
+
+
+def read_corpus(path: str) -> Dict[str, ContractReport]:
+    """Load the reports of a corpus written by write_corpus, by document name"""
+    corpus = _load_corpus(path)
+    table = _clause_table(corpus)
+    fields = [field for field in table if field != "document"]
+    reports = {}
+    for document in corpus["documents"]:
+        clauses = [{field: table[field][row] for field in fields} for row in range(document["start"], document["stop"])]
+        totals = {key: value for key, value in document.items() if key not in ("name", "start", "stop")}
+        reports[document["name"]] = ContractReport.model_validate({**totals, "clauses": clauses})
+    return reports
+
+
+def write_report(report: ContractReport, path: str) -> None:
+    """
+    Write a report atomically, so a partial file never looks complete
+
+    The format follows the extension: .json (indented JSON), .ndjson/.jsonl, or
+    .msgpack (a corpus holding this one report, named after the file).
+    """
+    file_format = report_format(path)
+    if file_format == "ndjson":
+        write_report_ndjson(report, path)
+    elif file_format == "msgpack":
+        write_corpus({document_name(path): report}, path)
+    else:
+        with _atomic_file(path, "w") as f:
+            json.dump(report.model_dump(), f, indent=2, ensure_ascii=False)
+
+
+def read_report(path: str) -> ContractReport:
+    """Load a report written by write_report in any of its formats"""
+    file_format = report_format(path)
+    if file_format == "ndjson":
+        return read_report_ndjson(path)
+    if file_format == "msgpack":
+        reports = read_corpus(path)
+        if len(reports) != 1:
+            raise ValueError(f"{path} holds {len(reports)} reports; use read_corpus")
+        return next(iter(reports.values()))
+    with open(path, "r", encoding="utf-8") as f:
+        return ContractReport.model_validate(json.load(f))
+
+
+def document_name(path: str) -> str:
+    """Document name of a report file, e.g. contract_analysis_lease.json -> lease"""
+    name = os.path.splitext(os.path.basename(path))[0]
+    return name[len("contract_analysis_"):] if name.startswith("contract_analysis_") else name
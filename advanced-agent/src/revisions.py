@@ -0,0 +1,66 @@
+import re
+from difflib import SequenceMatcher
+from typing import List, Optional, Sequence
+
+from .models import ClauseAlignment, ContractReport, RevisionSummary
+
+# Leading clause number, removed before comparing so renumbered clauses still match
+_NUMBERING = re.compile(
+    r"^\s*(?:\d+(?:\.\d+)*[.)]|[A-Z]\.|[IVX]+\.|(?:section|clause|article)\s+\d+(?:\.\d+)*[.:]?)\s*",
+    re.IGNORECASE,
+)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_clause(text: str) -> str:
+    """Clause text as compared across versions: numbering, case and whitespace differences are ignored"""
+    return _WHITESPACE.sub(" ", _NUMBERING.sub("", str(text), count=1)).strip().lower()
+
+
+def align_clauses(previous: Sequence[str], current: Sequence[str]) -> ClauseAlignment:
+    """
+    Align the clauses of a new contract version with those of the previous one
+
+    Identical clauses (after normalization) are matched in order with a longest
+    common subsequence alignment. Within each stretch that differs, clauses are
+    paired up in order as modified; the leftover new clauses are added and the
+    leftover old ones removed.
+
+    Args:
+        previous: Clause texts of the previous version
+        current: Clause texts of the new version
+
+    Returns:
+        Change and previous index of every new clause, plus the removed old clauses
+    """
+    old = [normalize_clause(clause) for clause in previous]
+    new = [normalize_clause(clause) for clause in current]
+    changes: List[str] = [""] * len(new)
+    matches: List[Optional[int]] = [None] * len(new)
+    removed: List[int] = []
+
+    for tag, i1, i2, j1, j2 in SequenceMatcher(None, old, new, autojunk=False).get_opcodes():
+        if tag == "equal":
+            for offset in range(j2 - j1):
+                changes[j1 + offset] = "unchanged"
+                matches[j1 + offset] = i1 + offset
+            continue
+        paired = min(i2 - i1, j2 - j1)
+        for offset in range(j2 - j1):
+            changes[j1 + offset] = "modified" if offset < paired else "added"
+            if offset < paired:
+                matches[j1 + offset] = i1 + offset
+        removed.extend(range(i1 + paired, i2))
+
+    return ClauseAlignment(changes=changes, previous_indices=matches, removed=removed)
+
+
+def summarize_revision(alignment: ClauseAlignment, previous: ContractReport) -> RevisionSummary:
+    """Changed/unchanged/removed breakdown of a new version against the previous report"""
+    return RevisionSummary(
+        unchanged=alignment.changes.count("unchanged"),
+        modified=alignment.changes.count("modified"),
+        added=alignment.changes.count("added"),
+        removed=len(alignment.removed),
+        removed_clauses=[str(previous.clauses[i].clause) for i in alignment.removed],
+    )
@@ -0,0 +1,363 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .tokens import estimate_tokens
+
+# Errors without a status code that are worth retrying (openai and httpx class names)
+RETRYABLE_ERROR_NAMES = {
+    "APIConnectionError",
+    "APITimeoutError",
+    "ConnectError",
+    "ConnectionError",
+    "ReadTimeout",
+    "RemoteProtocolError",
+    "TimeoutError",
+}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at a fixed rate
+
+    Callers reserve tokens up front and then sleep for however long the bucket
+    needs to cover the reservation, so concurrent callers queue up fairly instead
+    of polling.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens held, i.e. the largest burst allowed
+        """
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("rate and capacity must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, amount: float) -> "TokenBucket":
+        """Bucket allowing `amount` per minute, with up to a minute's worth in one burst"""
+        return cls(amount / 60.0, amount)
+
+    def _reserve(self, amount: float) -> float:
+        """Take `amount` tokens (the balance may go negative); returns the seconds to wait"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self, amount: float = 1) -> None:
+        time.sleep(self._reserve(amount))
+
+    async def aacquire(self, amount: float = 1) -> None:
+        await asyncio.sleep(self._reserve(amount))
+
+
+class AdaptiveConcurrency:
+    """
+    Concurrency limit adjusted by additive increase / multiplicative decrease
+
+    The limit grows by one after a full window of successful requests and is
+    halved when the provider throttles, at most once per window: throttles from
+    requests that started before the last decrease are ignored. Usable from
+    threads and from any number of event loops at once.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 64):
+        """
+        Args:
+            initial: Starting number of requests allowed in flight
+            minimum: The limit never drops below this
+            maximum: The limit never grows above this
+        """
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError("expected 1 <= minimum <= initial <= maximum")
+        self.minimum = minimum
+        self.maximum = maximum
+        self._limit = initial
+        self._active = 0
+        self._successes = 0
+        self._last_decrease = float("-inf")
+        self._waiters: deque = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._active < self._limit and not self._waiters:
+                self._active += 1
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        # release() hands its slot over before setting the event
+        event.wait()
+
+    async def aacquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._active < self._limit and not self._waiters:
+                self._active += 1
+                return
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if (loop, future) in self._waiters:
+                    self._waiters.remove((loop, future))
+                    raise
+            # The slot was handed over already; a cancelled future gives it back in _resolve
+            if not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            self._active -= 1
+            self._wake()
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._successes += 1
+            if self._successes >= self._limit:
+                self._successes = 0
+                self._limit = min(self.maximum, self._limit + 1)
+                self._wake()
+
+    def on_throttle(self, started: float) -> None:
+        """Halve the limit after a throttled request that started at monotonic time `started`"""
+        with self._lock:
+            if started < self._last_decrease:
+                return
+            self._last_decrease = time.monotonic()
+            self._successes = 0
+            self._limit = max(self.minimum, self._limit // 2)
+
+    def _wake(self) -> None:
+        """Hand free slots to waiters in arrival order (called with the lock held)"""
+        while self._waiters and self._active < self._limit:
+            waiter = self._waiters.popleft()
+            self._active += 1
+            if isinstance(waiter, threading.Event):
+                waiter.set()
+            else:
+                loop, future = waiter
+                loop.call_soon_threadsafe(self._resolve, future)
+
+    def _resolve(self, future: asyncio.Future) -> None:
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+
+class RequestScheduler:
+    """
+    Rate-limit-aware scheduling of LLM requests
+
+    Every request first waits for the request and token budgets (token buckets
+    per minute, charged with the estimated prompt tokens plus the expected output),
+    then for a slot of the adaptive concurrency limit. Rate-limit (429), server
+    (5xx), timeout and connection errors are retried with full-jitter exponential
+    backoff, honoring Retry-After when the provider sends it. A 429 also pauses
+    all requests of the scheduler until the retry time, and halves the concurrency.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        initial_concurrency: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: int = 64,
+        max_retries: int = 6,
+        base_delay: float = 0.5,
+        max_delay: float = 60.0,
+        expected_output_tokens: int = 500,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            requests_per_minute: Request budget (None for no limit)
+            tokens_per_minute: Token budget, prompt plus expected output (None for no limit)
+            initial_concurrency: Requests in flight before any feedback from the provider
+            min_concurrency: Lower bound of the adaptive concurrency limit
+            max_concurrency: Upper bound of the adaptive concurrency limit
+            max_retries: Retries per request before the error is raised
+            base_delay: Backoff ceiling of the first retry, doubled on every further retry
+            max_delay: Largest backoff between two attempts
+            expected_output_tokens: Completion tokens charged per request on top of the prompt
+            seed: Seed of the backoff jitter, for reproducible tests
+        """
+        self.requests = TokenBucket.per_minute(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket.per_minute(tokens_per_minute) if tokens_per_minute else None
+        self.concurrency = AdaptiveConcurrency(initial_concurrency, min_concurrency, max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.expected_output_tokens = expected_output_tokens
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self._counts = {"requests": 0, "retries": 0, "throttled": 0, "server_errors": 0, "failures": 0}
+
+    def wrap(self, llm: Any) -> "ScheduledLLM":
+        """Proxy of a chat model (or runnable) whose calls go through this scheduler"""
+        return ScheduledLLM(llm, self)
+
+    def stats(self) -> Dict[str, int]:
+        """Requests made, retries, 429 and 5xx responses, failed requests and the current concurrency limit"""
+        with self._lock:
+            return {**self._counts, "concurrency": self.concurrency.limit}
+
+    def call(self, fn: Callable[[], Any], messages: Any = None) -> Any:
+        """Run a blocking LLM call under the rate limits, retrying transient errors"""
+        cost = self.estimate_tokens(messages)
+        for attempt in range(self.max_retries + 1):
+            time.sleep(self._start_attempt())
+            if self.requests:
+                self.requests.acquire()
+            if self.tokens:
+                self.tokens.acquire(cost)
+            self.concurrency.acquire()
+            started = time.monotonic()
+            try:
+                result = fn()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, started)
+            else:
+                self.concurrency.on_success()
+                return result
+            finally:
+                self.concurrency.release()
+            time.sleep(delay)
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]], messages: Any = None) -> Any:
+        """Async counterpart of call: fn returns a fresh awaitable for every attempt"""
+        cost = self.estimate_tokens(messages)
+        for attempt in range(self.max_retries + 1):
+            await asyncio.sleep(self._start_attempt())
+            if self.requests:
+                await self.requests.aacquire()
+            if self.tokens:
+                await self.tokens.aacquire(cost)
+            await self.concurrency.aacquire()
+            started = time.monotonic()
+            try:
+                result = await fn()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, started)
+            else:
+                self.concurrency.on_success()
+                return result
+            finally:
+                self.concurrency.release()
+            await asyncio.sleep(delay)
+
+    def estimate_tokens(self, messages: Any) -> int:
+        """Tokens charged to the token budget for one request"""
+        if messages is None:
+            prompt = ""
+        elif isinstance(messages, str):
+            prompt = messages
+        else:
+            prompt = "".join(str(getattr(message, "content", message)) for message in messages)
+        return estimate_tokens(prompt) + self.expected_output_tokens
+
+    def _start_attempt(self) -> float:
+        """Count an attempt; returns how long a pause requested by the provider still lasts"""
+        with self._lock:
+            self._counts["requests"] += 1
+            return max(0.0, self._paused_until - time.monotonic())
+
+    def _retry_delay(self, error: Exception, attempt: int, started: float) -> float:
+        """Record a failed attempt; returns the backoff before the next one or re-raises"""
+        status = self._status_code(error)
+        throttled = status == 429
+        retryable = throttled or (status is not None and (status >= 500 or status == 408)) or (
+            status is None and any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__)
+        )
+        with self._lock:
+            if throttled:
+                self._counts["throttled"] += 1
+            elif status is not None and status >= 500:
+                self._counts["server_errors"] += 1
+            if not retryable or attempt >= self.max_retries:
+                self._counts["failures"] += 1
+                raise error
+            self._counts["retries"] += 1
+            retry_after = self._retry_after(error)
+            if retry_after is None:
+                # Full jitter keeps retries of concurrent requests from arriving together
+                delay = self._rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+            else:
+                # A little jitter so requests told the same time do not all retry at once
+                delay = min(self.max_delay, retry_after * self._rng.uniform(1.0, 1.2))
+            if throttled:
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        if throttled:
+            self.concurrency.on_throttle(started)
+        return delay
+
+    @staticmethod
+    def _status_code(error: Exception) -> Optional[int]:
+        status = getattr(error, "status_code", None)
+        if status is None:
+            status = getattr(getattr(error, "response", None), "status_code", None)
+        return status if isinstance(status, int) else None
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """Seconds requested by the Retry-After (or retry-after-ms) header, if any"""
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if not headers:
+            return None
+        try:
+            if headers.get("retry-after-ms") is not None:
+                return float(headers["retry-after-ms"]) / 1000.0
+            if headers.get("retry-after") is not None:
+                return float(headers["retry-after"])
+        except (TypeError, ValueError):
+            # HTTP-date values are rare for LLM APIs; fall back to backoff
+            return None
+        return None
+
+
+class ScheduledLLM:
+    """Chat model proxy that routes invoke and ainvoke through a RequestScheduler"""
+
+    def __init__(self, llm: Any, scheduler: RequestScheduler):
+        """
+        Args:
+            llm: Chat model or runnable to wrap
+            scheduler: Scheduler applying the rate limits and retries
+        """
+        self.llm = llm
+        self.scheduler = scheduler
+
+    def invoke(self, messages: Any, **kwargs: Any) -> Any:
+        return self.scheduler.call(lambda: self.llm.invoke(messages, **kwargs), messages)
+
+    async def ainvoke(self, messages: Any, **kwargs: Any) -> Any:
+        return await self.scheduler.acall(lambda: self.llm.ainvoke(messages, **kwargs), messages)
+
+    def with_structured_output(self, schema: Any, **kwargs: Any) -> "ScheduledLLM":
+        return ScheduledLLM(self.llm.with_structured_output(schema, **kwargs), self.scheduler)
+
+    def __getattr__(self, name: str) -> Any:
+        # model_name and other attributes of the wrapped model
+        return getattr(self.llm, name)
@@ -0,0 +1,324 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .batch import CONTRACT_EXTENSIONS
+from .models import AnalysisJob, ClauseAnalysis, ContractReport
+from .workflow import ContractAnalysisWorkflow
+
+
+class JobQueueFull(Exception):
+    """Raised when a contract is submitted while the job queue is full"""
+
+
+class _Job:
+    """A submitted contract: its public status, uploaded file and results so far"""
+
+    def __init__(self, status: AnalysisJob, path: str):
+        self.status = status
+        self.path = path
+        self.analyses: List[ClauseAnalysis] = []
+        self.report: Optional[ContractReport] = None
+        self.suggestion_lock = asyncio.Lock()
+        self._changed = asyncio.Event()
+
+    @property
+    def changed(self) -> asyncio.Event:
+        """Event set at the job's next change"""
+        return self._changed
+
+    def notify(self) -> None:
+        """Wake every stream waiting for this job's next result"""
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+
+class AnalysisService:
+    """
+    Queue of contract analyses served by one warm workflow
+
+    The workflow (with its compiled graph, its chat model and the model's pooled
+    HTTP client) is created once and shared by every job. Jobs run on the
+    service's event loop, `concurrent_jobs` at a time, through the same compiled
+    graph as the command line and batch runs (`arun`), and each clause result is
+    streamed to clients as soon as it and the clauses before it are analyzed.
+    """
+
+    def __init__(
+        self,
+        workflow: ContractAnalysisWorkflow,
+        upload_dir: Optional[str] = None,
+        concurrent_jobs: int = 2,
+        max_queued_jobs: int = 100,
+        max_finished_jobs: int = 1000,
+        max_upload_bytes: int = 50 * 1024 * 1024,
+    ):
+        """
+        Args:
+            workflow: Workflow shared by all jobs (use console=False to keep the service log quiet)
+            upload_dir: Where uploads are kept until their job finishes (a temporary directory by default)
+            concurrent_jobs: Contracts analyzed at the same time
+            max_queued_jobs: Jobs waiting to start before submissions are refused
+            max_finished_jobs: Finished jobs whose results are kept; older ones are forgotten
+            max_upload_bytes: Largest accepted upload
+        """
+        if concurrent_jobs < 1:
+            raise ValueError("concurrent_jobs must be at least 1")
+        self.workflow = workflow
+        self.upload_dir = upload_dir or tempfile.mkdtemp(prefix="contract_uploads_")
+        os.makedirs(self.upload_dir, exist_ok=True)
+        self.concurrent_jobs = concurrent_jobs
+        self.max_queued_jobs = max_queued_jobs
+        self.max_finished_jobs = max_finished_jobs
+        self.max_upload_bytes = max_upload_bytes
+        self._jobs: "OrderedDict[str, _Job]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Start the job workers on the running event loop"""
+        self._queue = asyncio.Queue(maxsize=self.max_queued_jobs)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrent_jobs)]
+
+    async def stop(self) -> None:
+        """Cancel the workers; queued and running jobs are abandoned"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, file_name: str, data: bytes) -> AnalysisJob:
+        """
+        Queue a contract for analysis
+
+        Args:
+            file_name: Original file name; its extension selects PDF or text loading
+            data: File contents
+
+        Returns:
+            The queued job's status
+
+        Raises:
+            ValueError: Unsupported file type or upload too large
+            JobQueueFull: Too many jobs are waiting
+        """
+        file_name = os.path.basename(file_name or "")
+        if not file_name.lower().endswith(CONTRACT_EXTENSIONS):
+            raise ValueError(f"Unsupported file type, expected one of {CONTRACT_EXTENSIONS}")
+        if len(data) > self.max_upload_bytes:
+            raise ValueError(f"Upload exceeds {self.max_upload_bytes} bytes")
+        if self._queue is None:
+            raise RuntimeError("The service has not been started")
+        if self._queue.full():
+            raise JobQueueFull(f"{self.max_queued_jobs} jobs are already waiting")
+
+        job_id = uuid.uuid4().hex
+        path = os.path.join(self.upload_dir, f"{job_id}_{file_name}")
+        # Written off the event loop, so a large upload does not stall the other requests
+        await asyncio.to_thread(_write_upload, path, data)
+        job = _Job(AnalysisJob(job_id=job_id, file_name=file_name, submitted_at=time.time()), path)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            # Other uploads filled the queue during the write
+            os.unlink(path)
+            raise JobQueueFull(f"{self.max_queued_jobs} jobs are already waiting")
+        self._jobs[job_id] = job
+        self._forget_finished_jobs()
+        return job.status
+
+    def status(self, job_id: str) -> AnalysisJob:
+        """Current status of a job (KeyError if unknown)"""
+        return self._jobs[job_id].status
+
+    def report(self, job_id: str) -> Optional[ContractReport]:
+        """Report of a finished job, or None while it is queued or running (KeyError if unknown)"""
+        return self._jobs[job_id].report
+
+    async def suggest(self, job_id: str, indices: Optional[List[int]] = None) -> ContractReport:
+        """
+        Generate deferred suggestions of a finished job, memoized in its report
+
+        Args:
+            job_id: Job analyzed by a workflow with defer_suggestions
+            indices: Clause indices (0-based); all risky clauses by default
+
+        Raises:
+            KeyError: Unknown job
+            ValueError: The job has no report yet
+            IndexError: A clause index is out of range
+        """
+        job = self._jobs[job_id]
+        if job.report is None:
+            raise ValueError(f"Job is {job.status.status}")
+        # One resolution at a time per job, so a suggestion is never generated twice
+        async with job.suggestion_lock:
+            return await self.workflow.aresolve_suggestions(job.report, indices)
+
+    async def stream(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Events of a job: one "clause" event per analysis in clause order (starting with
+        those already finished), then a final "done" or "failed" event
+
+        Raises:
+            KeyError: Unknown job
+        """
+        job = self._jobs[job_id]
+        sent = 0
+        while True:
+            # Take the event before reading the state, so no change is missed while yielding
+            changed = job.changed
+            while sent < len(job.analyses):
+                yield {"event": "clause", "index": sent, "analysis": job.analyses[sent].model_dump(mode="json")}
+                sent += 1
+            if job.status.status in ("done", "failed"):
+                yield {"event": job.status.status, "job": job.status.model_dump(mode="json")}
+                return
+            await changed.wait()
+
+    def queued_jobs(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: _Job) -> None:
+        job.status.status = "running"
+        job.status.started_at = time.time()
+        job.notify()
+
+        def on_analysis(index: int, analysis: ClauseAnalysis) -> None:
+            job.analyses.append(analysis)
+            job.status.clauses_analyzed = len(job.analyses)
+            job.notify()
+
+        try:
+            job.report = await self.workflow.arun(job.path, on_analysis=on_analysis)
+            job.status.status = "done"
+        except Exception as e:
+            job.status.status = "failed"
+            job.status.error = str(e)
+        finally:
+            job.status.finished_at = time.time()
+            job.notify()
+            if os.path.exists(job.path):
+                os.unlink(job.path)
+
+    def _forget_finished_jobs(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.status.status in ("done", "failed")]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+    def close(self) -> None:
+        """Remove the upload directory"""
+        shutil.rmtree(self.upload_dir, ignore_errors=True)
+
+
+def _write_upload(path: str, data: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def create_app(service: AnalysisService):
+    """
+    ASGI application exposing an AnalysisService (requires the "service" extra: fastapi, python-multipart)
+
+    Endpoints:
+        POST /jobs                 upload a contract (multipart field "file"); 202 with the job status
+        GET  /jobs/{job_id}        job status
+        GET  /jobs/{job_id}/report final report; 409 while the job is still queued or running
+        GET  /jobs/{job_id}/stream clause results as newline-delimited JSON while they are produced
+        POST /jobs/{job_id}/suggestions generate deferred suggestions (?clause=N, repeatable, 0-based;
+                                   all risky clauses by default) and return the updated report
+        GET  /health               queue length and worker count
+        GET  /metrics              Prometheus counters, when the workflow has metrics
+    """
+    try:
+        from contextlib import asynccontextmanager
+        from fastapi import FastAPI, File, HTTPException, Query, UploadFile
+        from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+    except ImportError as e:
+        raise ImportError("Service mode requires FastAPI: pip install -e '.[service]'") from e
+
+    @asynccontextmanager
+    async def lifespan(app):
+        await service.start()
+        try:
+            yield
+        finally:
+            await service.stop()
+
+    app = FastAPI(title="Contract Analyzer", lifespan=lifespan)
+
+    def find(job_id: str) -> AnalysisJob:
+        try:
+            return service.status(job_id)
+        except KeyError:
+            raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+
+    @app.post("/jobs", status_code=202, response_model=AnalysisJob)
+    async def submit(file: UploadFile = File(...)) -> AnalysisJob:
+        data = await file.read(service.max_upload_bytes + 1)
+        try:
+            return await service.submit(file.filename, data)
+        except JobQueueFull as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    @app.get("/jobs/{job_id}", response_model=AnalysisJob)
+    async def status(job_id: str) -> AnalysisJob:
+        return find(job_id)
+
+    @app.get("/jobs/{job_id}/report")
+    async def report(job_id: str):
+        job = find(job_id)
+        if job.status == "failed":
+            raise HTTPException(status_code=500, detail=job.error)
+        if job.status != "done":
+            raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+        return JSONResponse(service.report(job_id).model_dump(mode="json"))
+
+    @app.post("/jobs/{job_id}/suggestions")
+    async def suggestions(job_id: str, clause: Optional[List[int]] = Query(None)):
+        find(job_id)
+        try:
+            report = await service.suggest(job_id, clause)
+        except ValueError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except IndexError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return JSONResponse(report.model_dump(mode="json"))
+
+    @app.get("/jobs/{job_id}/stream")
+    async def stream(job_id: str):
+        find(job_id)
+
+        async def lines():
+            async for event in service.stream(job_id):
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok", "queued_jobs": service.queued_jobs(), "concurrent_jobs": service.concurrent_jobs}
+
+    @app.get("/metrics")
+    async def metrics():
+        if service.workflow.metrics is None:
+            raise HTTPException(status_code=404, detail="Metrics are not enabled")
+        return PlainTextResponse(service.workflow.metrics.prometheus_text(), media_type="text/plain; version=0.0.4")
+
+    return app
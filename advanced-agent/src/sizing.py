@@ -0,0 +1,182 @@
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .clause_splitter import ClauseSplitter
+from .spans import ClauseSpans
+from .tokens import CHARS_PER_TOKEN, estimate_tokens
+
+
+class ClauseBudget(NamedTuple):
+    """Size limits of the clauses sent to one model, in estimated tokens"""
+    max_tokens: int  # longer clauses are split at sentence boundaries
+    min_tokens: int  # shorter fragments are merged into a neighbouring clause
+
+
+# Clause budgets by model; dated model names (gpt-4o-mini-2024-07-18) use their base model's budget
+MODEL_BUDGETS: Dict[str, ClauseBudget] = {
+    "gpt-4o-mini": ClauseBudget(1000, 15),
+    "gpt-4o": ClauseBudget(1500, 15),
+    "gpt-4.1-mini": ClauseBudget(1000, 15),
+    "gpt-4.1": ClauseBudget(2000, 15),
+}
+DEFAULT_BUDGET = ClauseBudget(1000, 15)
+
+# A piece of a clause: (text it points into, start, end)
+Segment = Tuple[str, int, int]
+
+
+class _Piece(NamedTuple):
+    segments: List[Segment]
+    tokens: int
+
+
+class ClauseSizer:
+    """
+    Bring split clauses within a per-model token budget before analysis
+
+    Clauses estimated above the budget's max_tokens are split at sentence
+    boundaries (or, for a single run-on sentence, at the last space that fits),
+    so no request grows with the length of an unsplit clause. Fragments below
+    min_tokens, such as a bare heading, are merged into the following clause, or
+    into the previous one, when the result still fits, so they do not each cost a
+    full round of LLM calls.
+    """
+
+    SEPARATOR = " "
+
+    def __init__(
+        self,
+        budgets: Optional[Dict[str, ClauseBudget]] = None,
+        default: ClauseBudget = DEFAULT_BUDGET,
+        estimator: Callable[[str], int] = estimate_tokens,
+    ):
+        """
+        Args:
+            budgets: Clause budgets by model name (MODEL_BUDGETS by default)
+            default: Budget of models without an entry
+            estimator: Local token estimator used to measure clauses
+        """
+        self.budgets = dict(MODEL_BUDGETS if budgets is None else budgets)
+        for budget in [default, *self.budgets.values()]:
+            if budget.max_tokens < 1 or not 0 <= budget.min_tokens <= budget.max_tokens:
+                raise ValueError(f"Invalid clause budget {budget}")
+        self.default = default
+        self.estimator = estimator
+        self._sentence_regex = re.compile(ClauseSplitter().sentence_pattern)
+
+    def budget(self, model: str) -> ClauseBudget:
+        """Budget of a model: its own entry, else the longest listed name it starts with, else the default"""
+        if model in self.budgets:
+            return self.budgets[model]
+        # Longest match, so gpt-4o-mini-... does not get the budget of gpt-4o
+        matches = [name for name in self.budgets if model.startswith(name)]
+        return self.budgets[max(matches, key=len)] if matches else self.default
+
+    def resize(self, spans: ClauseSpans, model: str) -> ClauseSpans:
+        """
+        Resize clauses stored as spans, without copying the contract text
+
+        Args:
+            spans: Clauses from ClauseSplitter.split_clause_spans
+            model: Name of the model the clauses will be sent to
+
+        Returns:
+            ClauseSpans over the same text
+        """
+        text = spans.text
+        clauses = ([(text, start, end) for start, end in spans.segments(i)] for i in range(len(spans)))
+        resized = ClauseSpans(text, spans.separator)
+        for piece in self._iter_sized(clauses, self.budget(model)):
+            resized.append((start, end) for _, start, end in piece)
+        return resized
+
+    def iter_resize(self, clauses: Iterable[str], model: str) -> Iterator[str]:
+        """
+        Lazily resize a stream of clauses (e.g. from ClauseSplitter.iter_clauses)
+
+        At most one resized clause is held back, to see whether a following fragment
+        has to be merged into it.
+        """
+        pieces = self._iter_sized(([(clause, 0, len(clause))] for clause in clauses), self.budget(model))
+        for piece in pieces:
+            yield self._join(piece)
+
+    def _iter_sized(self, clauses: Iterable[List[Segment]], budget: ClauseBudget) -> Iterator[List[Segment]]:
+        """Split oversized clauses, then merge fragments into a neighbour while the result fits"""
+        held: Optional[_Piece] = None
+        for segments in clauses:
+            for piece in self._split(segments, budget):
+                if held is None:
+                    held = piece
+                    continue
+                if min(held.tokens, piece.tokens) < budget.min_tokens:
+                    merged = self._piece(held.segments + piece.segments)
+                    if merged.tokens <= budget.max_tokens:
+                        held = merged
+                        continue
+                yield held.segments
+                held = piece
+        if held is not None:
+            yield held.segments
+
+    def _split(self, segments: List[Segment], budget: ClauseBudget) -> Iterator[_Piece]:
+        """A clause as one piece, or packed runs of its sentences if it exceeds the budget"""
+        tokens = self.estimator(self._join(segments))
+        if tokens <= budget.max_tokens:
+            yield _Piece(segments, tokens)
+            return
+
+        # (segment number, start, end, tokens) of every sentence, in order
+        units = [
+            (number, start, end, self.estimator(text[start:end]))
+            for number, (text, first, last) in enumerate(segments)
+            for start, end in self._iter_sentence_bounds(text, first, last, budget.max_tokens * CHARS_PER_TOKEN)
+        ]
+        current: List[Segment] = []
+        current_tokens = 0  # upper bound: each separator counted as a whole token
+        last_number = -1
+        for number, start, end, unit_tokens in units:
+            if current and current_tokens + 1 + unit_tokens > budget.max_tokens:
+                yield self._piece(current)
+                current, current_tokens, last_number = [], 0, -1
+            text = segments[number][0]
+            if number == last_number:
+                # Sentences of one segment stay one contiguous segment
+                current[-1] = (text, current[-1][1], end)
+            else:
+                current.append((text, start, end))
+            current_tokens += unit_tokens + (1 if current_tokens else 0)
+            last_number = number
+        if current:
+            yield self._piece(current)
+
+    def _piece(self, segments: List[Segment]) -> _Piece:
+        return _Piece(segments, self.estimator(self._join(segments)))
+
+    def _iter_sentence_bounds(self, text: str, start: int, end: int, max_chars: int) -> Iterator[Tuple[int, int]]:
+        """Bounds of the sentences of text[start:end], sentences longer than max_chars cut at spaces"""
+        position = start
+        for match in self._sentence_regex.finditer(text, start, end):
+            yield from self._iter_cut(text, position, match.start(), max_chars)
+            position = match.end()
+        yield from self._iter_cut(text, position, end, max_chars)
+
+    @staticmethod
+    def _iter_cut(text: str, start: int, end: int, max_chars: int) -> Iterator[Tuple[int, int]]:
+        """Cut text[start:end] into pieces of at most max_chars, at the last space where possible"""
+        while end - start > max_chars:
+            cut = text.rfind(" ", start + 1, start + max_chars + 1)
+            if cut == -1:
+                yield start, start + max_chars
+                start += max_chars
+            else:
+                yield start, cut
+                start = cut + 1
+        if end > start:
+            yield start, end
+
+    def _join(self, segments: List[Segment]) -> str:
+        if len(segments) == 1:
+            text, start, end = segments[0]
+            return text[start:end]
+        return self.SEPARATOR.join(text[start:end] for text, start, end in segments)
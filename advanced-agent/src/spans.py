@@ -0,0 +1,149 @@
+from array import array
+from typing import Any, Iterable, Iterator, List, Tuple, Union
+
+from pydantic_core import core_schema
+
+
+class ClauseSpans:
+    """
+    Clauses stored as character offsets into one shared contract text
+
+    Each clause is one or more segments of the text (sentence-grouped clauses
+    consist of several sentences joined with a space). Segment bounds live in
+    flat integer arrays, so a document with thousands of clauses costs a few
+    bytes per clause on top of the single copy of the text.
+    """
+
+    __slots__ = ("text", "separator", "_starts", "_ends", "_offsets")
+
+    def __init__(self, text: str, separator: str = " "):
+        """
+        Args:
+            text: Shared buffer the spans point into
+            separator: Text placed between the segments of a clause when it is materialized
+        """
+        self.text = text
+        self.separator = separator
+        self._starts = array("q")
+        self._ends = array("q")
+        # Clause i owns segments _offsets[i] to _offsets[i + 1]
+        self._offsets = array("q", [0])
+
+    def append(self, segments: Iterable[Tuple[int, int]]) -> None:
+        """Add a clause made of (start, end) segments of the text"""
+        for start, end in segments:
+            self._starts.append(start)
+            self._ends.append(end)
+        self._offsets.append(len(self._starts))
+
+    def extend(self, bounds: Iterable[Tuple[int, int]]) -> None:
+        """Add one single-segment clause per (start, end) pair"""
+        first = len(self._starts)
+        for start, end in bounds:
+            self._starts.append(start)
+            self._ends.append(end)
+        self._offsets.extend(range(first + 1, len(self._starts) + 1))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> "ClauseText":
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("clause index out of range")
+        return ClauseText(self, index)
+
+    def __iter__(self) -> Iterator["ClauseText"]:
+        return (ClauseText(self, index) for index in range(len(self)))
+
+    def segments(self, index: int) -> List[Tuple[int, int]]:
+        """(start, end) offsets of the segments of a clause"""
+        first, last = self._offsets[index], self._offsets[index + 1]
+        return list(zip(self._starts[first:last], self._ends[first:last]))
+
+    def text_at(self, index: int) -> str:
+        """Materialize the text of a clause"""
+        first, last = self._offsets[index], self._offsets[index + 1]
+        if last - first == 1:
+            return self.text[self._starts[first]:self._ends[first]]
+        return self.separator.join(self.text[self._starts[i]:self._ends[i]] for i in range(first, last))
+
+    def length_at(self, index: int) -> int:
+        """Length of a clause's text without materializing it"""
+        first, last = self._offsets[index], self._offsets[index + 1]
+        characters = sum(self._ends[i] - self._starts[i] for i in range(first, last))
+        return characters + len(self.separator) * max(last - first - 1, 0)
+
+    def to_list(self) -> List[str]:
+        """Materialize every clause"""
+        if len(self._starts) == len(self):
+            text = self.text
+            return [text[start:end] for start, end in zip(self._starts, self._ends)]
+        return [self.text_at(index) for index in range(len(self))]
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: Any) -> core_schema.CoreSchema:
+        return core_schema.is_instance_schema(
+            cls, serialization=core_schema.plain_serializer_function_ser_schema(lambda spans: spans.to_list())
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, schema: core_schema.CoreSchema, handler: Any) -> dict:
+        return {"type": "array", "items": {"type": "string"}}
+
+
+class ClauseText:
+    """
+    Lazy reference to one clause of a ClauseSpans
+
+    Behaves like the clause's string where the workflow needs it (formatting into
+    prompts, len, comparison, slicing) and serializes to a plain string, but only
+    builds that string on demand.
+    """
+
+    __slots__ = ("spans", "index")
+
+    def __init__(self, spans: ClauseSpans, index: int):
+        self.spans = spans
+        self.index = index
+
+    def __str__(self) -> str:
+        return self.spans.text_at(self.index)
+
+    def __repr__(self) -> str:
+        return f"ClauseText({str(self)!r})"
+
+    def __format__(self, format_spec: str) -> str:
+        return format(str(self), format_spec)
+
+    def __len__(self) -> int:
+        return self.spans.length_at(self.index)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __getitem__(self, key):
+        return str(self)[key]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (str, ClauseText)):
+            return str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source: Any, handler: Any) -> core_schema.CoreSchema:
+        return core_schema.is_instance_schema(
+            cls, serialization=core_schema.plain_serializer_function_ser_schema(str)
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, schema: core_schema.CoreSchema, handler: Any) -> dict:
+        return {"type": "string"}
+
+
+# A clause as passed through the workflow: plain text or a span of the contract text
+Clause = Union[str, ClauseText]
@@ -0,0 +1,17 @@
+# Average number of characters per token for English prose with OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheaply estimate the number of tokens in a piece of text
+
+    Args:
+        text: Text that will be sent to the LLM
+
+    Returns:
+        Approximate token count (at least 1 for non-empty text)
+    """
+    if not text:
+        return 0
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
@@ -1,27 +1,191 @@
-from typing import Dict, Any
-from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, SystemMessage
+from typing import TYPE_CHECKING, Dict, Any, AsyncIterator, Callable, Iterator, List, Optional, Sequence, Tuple
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import contextlib
+import contextvars
+import os
+import threading
 import json
-from .models import ContractState, ClauseAnalysis, ContractReport
+from .models import BatchAssessment, ContractState, ClauseAnalysis, ClauseAssessment, ContractReport, RevisionSummary
 from .pdf_loader import PDFLoader
 from .clause_splitter import ClauseSplitter
 from .prompts import ContractAnalysisPrompts
+from .cache import ClauseCache
+from .dedup import NearDuplicateIndex
+from .prescreen import ClausePrescreener
+from .revisions import align_clauses, summarize_revision
+from .sizing import ClauseSizer
+from .tokens import estimate_tokens
+from .spans import Clause
+from .scheduler import RequestScheduler
+
+# LangGraph, LangChain and the OpenAI client take most of the startup time; they
+# are imported when a graph is compiled or a chat model is first used
+if TYPE_CHECKING:
+    from langchain_core.runnables import RunnableConfig
+    from .checkpoints import AnalysisCheckpoints
+    from .metrics import WorkflowMetrics
 
 
 class ContractAnalysisWorkflow:
-    def __init__(self):
+    # Available clause analysis engines
+    ENGINES = ("three_call", "structured", "batched")
+
+    # Summary of the placeholder analysis used when a clause could not be analyzed
+    FALLBACK_SUMMARY = "Analysis failed"
+
+    # risk_reason used when the risk JSON cannot be parsed
+    RISK_PARSE_FAILED = "Analysis failed - manual review recommended"
+
+    # Suggestion of a clause analyzed with defer_suggestions, until it is resolved
+    PENDING_SUGGESTION = "Pending"
+
+    def __init__(
+        self,
+        max_concurrency: int = 1,
+        engine: str = "three_call",
+        cache: Optional[ClauseCache] = None,
+        batch_token_budget: int = 2000,
+        max_batch_clauses: int = 10,
+        dedup: Optional[NearDuplicateIndex] = None,
+        extraction_workers: int = 1,
+        preserve_layout: bool = False,
+        checkpoints: Optional["AnalysisCheckpoints"] = None,
+        llm: Optional[Any] = None,
+        scheduler: Optional[RequestScheduler] = None,
+        metrics: Optional["WorkflowMetrics"] = None,
+        console: bool = True,
+        prescreen: Optional[ClausePrescreener] = None,
+        defer_suggestions: bool = False,
+        sizer: Optional[ClauseSizer] = None,
+    ):
+        """
+        Args:
+            max_concurrency: Maximum number of clauses analyzed at the same time.
+                Values above 1 run the analysis step asynchronously via ``ainvoke``.
+            engine: "three_call" makes separate summary, risk and suggestion calls;
+                "structured" gets the whole analysis from one structured-output call;
+                "batched" packs several clauses into each structured-output call.
+            cache: Optional persistent cache consulted before calling the LLM
+            batch_token_budget: Estimated clause tokens packed into one batched request
+            max_batch_clauses: Upper bound on clauses per batched request
+            dedup: Optional near-duplicate index; clauses similar enough to an already
+                analyzed clause reuse its analysis instead of calling the LLM
+            extraction_workers: Processes used to extract PDF pages in parallel
+            preserve_layout: Extract PDFs from their block/span layout so numbered clauses
+                start on new lines and the numbering patterns can split them
+                (takes precedence over extraction_workers)
+            checkpoints: Optional durable checkpoint store; every clause analysis is
+                saved as soon as it finishes, so an interrupted run can be resumed
+            llm: Chat model to use instead of gpt-4o-mini, e.g. a FakeChatModel for offline runs
+            scheduler: Optional request scheduler enforcing rate limits with adaptive
+                concurrency and backoff; it replaces the client's own retries
+            metrics: Optional metrics collector receiving stage, clause and LLM request
+                spans (with token usage and cost) and cache, dedup and retry counters
+            console: Print progress to stdout
+            prescreen: Optional local classification tier; clearly benign boilerplate
+                (signature blocks, copyright lines, ...) gets a templated analysis
+                without an LLM call
+            defer_suggestions: Skip the suggestion call (three_call engine only); the
+                report marks suggestions as pending until resolve_suggestions is called
+            sizer: Optional sizing stage after splitting; clauses over the model's token
+                budget are split at sentence boundaries and tiny fragments are merged
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {self.ENGINES}")
+        if defer_suggestions and engine != "three_call":
+            raise ValueError("defer_suggestions requires the three_call engine")
+        self.max_concurrency = max_concurrency
+        self.engine = engine
         self.pdf_loader = PDFLoader()
         self.clause_splitter = ClauseSplitter()
-        self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.1)
+        self.scheduler = scheduler
+        self.metrics = metrics
+        # The default chat model is created on first use, so runs that never call it skip the OpenAI stack
+        self._llm = self._prepare_llm(llm) if llm is not None else None
+        self.console = console
         self.prompts = ContractAnalysisPrompts()
-        self.workflow = self._build_workflow()
+        self.prompt_version = self.prompts.version()
+        self.cache = cache
+        self.dedup = dedup
+        self.prescreen = prescreen
+        self.defer_suggestions = defer_suggestions
+        self.sizer = sizer
+        self.extraction_workers = extraction_workers
+        self.preserve_layout = preserve_layout
+        self.batch_token_budget = batch_token_budget
+        self.max_batch_clauses = max_batch_clauses
+        self._structured_runnable = None
+        self._batch_runnable = None
+        self.checkpoints = checkpoints
+        self._workflow = None
+        self._workflow_lock = threading.Lock()
+
+    # Process-wide workflows of shared(), by class and options
+    _shared: Dict[Tuple, "ContractAnalysisWorkflow"] = {}
+    _shared_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, **options: Any) -> "ContractAnalysisWorkflow":
+        """
+        Process-wide workflow for these constructor options, created on first use
+        
+        Later calls with the same options return the same instance, so repeated runs
+        reuse its compiled graph and chat model client. Options are compared by value
+        when hashable, otherwise by identity.
+        """
+        key = (cls, tuple(sorted((name, _option_key(value)) for name, value in options.items())))
+        with cls._shared_lock:
+            workflow = cls._shared.get(key)
+            if workflow is None:
+                workflow = cls._shared[key] = cls(**options)
+            return workflow
+
+    @property
+    def llm(self) -> Any:
+        """Chat model used for the analysis (gpt-4o-mini unless another model was given)"""
+        if self._llm is None:
+            from langchain_openai import ChatOpenAI
+            
+            self._llm = self._prepare_llm(
+                ChatOpenAI(model="gpt-4o-mini", temperature=0.1, max_retries=0 if self.scheduler else 2)
+            )
+        return self._llm
+
+    @llm.setter
+    def llm(self, llm: Any) -> None:
+        # Taken as is: callers replacing the model wrap it themselves
+        self._llm = llm
+
+    def _prepare_llm(self, llm: Any) -> Any:
+        """Instrument a chat model for metrics and route it through the scheduler"""
+        if self.metrics is not None:
+            self.metrics.instrument(llm)
+        return self.scheduler.wrap(llm) if self.scheduler is not None else llm
+
+    @property
+    def workflow(self):
+        """The compiled analysis graph, built on first use and reused by every run"""
+        if self._workflow is None:
+            with self._workflow_lock:
+                if self._workflow is None:
+                    self._workflow = self._build_workflow(self.checkpoints.saver if self.checkpoints is not None else None)
+        return self._workflow
 
-    def _build_workflow(self):
+    def _build_workflow(self, checkpointer=None):
+        from langgraph.graph import StateGraph, END
+        from langchain_core.runnables import RunnableLambda
+        
         graph = StateGraph(ContractState)
         graph.add_node("load_contract", self._load_contract_step)
         graph.add_node("split_clauses", self._split_clauses_step)
-        graph.add_node("analyze_clauses", self._analyze_clauses_step)
+        graph.add_node(
+            "analyze_clauses",
+            RunnableLambda(self._analyze_clauses_step, afunc=self._aanalyze_clauses_step),
+        )
         graph.add_node("generate_report", self._generate_report_step)
         
         graph.set_entry_point("load_contract")
@@ -30,105 +194,605 @@ class ContractAnalysisWorkflow:
         graph.add_edge("analyze_clauses", "generate_report")
         graph.add_edge("generate_report", END)
         
-        return graph.compile()
+        return graph.compile(checkpointer=checkpointer)
 
     def _load_contract_step(self, state: ContractState) -> Dict[str, Any]:
         """Load contract from file (PDF or text)"""
-        print("📄 Loading contract file...")
+        with self._span("stage", "load_contract", document=state.file_path) as span:
+            self._print("📄 Loading contract file...")
+            
+            # This will be set by the caller
+            if not hasattr(state, 'file_path'):
+                raise ValueError("file_path must be provided in state")
+            
+            file_path = state.file_path
+            
+            # Determine file type and load accordingly
+            if file_path.lower().endswith('.pdf') and self.preserve_layout:
+                contract_text = self.pdf_loader.load_pdf_layout(file_path)
+            elif file_path.lower().endswith('.pdf') and self.extraction_workers > 1:
+                extracted = self.pdf_loader.extract_pdf(file_path, workers=self.extraction_workers)
+                contract_text = extracted.text if extracted else None
+            elif file_path.lower().endswith('.pdf'):
+                contract_text = self.pdf_loader.load_pdf(file_path)
+            else:
+                contract_text = self.pdf_loader.load_text_file(file_path)
+            
+            if not contract_text:
+                raise ValueError(f"Failed to load contract from {file_path}")
+            
+            span["characters"] = len(contract_text)
+            self._print(f"✅ Loaded contract ({len(contract_text)} characters)")
+            return {"contract_text": contract_text}
+
+    def _split_clauses_step(self, state: ContractState) -> Dict[str, Any]:
+        """Split contract text into individual clauses"""
+        with self._span("stage", "split_clauses", document=state.file_path) as span:
+            self._print("🔪 Splitting contract into clauses...")
+            
+            # Offsets into contract_text; clause text is built only for prompts and the report
+            clauses = self.clause_splitter.split_clause_spans(state.contract_text)
+            
+            if not len(clauses):
+                raise ValueError("No clauses found in contract text")
+            
+            self._print(f"✅ Split into {len(clauses)} clauses")
+            if self.sizer is not None:
+                split_count = len(clauses)
+                clauses = self.sizer.resize(clauses, self.model_name)
+                self._print(f"📏 Sized to the {self.model_name} token budget: {len(clauses)} clauses "
+                            f"(from {split_count})")
+            span["clauses"] = len(clauses)
+            if state.previous_report is None:
+                return {"clauses": clauses}
+            
+            alignment = align_clauses([analysis.clause for analysis in state.previous_report.clauses], clauses)
+            revision = summarize_revision(alignment, state.previous_report)
+            self._print(f"🔁 Since the previous version: {revision.unchanged} unchanged, {revision.modified} modified, "
+                        f"{revision.added} added, {revision.removed} removed clauses")
+            return {"clauses": clauses, "alignment": alignment}
+
+    def _analyze_clauses_step(self, state: ContractState, config: "RunnableConfig") -> Dict[str, Any]:
+        """Analyze each clause for summary, risk, and suggestions"""
+        with self._span("stage", "analyze_clauses", document=state.file_path) as span:
+            clauses = state.clauses
+            thread_id = self._thread_id(config)
+            clause_analyses: List[Optional[ClauseAnalysis]] = [None] * len(clauses)
+            if thread_id is not None:
+                self._restore_analyses(state, clause_analyses, self.checkpoints.load_analyses(thread_id, clauses))
+            indices = [i for i, analysis in enumerate(clause_analyses) if analysis is None]
+            span["clauses"] = len(indices)
+            self._print("🔍 Analyzing clauses...")
+            
+            changed = self._carry_forward(state, clause_analyses, indices)
+            unscreened = self._prescreen_clauses(clauses, clause_analyses, changed)
+            pending, followers = self._match_near_duplicates(clauses, clause_analyses, unscreened, state.file_path)
+            if thread_id is not None:
+                self.checkpoints.save_analyses(thread_id, self._durable_analyses(clause_analyses, indices))
+            publish = self._publisher(state, config, clause_analyses)
+            publish()
+            
+            for unit in self._plan_units(clauses, pending, clause_analyses):
+                self._print_unit_progress(unit, len(clauses))
+                for i, analysis in zip(unit, self._analyze_unit(clauses, unit)):
+                    clause_analyses[i] = analysis
+                # Each finished clause is durable before the next request starts
+                if thread_id is not None:
+                    self.checkpoints.save_analyses(thread_id, self._durable_analyses(clause_analyses, unit))
+                publish()
+            
+            self._fill_near_duplicates(clauses, clause_analyses, followers, indices, state.file_path)
+            publish()
+            self._mark_changes(state, clause_analyses)
+            self._finish_analysis(len(clauses))
+            return {"clause_analyses": clause_analyses}
+
+    async def _aanalyze_clauses_step(self, state: ContractState, config: "RunnableConfig") -> Dict[str, Any]:
+        """Analyze clauses concurrently, bounded by max_concurrency"""
+        with self._span("stage", "analyze_clauses", document=state.file_path) as span:
+            clauses = state.clauses
+            thread_id = self._thread_id(config)
+            clause_analyses: List[Optional[ClauseAnalysis]] = [None] * len(clauses)
+            if thread_id is not None:
+                self._restore_analyses(state, clause_analyses, await self.checkpoints.aload_analyses(thread_id, clauses))
+            indices = [i for i, analysis in enumerate(clause_analyses) if analysis is None]
+            span["clauses"] = len(indices)
+            self._print(f"🔍 Analyzing clauses (up to {self.max_concurrency} requests at a time)...")
+            
+            changed = self._carry_forward(state, clause_analyses, indices)
+            unscreened = self._prescreen_clauses(clauses, clause_analyses, changed)
+            pending, followers = self._match_near_duplicates(clauses, clause_analyses, unscreened, state.file_path)
+            if thread_id is not None:
+                await self.checkpoints.asave_analyses(thread_id, self._durable_analyses(clause_analyses, indices))
+            publish = self._publisher(state, config, clause_analyses)
+            publish()
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            
+            async def analyze(unit: List[int]) -> None:
+                async with semaphore:
+                    self._print_unit_progress(unit, len(clauses))
+                    for i, analysis in zip(unit, await self._aanalyze_unit(clauses, unit)):
+                        clause_analyses[i] = analysis
+                    # Saved per unit, without holding up the other units
+                    if thread_id is not None:
+                        await self.checkpoints.asave_analyses(thread_id, self._durable_analyses(clause_analyses, unit))
+                publish()
+            
+            # Planning looks batched clauses up in the cache, which would block the event loop
+            units = await asyncio.to_thread(self._plan_units, clauses, pending, clause_analyses)
+            # Results are written back by clause index, so they stay in clause order
+            await asyncio.gather(*(analyze(unit) for unit in units))
+            
+            self._fill_near_duplicates(clauses, clause_analyses, followers, indices, state.file_path)
+            publish()
+            self._mark_changes(state, clause_analyses)
+            self._finish_analysis(len(clauses))
+            return {"clause_analyses": clause_analyses}
+
+    def _thread_id(self, config: "RunnableConfig") -> Optional[str]:
+        """Checkpoint thread of a run, or None when it is not checkpointed"""
+        if self.checkpoints is None:
+            return None
+        return config.get("configurable", {}).get("thread_id")
+
+    def _publisher(
+        self,
+        state: ContractState,
+        config: "RunnableConfig",
+        clause_analyses: List[Optional[ClauseAnalysis]],
+    ) -> Callable[[], None]:
+        """
+        Delivery of finished analyses to the run's on_analysis callback
+
+        Returns:
+            Function passing on, in clause order, every analysis whose predecessors
+            have all been passed on
+        """
+        on_analysis = config.get("configurable", {}).get("on_analysis")
+        delivered = 0
         
-        # This will be set by the caller
-        if not hasattr(state, 'file_path'):
-            raise ValueError("file_path must be provided in state")
+        def publish() -> None:
+            nonlocal delivered
+            if on_analysis is None:
+                return
+            while delivered < len(clause_analyses) and clause_analyses[delivered] is not None:
+                analysis = clause_analyses[delivered]
+                # As _mark_changes will record it in the report
+                if state.alignment is not None:
+                    analysis = analysis.model_copy(update={"change": state.alignment.changes[delivered]})
+                on_analysis(delivered, analysis)
+                delivered += 1
         
-        file_path = state.file_path
+        return publish
+
+    def _restore_analyses(
+        self,
+        state: ContractState,
+        clause_analyses: List[Optional[ClauseAnalysis]],
+        restored: Dict[int, ClauseAnalysis],
+    ) -> None:
+        """Fill in the clauses an interrupted run of this thread already analyzed"""
+        for i, analysis in restored.items():
+            clause_analyses[i] = analysis
+            # Later near-duplicates of a restored clause borrow it, as they would have from its leader
+            if self.dedup is not None:
+                self._index_near_duplicate(state.clauses[i], analysis, i, state.file_path)
+        if restored:
+            self._print(f"⏯️  Restored {len(restored)}/{len(clause_analyses)} analyzed clauses from the checkpoint")
+
+    def _durable_analyses(self, clause_analyses: List[Optional[ClauseAnalysis]], indices: Sequence[int]) -> Dict[int, ClauseAnalysis]:
+        """Analyses among indices worth checkpointing; failed clauses are retried on resume"""
+        return {
+            i: clause_analyses[i]
+            for i in indices
+            if clause_analyses[i] is not None and clause_analyses[i].summary != self.FALLBACK_SUMMARY
+        }
+
+    def _finish_analysis(self, total: int) -> None:
+        self._print(f"✅ Completed analysis of {total} clauses")
+        self._print_cache_stats()
+        self._print_scheduler_stats()
+        if self.metrics is not None and self.scheduler is not None:
+            self.metrics.observe_scheduler(self.scheduler.stats())
+
+    def _carry_forward(
+        self,
+        state: ContractState,
+        clause_analyses: List[Optional[ClauseAnalysis]],
+        indices: Sequence[int],
+    ) -> List[int]:
+        """
+        Reuse the previous version's analyses of unchanged clauses (incremental runs)
+
+        Returns:
+            Indices of the added and modified clauses, which still need analysis
+        """
+        if state.alignment is None:
+            return list(indices)
         
-        # Determine file type and load accordingly
-        if file_path.lower().endswith('.pdf'):
-            contract_text = self.pdf_loader.load_pdf(file_path)
-        else:
-            contract_text = self.pdf_loader.load_text_file(file_path)
+        remaining: List[int] = []
+        for i in indices:
+            previous_index = state.alignment.previous_indices[i]
+            previous = state.previous_report.clauses[previous_index] if previous_index is not None else None
+            # Clauses whose previous analysis failed are analyzed again
+            if state.alignment.changes[i] == "unchanged" and previous.summary != self.FALLBACK_SUMMARY:
+                clause_analyses[i] = previous.model_copy(update={"clause": state.clauses[i]})
+            else:
+                remaining.append(i)
+        carried = len(indices) - len(remaining)
+        self._count("contract_carried_forward_total", carried)
+        if carried:
+            self._print(f"🔁 Carried forward analyses of {carried} unchanged clauses")
+        return remaining
+
+    def _mark_changes(self, state: ContractState, clause_analyses: List[Optional[ClauseAnalysis]]) -> None:
+        """Record how each clause changed since the previous version (incremental runs)"""
+        if state.alignment is None:
+            return
+        for i in range(len(clause_analyses)):
+            clause_analyses[i] = clause_analyses[i].model_copy(update={"change": state.alignment.changes[i]})
+
+    def _prescreen_clauses(
+        self,
+        clauses: Sequence[Clause],
+        clause_analyses: List[Optional[ClauseAnalysis]],
+        indices: Sequence[int],
+    ) -> List[int]:
+        """
+        Answer clearly benign clauses with the pre-screening tier's templated analyses
+
+        Returns:
+            Indices of the clauses that still need analysis
+        """
+        if self.prescreen is None:
+            return list(indices)
         
-        if not contract_text:
-            raise ValueError(f"Failed to load contract from {file_path}")
+        remaining: List[int] = []
+        for i in indices:
+            screened = self.prescreen.screen(clauses[i])
+            if screened is None:
+                remaining.append(i)
+            else:
+                clause_analyses[i] = screened
+        screened_count = len(indices) - len(remaining)
+        self._count("contract_prescreened_total", screened_count)
+        if screened_count:
+            self._print(f"🏷️  Pre-screened {screened_count} benign clauses without the LLM")
+        return remaining
+
+    def _match_near_duplicates(
+        self,
+        clauses: Sequence[Clause],
+        clause_analyses: List[Optional[ClauseAnalysis]],
+        indices: Sequence[int],
+        file_path: str,
+    ) -> Tuple[List[int], Dict[int, int]]:
+        """
+        Resolve clauses that are near-duplicates of already analyzed text
+
+        Clauses matching the workflow's index borrow that analysis immediately.
+        Clauses matching an earlier clause of this document become followers of it
+        and are filled in once it has been analyzed.
+
+        Returns:
+            (indices that still need analysis, follower index -> leader index)
+        """
+        if self.dedup is None:
+            return list(indices), {}
         
-        print(f"✅ Loaded contract ({len(contract_text)} characters)")
-        return {"contract_text": contract_text}
+        # Restored clauses are already in the workflow's index
+        document_index = self.dedup.empty_like()
+        pending: List[int] = []
+        followers: Dict[int, int] = {}
+        for i in indices:
+            borrowed, leader = self._match_near_duplicate(clauses[i], i, document_index, file_path)
+            if borrowed is not None:
+                clause_analyses[i] = borrowed
+            elif leader is not None:
+                followers[i] = leader
+            else:
+                pending.append(i)
+        return pending, followers
 
-    def _split_clauses_step(self, state: ContractState) -> Dict[str, Any]:
-        """Split contract text into individual clauses"""
-        print("🔪 Splitting contract into clauses...")
+    def _match_near_duplicate(
+        self,
+        clause: Clause,
+        index: int,
+        document_index: NearDuplicateIndex,
+        file_path: str,
+    ) -> Tuple[Optional[ClauseAnalysis], Optional[int]]:
+        """
+        Check one clause against the workflow's index and the current document
+
+        Returns:
+            (borrowed analysis, None), (None, leader index) or (None, None) if the
+            clause has to be analyzed; in the last case it becomes a potential leader
+        """
+        text = str(clause)
+        signature = self.dedup.signature(text)
+        if signature is None:
+            return None, None
+        match = self.dedup.find(text, signature)
+        if match is not None:
+            source, analysis, _ = match
+            return analysis.model_copy(update={"clause": clause, "borrowed_from": source}), None
+        match = document_index.find(text, signature)
+        if match is not None:
+            return None, match[1]
+        document_index.add(text, index, self._clause_ref(file_path, index), signature)
+        return None, None
+
+    def _fill_near_duplicates(
+        self,
+        clauses: Sequence[Clause],
+        clause_analyses: List[Optional[ClauseAnalysis]],
+        followers: Dict[int, int],
+        indices: Sequence[int],
+        file_path: str,
+    ) -> None:
+        """Index freshly analyzed clauses and copy leader analyses to their followers"""
+        if self.dedup is None:
+            return
         
-        clauses = self.clause_splitter.split_clauses(state.contract_text)
+        for i in indices:
+            if clause_analyses[i] is not None:
+                self._index_near_duplicate(clauses[i], clause_analyses[i], i, file_path)
         
-        if not clauses:
-            raise ValueError("No clauses found in contract text")
+        for i, leader in followers.items():
+            clause_analyses[i] = self._follow_leader(clauses[i], clause_analyses[leader], leader, file_path)
         
-        print(f"✅ Split into {len(clauses)} clauses")
-        return {"clauses": clauses}
+        borrowed = sum(1 for i in indices if clause_analyses[i].borrowed_from is not None)
+        self._count("contract_dedup_reused_total", borrowed)
+        if borrowed:
+            self._print(f"♻️  Reused analyses for {borrowed} near-duplicate clauses")
 
-    def _analyze_clauses_step(self, state: ContractState) -> Dict[str, Any]:
-        """Analyze each clause for summary, risk, and suggestions"""
-        print("🔍 Analyzing clauses...")
+    def _index_near_duplicate(self, clause: Clause, analysis: ClauseAnalysis, index: int, file_path: str) -> None:
+        """Make a freshly analyzed clause available for reuse"""
+        # Templated pre-screen answers must not be lent to similar but substantive clauses
+        if analysis.borrowed_from is None and analysis.summary != self.FALLBACK_SUMMARY and analysis.tier == "llm":
+            self.dedup.add(str(clause), analysis, self._clause_ref(file_path, index))
+
+    def _follow_leader(self, clause: Clause, leader_analysis: ClauseAnalysis, leader: int, file_path: str) -> ClauseAnalysis:
+        """Copy a leader's analysis to a near-duplicate clause of the same document"""
+        if leader_analysis.summary == self.FALLBACK_SUMMARY:
+            return self._fallback_analysis(clause)
+        return leader_analysis.model_copy(
+            update={"clause": clause, "borrowed_from": self._clause_ref(file_path, leader)}
+        )
+
+    @staticmethod
+    def _clause_ref(file_path: str, index: int) -> str:
+        """Human-readable reference to a clause, e.g. "BasicNDA.pdf#3" """
+        return f"{os.path.basename(file_path)}#{index + 1}"
+
+    def _plan_units(
+        self,
+        clauses: Sequence[Clause],
+        pending: List[int],
+        clause_analyses: List[Optional[ClauseAnalysis]],
+    ) -> List[List[int]]:
+        """
+        Group the pending clause indices into units of work, one LLM request (or pipeline) each
+
+        For the batched engine, cached clauses are resolved here so they do not take
+        up room in a batch, and the rest are packed greedily under the token budget.
+        """
+        if self.engine != "batched":
+            return [[i] for i in pending]
         
-        clause_analyses = []
+        units: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for i in pending:
+            clause = clauses[i]
+            cached = self._cache_get(clause)
+            if cached is not None:
+                clause_analyses[i] = cached
+                continue
+            tokens = estimate_tokens(clause)
+            if current and (current_tokens + tokens > self.batch_token_budget
+                            or len(current) >= self.max_batch_clauses):
+                units.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            units.append(current)
+        return units
+
+    def _print_unit_progress(self, unit: List[int], total: Optional[int]) -> None:
+        of_total = f"/{total}" if total is not None else ""
+        if len(unit) == 1:
+            self._print(f"  Analyzing clause {unit[0] + 1}{of_total}...")
+        else:
+            numbers = ", ".join(str(i + 1) for i in unit)
+            self._print(f"  Analyzing clauses {numbers}{of_total} in one request...")
+
+    def _analyze_unit(self, clauses: Sequence[Clause], unit: List[int]) -> List[ClauseAnalysis]:
+        """Analyze one unit of work, never raising"""
+        with self._span("clause", "analyze_clauses", clauses=[i + 1 for i in unit]):
+            if self.engine == "batched":
+                return self._analyze_batch([clauses[i] for i in unit], unit)
+            return [self._analyze_clause_or_fallback(clauses[i], i, self._analyze_single_clause) for i in unit]
+
+    async def _aanalyze_unit(self, clauses: Sequence[Clause], unit: List[int]) -> List[ClauseAnalysis]:
+        """Async counterpart of _analyze_unit"""
+        with self._span("clause", "analyze_clauses", clauses=[i + 1 for i in unit]):
+            if self.engine == "batched":
+                return await self._aanalyze_batch([clauses[i] for i in unit], unit)
+            return [await self._aanalyze_clause_or_fallback(clauses[i], i, self._aanalyze_single_clause) for i in unit]
+
+    def _analyze_clause_or_fallback(self, clause: Clause, index: int, analyze) -> ClauseAnalysis:
+        try:
+            return analyze(clause)
+        except Exception as e:
+            self._print(f"    Error analyzing clause {index + 1}: {str(e)}")
+            return self._fallback_analysis(clause)
+
+    async def _aanalyze_clause_or_fallback(self, clause: Clause, index: int, analyze) -> ClauseAnalysis:
+        try:
+            return await analyze(clause)
+        except Exception as e:
+            self._print(f"    Error analyzing clause {index + 1}: {str(e)}")
+            return self._fallback_analysis(clause)
+
+    def _print(self, message: str) -> None:
+        if self.console:
+            print(message)
+
+    def _span(self, kind: str, name: str, **attributes: Any):
+        """Metrics span around a block (a no-op without metrics); yields its attribute dict"""
+        if self.metrics is None:
+            return contextlib.nullcontext(attributes)
+        return self.metrics.span(kind, name, **attributes)
+
+    def _count(self, name: str, amount: float = 1, **labels: str) -> None:
+        if self.metrics is not None:
+            self.metrics.count(name, amount, **labels)
+
+    def _document(self, file_path: str):
+        """Attribute the metrics recorded inside the block to a document"""
+        if self.metrics is None:
+            return contextlib.nullcontext()
+        return self.metrics.document(file_path)
+
+    def _print_scheduler_stats(self) -> None:
+        if self.scheduler is not None:
+            stats = self.scheduler.stats()
+            self._print(f"🚦 Scheduler: {stats['requests']} requests, {stats['retries']} retries, "
+                  f"{stats['throttled']} throttled, concurrency {stats['concurrency']}")
+
+    def _print_cache_stats(self) -> None:
+        if self.cache is not None:
+            stats = self.cache.stats()
+            self._print(f"💾 Cache: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries")
+
+    @classmethod
+    def _fallback_analysis(cls, clause: Clause) -> ClauseAnalysis:
+        """Placeholder analysis used when the LLM calls for a clause fail"""
+        return ClauseAnalysis(
+            clause=clause,
+            summary=cls.FALLBACK_SUMMARY,
+            is_risky=False,
+            risk_reason="None",
+            suggestion="None"
+        )
+
+    def _analyze_single_clause(self, clause: Clause) -> ClauseAnalysis:
+        """Analyze a single clause using the cache or the configured engine"""
+        cached = self._cache_get(clause)
+        if cached is not None:
+            return cached
+        if self.engine == "three_call":
+            analysis = self._analyze_clause_three_call(clause)
+        else:
+            analysis = self._analyze_clause_structured(clause)
+        self._cache_put(analysis)
+        return analysis
+
+    async def _aanalyze_single_clause(self, clause: Clause) -> ClauseAnalysis:
+        """Async counterpart of _analyze_single_clause using ainvoke"""
+        cached = await self._acache_get(clause)
+        if cached is not None:
+            return cached
+        if self.engine == "three_call":
+            analysis = await self._aanalyze_clause_three_call(clause)
+        else:
+            analysis = await self._aanalyze_clause_structured(clause)
+        await self._acache_put(analysis)
+        return analysis
+
+    @property
+    def model_name(self) -> str:
+        """Name of the underlying chat model, used in cache keys"""
+        return getattr(self.llm, "model_name", None) or getattr(self.llm, "model", None) or "unknown"
+
+    def _cache_get(self, clause: Clause) -> Optional[ClauseAnalysis]:
+        if self.cache is None:
+            return None
+        cached = self.cache.get(clause, self.prompt_version, self.model_name, self.engine)
+        if cached is not None and cached.suggestion_pending and not self.defer_suggestions:
+            # Cached by a run that deferred its suggestions; this run needs the whole analysis
+            cached = None
+        self._count("contract_cache_lookups_total", result="miss" if cached is None else "hit")
+        return cached
+
+    def _cache_put(self, analysis: ClauseAnalysis) -> None:
+        # Unparseable risk responses are not worth remembering
+        if self.cache is None or analysis.risk_reason == self.RISK_PARSE_FAILED:
+            return
+        # A near-duplicate's borrowed analysis belongs to the clause it was borrowed from,
+        # and pre-screened ones are templates that cost nothing to rebuild
+        if analysis.borrowed_from is not None or analysis.tier != "llm":
+            return
+        # Which revision of a document a clause came from is not part of its analysis
+        if analysis.change is not None:
+            analysis = analysis.model_copy(update={"change": None})
+        self.cache.put(analysis, self.prompt_version, self.model_name, self.engine)
+
+    def _cache_put_all(self, analyses: Sequence[Optional[ClauseAnalysis]]) -> None:
+        """Cache the analyses a batch response mapped onto its clauses"""
+        for analysis in analyses:
+            if analysis is not None:
+                self._cache_put(analysis)
+
+    async def _acache_get(self, clause: Clause) -> Optional[ClauseAnalysis]:
+        """_cache_get from a worker thread, so the blocking SQLite lookup does not stall the event loop"""
+        if self.cache is None:
+            return None
+        return await asyncio.to_thread(self._cache_get, clause)
+
+    async def _acache_put(self, analysis: ClauseAnalysis) -> None:
+        """_cache_put from a worker thread"""
+        if self.cache is not None:
+            await asyncio.to_thread(self._cache_put, analysis)
+
+    async def _acache_put_all(self, analyses: Sequence[Optional[ClauseAnalysis]]) -> None:
+        if self.cache is not None:
+            await asyncio.to_thread(self._cache_put_all, analyses)
+
+    def _analyze_clause_three_call(self, clause: Clause) -> ClauseAnalysis:
+        """
+        Analyze a single clause with separate summary, risk and suggestion calls
         
-        for i, clause in enumerate(state.clauses, 1):
-            print(f"  Analyzing clause {i}/{len(state.clauses)}...")
+        The calls form a small dependency graph: the summary and the risk assessment
+        only need the clause, and the suggestion needs the risk assessment. The
+        summary runs in a helper thread while the risk call, then the suggestion,
+        run on this one, so a clause costs two round trips instead of three even
+        when clauses are analyzed one at a time.
+        """
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            # Copy the context so the summary's spans are attributed to the current document
+            summary_future = pool.submit(contextvars.copy_context().run, self._summarize, clause)
+            is_risky, risk_reason = self._assess_risk(clause)
             
-            try:
-                analysis = self._analyze_single_clause(clause)
-                clause_analyses.append(analysis)
-            except Exception as e:
-                print(f"    Error analyzing clause {i}: {str(e)}")
-                # Create a fallback analysis
-                clause_analyses.append(ClauseAnalysis(
-                    clause=clause,
-                    summary="Analysis failed",
-                    is_risky=False,
-                    risk_reason="None",
-                    suggestion="None"
-                ))
-        
-        print(f"✅ Completed analysis of {len(clause_analyses)} clauses")
-        return {"clause_analyses": clause_analyses}
-
-    def _analyze_single_clause(self, clause: str) -> ClauseAnalysis:
-        """Analyze a single clause using LLM"""
-        
-        # Step 1: Generate summary
-        summary_messages = [
-            SystemMessage(content=self.prompts.SUMMARY_SYSTEM),
-            HumanMessage(content=self.prompts.summary_user(clause))
-        ]
-        summary_response = self.llm.invoke(summary_messages)
-        summary = summary_response.content.strip()
-        
-        # Step 2: Detect risks
-        risk_messages = [
-            SystemMessage(content=self.prompts.RISK_SYSTEM),
-            HumanMessage(content=self.prompts.risk_user(clause))
-        ]
-        risk_response = self.llm.invoke(risk_messages)
-        
-        # Parse risk analysis
-        try:
-            risk_data = json.loads(risk_response.content)
-            is_risky = risk_data.get("is_risky", False)
-            risk_reason = risk_data.get("risk_reason", "None")
-        except json.JSONDecodeError:
-            # Fallback parsing
-            content = risk_response.content.lower()
-            is_risky = "true" in content and "false" not in content
-            risk_reason = "Analysis failed - manual review recommended"
+            # Generate the suggestion as soon as the risk is known, unless it is deferred until requested
+            suggestion = None if self.defer_suggestions else self._suggest(clause, is_risky, risk_reason)
+            summary = summary_future.result()
         
-        # Step 3: Generate suggestion
-        suggestion_messages = [
-            SystemMessage(content=self.prompts.SUGGESTION_SYSTEM),
-            HumanMessage(content=self.prompts.suggestion_user(clause, is_risky, risk_reason))
-        ]
-        suggestion_response = self.llm.invoke(suggestion_messages)
-        suggestion = suggestion_response.content.strip()
+        if suggestion is None:
+            return self._pending_analysis(clause, summary, is_risky, risk_reason)
+        return ClauseAnalysis(
+            clause=clause,
+            summary=summary,
+            is_risky=is_risky,
+            risk_reason=risk_reason,
+            suggestion=suggestion
+        )
+
+    async def _aanalyze_clause_three_call(self, clause: Clause) -> ClauseAnalysis:
+        """Async counterpart of _analyze_clause_three_call; the summary runs as a concurrent task"""
+        summary_task = asyncio.ensure_future(self._asummarize(clause))
+        try:
+            is_risky, risk_reason = await self._aassess_risk(clause)
+            suggestion = None if self.defer_suggestions else await self._asuggest(clause, is_risky, risk_reason)
+            summary = await summary_task
+        finally:
+            # Only has an effect when the risk or suggestion call failed
+            summary_task.cancel()
         
+        if suggestion is None:
+            return self._pending_analysis(clause, summary, is_risky, risk_reason)
         return ClauseAnalysis(
             clause=clause,
             summary=summary,
@@ -137,26 +801,519 @@ class ContractAnalysisWorkflow:
             suggestion=suggestion
         )
 
+    def _summarize(self, clause: Clause) -> str:
+        """Plain-language summary of a clause"""
+        messages = self._chat_messages(self.prompts.SUMMARY_SYSTEM, self.prompts.summary_user(clause))
+        return self.llm.invoke(messages).content.strip()
+
+    async def _asummarize(self, clause: Clause) -> str:
+        """Async counterpart of _summarize"""
+        messages = self._chat_messages(self.prompts.SUMMARY_SYSTEM, self.prompts.summary_user(clause))
+        return (await self.llm.ainvoke(messages)).content.strip()
+
+    def _assess_risk(self, clause: Clause) -> Tuple[bool, str]:
+        """(is_risky, risk_reason) of a clause"""
+        messages = self._chat_messages(self.prompts.RISK_SYSTEM, self.prompts.risk_user(clause))
+        return self._parse_risk_response(self.llm.invoke(messages).content)
+
+    async def _aassess_risk(self, clause: Clause) -> Tuple[bool, str]:
+        """Async counterpart of _assess_risk"""
+        messages = self._chat_messages(self.prompts.RISK_SYSTEM, self.prompts.risk_user(clause))
+        return self._parse_risk_response((await self.llm.ainvoke(messages)).content)
+
+    def _suggest(self, clause: Clause, is_risky: bool, risk_reason: str) -> str:
+        """Negotiation suggestion for an analyzed clause"""
+        messages = self._chat_messages(self.prompts.SUGGESTION_SYSTEM, self.prompts.suggestion_user(clause, is_risky, risk_reason))
+        return self.llm.invoke(messages).content.strip()
+
+    async def _asuggest(self, clause: Clause, is_risky: bool, risk_reason: str) -> str:
+        """Async counterpart of _suggest"""
+        messages = self._chat_messages(self.prompts.SUGGESTION_SYSTEM, self.prompts.suggestion_user(clause, is_risky, risk_reason))
+        return (await self.llm.ainvoke(messages)).content.strip()
+
+    def _pending_analysis(self, clause: Clause, summary: str, is_risky: bool, risk_reason: str) -> ClauseAnalysis:
+        return ClauseAnalysis(
+            clause=clause,
+            summary=summary,
+            is_risky=is_risky,
+            risk_reason=risk_reason,
+            suggestion=self.PENDING_SUGGESTION,
+            suggestion_pending=True,
+        )
+
+    def resolve_suggestions(self, report: ContractReport, indices: Optional[Sequence[int]] = None) -> ContractReport:
+        """
+        Generate deferred suggestions on demand
+        
+        Resolved suggestions are memoized in the report (and the cache), so saving the
+        report keeps them and asking again costs nothing.
+        
+        Args:
+            report: Report of a run with defer_suggestions; updated in place
+            indices: Clause indices (0-based) to resolve; all risky clauses by default
+        
+        Returns:
+            The same report
+        """
+        for i in self._pending_suggestions(report, indices):
+            analysis = report.clauses[i]
+            try:
+                suggestion = self._suggest(analysis.clause, analysis.is_risky, analysis.risk_reason)
+            except Exception as e:
+                self._print(f"    Error generating suggestion for clause {i + 1}: {str(e)}")
+                continue
+            self._cache_put(self._resolve_suggestion(report, i, suggestion))
+        return report
+
+    async def aresolve_suggestions(self, report: ContractReport, indices: Optional[Sequence[int]] = None) -> ContractReport:
+        """Async counterpart of resolve_suggestions, generating up to max_concurrency suggestions at a time"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def resolve(i: int) -> None:
+            analysis = report.clauses[i]
+            async with semaphore:
+                try:
+                    suggestion = await self._asuggest(analysis.clause, analysis.is_risky, analysis.risk_reason)
+                except Exception as e:
+                    self._print(f"    Error generating suggestion for clause {i + 1}: {str(e)}")
+                    return
+            await self._acache_put(self._resolve_suggestion(report, i, suggestion))
+        
+        await asyncio.gather(*(resolve(i) for i in self._pending_suggestions(report, indices)))
+        return report
+
+    @staticmethod
+    def _pending_suggestions(report: ContractReport, indices: Optional[Sequence[int]]) -> List[int]:
+        """The requested clause indices, or all risky clauses, whose suggestion is still pending"""
+        if indices is None:
+            return [i for i, analysis in enumerate(report.clauses) if analysis.suggestion_pending and analysis.is_risky]
+        for i in indices:
+            if not 0 <= i < len(report.clauses):
+                raise IndexError(f"Clause index {i} out of range for {len(report.clauses)} clauses")
+        return [i for i in dict.fromkeys(indices) if report.clauses[i].suggestion_pending]
+
+    def _resolve_suggestion(self, report: ContractReport, index: int, suggestion: str) -> ClauseAnalysis:
+        """Memoize a generated suggestion in the report; returns the resolved analysis for the caller to cache"""
+        analysis = report.clauses[index].model_copy(update={"suggestion": suggestion, "suggestion_pending": False})
+        report.clauses[index] = analysis
+        report.suggestions_count = self._count_suggestions(report.clauses)
+        report.pending_suggestions = sum(1 for clause in report.clauses if clause.suggestion_pending)
+        return analysis
+
+    @staticmethod
+    def _chat_messages(system: str, user: str) -> list:
+        """System and user message of one request"""
+        from langchain_core.messages import HumanMessage, SystemMessage
+        
+        return [SystemMessage(content=system), HumanMessage(content=user)]
+
+    def _structured_messages(self, clause: Clause) -> list:
+        return self._chat_messages(self.prompts.STRUCTURED_SYSTEM, self.prompts.structured_user(clause))
+
+    def _analyze_clause_structured(self, clause: Clause) -> ClauseAnalysis:
+        """Analyze a single clause with one structured-output LLM call"""
+        assessment = self._structured_llm().invoke(self._structured_messages(clause))
+        return ClauseAnalysis(clause=clause, **assessment.model_dump())
+
+    async def _aanalyze_clause_structured(self, clause: Clause) -> ClauseAnalysis:
+        """Async counterpart of _analyze_clause_structured"""
+        assessment = await self._structured_llm().ainvoke(self._structured_messages(clause))
+        return ClauseAnalysis(clause=clause, **assessment.model_dump())
+
+    def _structured_llm(self):
+        """LLM bound to the ClauseAssessment schema, created on first use"""
+        if self._structured_runnable is None:
+            self._structured_runnable = self.llm.with_structured_output(ClauseAssessment)
+        return self._structured_runnable
+
+    def _batch_messages(self, clauses: Sequence[Clause]) -> list:
+        return self._chat_messages(self.prompts.STRUCTURED_SYSTEM, self.prompts.batch_user(clauses))
+
+    def _analyze_batch(self, clauses: Sequence[Clause], indices: List[int]) -> List[ClauseAnalysis]:
+        """Analyze several clauses with one structured-output call"""
+        if len(clauses) == 1:
+            return [self._analyze_clause_or_fallback(clauses[0], indices[0], self._analyze_clause_uncached)]
+        try:
+            batch = self._batch_llm().invoke(self._batch_messages(clauses))
+        except Exception as e:
+            self._print(f"    Batch request failed, retrying clauses individually: {str(e)}")
+            batch = None
+        analyses = self._split_batch(clauses, batch)
+        self._cache_put_all(analyses)
+        for position, analysis in enumerate(analyses):
+            if analysis is None:
+                analyses[position] = self._analyze_clause_or_fallback(
+                    clauses[position], indices[position], self._analyze_clause_uncached
+                )
+        return analyses
+
+    async def _aanalyze_batch(self, clauses: Sequence[Clause], indices: List[int]) -> List[ClauseAnalysis]:
+        """Async counterpart of _analyze_batch"""
+        if len(clauses) == 1:
+            return [await self._aanalyze_clause_or_fallback(clauses[0], indices[0], self._aanalyze_clause_uncached)]
+        try:
+            batch = await self._batch_llm().ainvoke(self._batch_messages(clauses))
+        except Exception as e:
+            self._print(f"    Batch request failed, retrying clauses individually: {str(e)}")
+            batch = None
+        analyses = self._split_batch(clauses, batch)
+        await self._acache_put_all(analyses)
+        for position, analysis in enumerate(analyses):
+            if analysis is None:
+                analyses[position] = await self._aanalyze_clause_or_fallback(
+                    clauses[position], indices[position], self._aanalyze_clause_uncached
+                )
+        return analyses
+
+    def _split_batch(self, clauses: Sequence[Clause], batch: Optional[BatchAssessment]) -> List[Optional[ClauseAnalysis]]:
+        """
+        Map a batch response back onto its clauses
+
+        Clauses that are missing from the response, or whose clause_number is out of
+        range or repeated, are left as None so the caller can retry them individually.
+        """
+        analyses: List[Optional[ClauseAnalysis]] = [None] * len(clauses)
+        if batch is None:
+            return analyses
+        
+        counts = Counter(item.clause_number for item in batch.analyses)
+        for item in batch.analyses:
+            position = item.clause_number - 1
+            # Out-of-range or repeated clause numbers cannot be attributed reliably
+            if 0 <= position < len(clauses) and counts[item.clause_number] == 1:
+                analyses[position] = ClauseAnalysis(
+                    clause=clauses[position],
+                    **item.model_dump(exclude={"clause_number"})
+                )
+        
+        missing = analyses.count(None)
+        if missing:
+            self._print(f"    Batch response incomplete, retrying {missing} clause(s) individually")
+        return analyses
+
+    def _analyze_clause_uncached(self, clause: Clause) -> ClauseAnalysis:
+        """Single structured call for a clause already known to miss the cache"""
+        analysis = self._analyze_clause_structured(clause)
+        self._cache_put(analysis)
+        return analysis
+
+    async def _aanalyze_clause_uncached(self, clause: Clause) -> ClauseAnalysis:
+        """Async counterpart of _analyze_clause_uncached"""
+        analysis = await self._aanalyze_clause_structured(clause)
+        await self._acache_put(analysis)
+        return analysis
+
+    def _batch_llm(self):
+        """LLM bound to the BatchAssessment schema, created on first use"""
+        if self._batch_runnable is None:
+            self._batch_runnable = self.llm.with_structured_output(BatchAssessment)
+        return self._batch_runnable
+
+    @classmethod
+    def _parse_risk_response(cls, content: str) -> Tuple[bool, str]:
+        """Parse the risk JSON returned by the LLM into (is_risky, risk_reason)"""
+        try:
+            risk_data = json.loads(content)
+            is_risky = risk_data.get("is_risky", False)
+            risk_reason = risk_data.get("risk_reason", "None")
+        except json.JSONDecodeError:
+            # Fallback parsing
+            content = content.lower()
+            is_risky = "true" in content and "false" not in content
+            risk_reason = cls.RISK_PARSE_FAILED
+        return is_risky, risk_reason
+
     def _generate_report_step(self, state: ContractState) -> Dict[str, Any]:
         """Generate final summary report"""
-        print("📊 Generating final report...")
+        with self._span("stage", "generate_report", document=state.file_path):
+            revision = None
+            if state.alignment is not None:
+                revision = summarize_revision(state.alignment, state.previous_report)
+            return {"report": self._build_report(state.clause_analyses, revision)}
+
+    def _build_report(self, clause_analyses: List[ClauseAnalysis], revision: Optional[RevisionSummary] = None) -> ContractReport:
+        self._print("📊 Generating final report...")
         
-        total_clauses = len(state.clause_analyses)
-        risky_clauses_count = sum(1 for analysis in state.clause_analyses if analysis.is_risky)
-        suggestions_count = sum(1 for analysis in state.clause_analyses if analysis.suggestion != "None")
+        total_clauses = len(clause_analyses)
+        risky_clauses_count = sum(1 for analysis in clause_analyses if analysis.is_risky)
+        suggestions_count = self._count_suggestions(clause_analyses)
+        pending_suggestions = sum(1 for analysis in clause_analyses if analysis.suggestion_pending)
+        for analysis in clause_analyses:
+            if analysis.summary == self.FALLBACK_SUMMARY:
+                outcome = "failed"
+            elif analysis.borrowed_from is not None:
+                outcome = "reused"
+            elif analysis.change == "unchanged":
+                outcome = "carried_forward"
+            elif analysis.tier == "prescreen":
+                outcome = "prescreened"
+            else:
+                outcome = "analyzed"
+            self._count("contract_clauses_analyzed_total", outcome=outcome)
         
         report = ContractReport(
             total_clauses=total_clauses,
             risky_clauses_count=risky_clauses_count,
             suggestions_count=suggestions_count,
-            clauses=state.clause_analyses
+            clauses=clause_analyses,
+            pending_suggestions=pending_suggestions,
+            revision=revision,
         )
         
-        print(f"✅ Report generated: {total_clauses} clauses, {risky_clauses_count} risky, {suggestions_count} suggestions")
-        return {"report": report}
+        self._print(f"✅ Report generated: {total_clauses} clauses, {risky_clauses_count} risky, {suggestions_count} suggestions")
+        return report
+
+    @staticmethod
+    def _count_suggestions(clause_analyses: Sequence[ClauseAnalysis]) -> int:
+        return sum(1 for analysis in clause_analyses if analysis.suggestion != "None" and not analysis.suggestion_pending)
+
+    def run(
+        self,
+        file_path: str,
+        resume: bool = False,
+        previous: Optional[ContractReport] = None,
+        on_analysis: Optional[Callable[[int, ClauseAnalysis], None]] = None,
+    ) -> ContractReport:
+        """
+        Run the complete contract analysis workflow
+        
+        Args:
+            file_path: Contract file (PDF or text)
+            resume: Continue an interrupted analysis of the same file from its last
+                checkpoint, if there is one (requires checkpoints)
+            previous: Report of an earlier version of the contract; only added and
+                modified clauses are analyzed, unchanged ones keep their analyses
+            on_analysis: Called with the index and analysis of every clause, in clause order,
+                as soon as it and all the clauses before it are analyzed
+        """
+        if self.max_concurrency > 1:
+            return asyncio.run(self.arun(file_path, resume, previous, on_analysis))
+        initial = ContractState(file_path=file_path, previous_report=previous)
+        with self._document(file_path):
+            if self.checkpoints is None:
+                final_state = self.workflow.invoke(initial, self._run_config(on_analysis))
+                return final_state["report"]
+            
+            config = self._checkpoint_config(file_path, on_analysis)
+            saved = self.workflow.get_state(config)
+            final_state = self.workflow.invoke(self._start_or_resume(initial, resume, saved, config), config)
+        self.checkpoints.delete(config["configurable"]["thread_id"])
+        return final_state["report"]
+
+    async def arun(
+        self,
+        file_path: str,
+        resume: bool = False,
+        previous: Optional[ContractReport] = None,
+        on_analysis: Optional[Callable[[int, ClauseAnalysis], None]] = None,
+    ) -> ContractReport:
+        """Run the workflow asynchronously, analyzing clauses concurrently (arguments as in run)"""
+        initial = ContractState(file_path=file_path, previous_report=previous)
+        with self._document(file_path):
+            if self.checkpoints is None:
+                final_state = await self.workflow.ainvoke(initial, self._run_config(on_analysis))
+                return final_state["report"]
+            
+            config = self._checkpoint_config(file_path, on_analysis)
+            async with self.checkpoints.async_saver() as saver:
+                # Same compiled graph, with the async checkpointer of this run
+                workflow = self.workflow.copy(update={"checkpointer": saver})
+                saved = await workflow.aget_state(config)
+                final_state = await workflow.ainvoke(self._start_or_resume(initial, resume, saved, config), config)
+        self.checkpoints.delete(config["configurable"]["thread_id"])
+        return final_state["report"]
+
+    def _checkpoint_config(
+        self,
+        file_path: str,
+        on_analysis: Optional[Callable[[int, ClauseAnalysis], None]] = None,
+    ) -> "RunnableConfig":
+        thread_id = self.checkpoints.thread_id(file_path, self.engine, self.prompt_version, self.model_name)
+        return self._run_config(on_analysis, thread_id=thread_id)
+
+    @staticmethod
+    def _run_config(on_analysis: Optional[Callable[[int, ClauseAnalysis], None]], **configurable: Any) -> "RunnableConfig":
+        """Graph config of a run; the analyze step finds the run's on_analysis callback in it"""
+        if on_analysis is not None:
+            configurable["on_analysis"] = on_analysis
+        return {"configurable": configurable}
+
+    def _start_or_resume(self, initial: ContractState, resume: bool, saved: Any, config: "RunnableConfig") -> Optional[ContractState]:
+        """
+        Pick the graph input for a checkpointed run
+        
+        Returns:
+            None to continue the saved thread, or the fresh initial state
+        """
+        if resume and saved.next:
+            done = self.checkpoints.count_analyses(config["configurable"]["thread_id"])
+            total = len(saved.values.get("clauses", []))
+            self._print(f"⏯️  Resuming {os.path.basename(initial.file_path)} at {saved.next[0]} ({done}/{total} clauses analyzed)")
+            return None
+        self.checkpoints.delete(config["configurable"]["thread_id"])
+        return initial
+
+    def iter_contract_clauses(self, file_path: str) -> Iterator[str]:
+        """Lazily read and split a contract, one page (or chunk of lines) at a time"""
+        if file_path.lower().endswith('.pdf') and self.preserve_layout:
+            chunks = self.pdf_loader.iter_pdf_layout_pages(file_path)
+        elif file_path.lower().endswith('.pdf'):
+            chunks = self.pdf_loader.iter_pdf_pages(file_path)
+        else:
+            chunks = self.pdf_loader.iter_text_file(file_path)
+        clauses = self.clause_splitter.iter_clauses(chunks)
+        if self.sizer is not None:
+            return self.sizer.iter_resize(clauses, self.model_name)
+        return clauses
+
+    async def astream_analyses(self, file_path: str) -> AsyncIterator[ClauseAnalysis]:
+        """
+        Stream clause analyses, in clause order, while the contract is still being read
+
+        Extraction and splitting run in a worker thread and every clause is sent for
+        analysis as soon as its boundaries are known, so the time to the first
+        analysis does not depend on the length of the document.
+        """
+        self._print(f"📄 Streaming contract file (up to {self.max_concurrency} requests at a time)...")
+        
+        results: asyncio.Queue = asyncio.Queue()
+        tasks: List[asyncio.Task] = []
+        producer = asyncio.create_task(self._produce_analyses(file_path, results, tasks))
+        count = 0
+        try:
+            while True:
+                future = await results.get()
+                if future is None:
+                    break
+                count += 1
+                yield await future
+            # Surface extraction errors
+            await producer
+        finally:
+            for task in [producer, *tasks]:
+                task.cancel()
+        
+        self._print(f"✅ Completed analysis of {count} clauses")
+        self._print_cache_stats()
+
+    async def _produce_analyses(self, file_path: str, results: asyncio.Queue, tasks: List[asyncio.Task]) -> None:
+        """Feed streamed clauses to the analyzer, queueing one future per clause in order"""
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        # Bound how far extraction may run ahead of analysis
+        in_flight = asyncio.Semaphore(self.max_concurrency * 2)
+        document_index = self.dedup.empty_like() if self.dedup is not None else None
+        clauses: List[str] = []
+        futures: List[asyncio.Future] = []
+        batch: List[int] = []
+        batch_tokens = 0
+        
+        async def analyze(unit: List[int]) -> None:
+            try:
+                async with semaphore:
+                    self._print_unit_progress(unit, None)
+                    analyses = await self._aanalyze_unit(clauses, unit)
+                for i, analysis in zip(unit, analyses):
+                    if self.dedup is not None:
+                        self._index_near_duplicate(clauses[i], analysis, i, file_path)
+                    futures[i].set_result(analysis)
+            except Exception as e:
+                for i in unit:
+                    if not futures[i].done():
+                        futures[i].set_exception(e)
+            finally:
+                in_flight.release()
+        
+        async def follow(i: int, leader: int) -> None:
+            leader_analysis = await futures[leader]
+            futures[i].set_result(self._follow_leader(clauses[i], leader_analysis, leader, file_path))
+        
+        async def dispatch(unit: List[int]) -> None:
+            await in_flight.acquire()
+            tasks.append(asyncio.create_task(analyze(unit)))
+        
+        # PyMuPDF documents should stay on one thread
+        with ThreadPoolExecutor(max_workers=1) as reader:
+            stream = self.iter_contract_clauses(file_path)
+            try:
+                while True:
+                    clause = await loop.run_in_executor(reader, next, stream, None)
+                    if clause is None:
+                        break
+                    i = len(clauses)
+                    clauses.append(clause)
+                    futures.append(loop.create_future())
+                    await results.put(futures[i])
+                    
+                    screened = self.prescreen.screen(clause) if self.prescreen is not None else None
+                    if screened is not None:
+                        self._count("contract_prescreened_total")
+                        futures[i].set_result(screened)
+                        continue
+                    
+                    if document_index is not None:
+                        borrowed, leader = self._match_near_duplicate(clause, i, document_index, file_path)
+                        if borrowed is not None:
+                            futures[i].set_result(borrowed)
+                            continue
+                        if leader is not None:
+                            tasks.append(asyncio.create_task(follow(i, leader)))
+                            continue
+                    
+                    if self.engine != "batched":
+                        await dispatch([i])
+                        continue
+                    
+                    cached = await self._acache_get(clause)
+                    if cached is not None:
+                        futures[i].set_result(cached)
+                        continue
+                    tokens = estimate_tokens(clause)
+                    if batch and (batch_tokens + tokens > self.batch_token_budget
+                                  or len(batch) >= self.max_batch_clauses):
+                        await dispatch(batch)
+                        batch, batch_tokens = [], 0
+                    batch.append(i)
+                    batch_tokens += tokens
+                
+                if batch:
+                    await dispatch(batch)
+            finally:
+                await loop.run_in_executor(reader, stream.close)
+                await results.put(None)
+
+    async def arun_streaming(
+        self,
+        file_path: str,
+        on_analysis: Optional[Callable[[int, ClauseAnalysis], None]] = None,
+    ) -> ContractReport:
+        """
+        Run the streaming pipeline and collect the analyses into a report
+        
+        Args:
+            file_path: Contract file (PDF or text)
+            on_analysis: Called with the index and analysis of every clause, in clause order,
+                as soon as it is available
+        """
+        clause_analyses = []
+        with self._document(file_path):
+            async for analysis in self.astream_analyses(file_path):
+                if on_analysis is not None:
+                    on_analysis(len(clause_analyses), analysis)
+                clause_analyses.append(analysis)
+        if not clause_analyses:
+            raise ValueError("No clauses found in contract text")
+        return self._build_report(clause_analyses)
+
+    def run_streaming(self, file_path: str) -> ContractReport:
+        """Synchronous wrapper around arun_streaming"""
+        return asyncio.run(self.arun_streaming(file_path))
+
 
-    def run(self, file_path: str) -> ContractReport:
-        """Run the complete contract analysis workflow"""
-        initial_state = ContractState(file_path=file_path)
-        final_state = self.workflow.invoke(initial_state)
-        return final_state["report"]
\ No newline at end of file
+def _option_key(value: Any) -> Any:
+    """Hashable stand-in for a constructor option of ContractAnalysisWorkflow.shared"""
+    try:
+        hash(value)
+    except TypeError:
+        return ("id", id(value))
+    return value
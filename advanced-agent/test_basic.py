@@ -69,12 +69,89 @@ def test_clause_splitter():
         print(f"❌ Clause splitter test failed: {e}")
         return False
 
+def test_streaming_splitter():
+    """Test that streamed splitting matches splitting the whole text"""
+    print("\n🔍 Testing streaming clause splitter...")
+    
+    try:
+        from src.clause_splitter import ClauseSplitter
+        
+        pages = [
+            "1. FIRST CLAUSE. This is the first clause of the contract.\n2. SECOND CLAUSE. This",
+            " clause continues on the next page.\n3. THIRD CLAUSE. This clause contains more terms.",
+        ]
+        
+        splitter = ClauseSplitter()
+        expected = splitter.split_clauses("".join(pages))
+        streamed = list(splitter.iter_clauses(pages, separator=""))
+        
+        # Force the pattern decision after the first page
+        splitter.decision_window = 10
+        streamed_early = list(splitter.iter_clauses(pages, separator=""))
+        
+        print(f"✅ Streamed {len(streamed)} clauses")
+        return len(expected) == 3 and streamed == expected and streamed_early == expected
+        
+    except Exception as e:
+        print(f"❌ Streaming splitter test failed: {e}")
+        return False
+
+def test_clause_spans():
+    """Test that span-based clauses match the materialized ones without copying text"""
+    print("\n🔍 Testing span-based clauses...")
+    
+    try:
+        from src.clause_splitter import ClauseSplitter
+        from src.models import ClauseAnalysis
+        
+        splitter = ClauseSplitter()
+        numbered = open("sample_contract.txt", encoding="utf-8").read()
+        unnumbered = ("The Receiving Party shall keep all information secret. It may not copy the documents. "
+                      "Notwithstanding the foregoing, it may disclose them to advisors. Either party may terminate "
+                      "this Agreement. Notice must be given in writing.")
+        
+        for text in (numbered, unnumbered):
+            spans = splitter.split_clause_spans(text)
+            if spans.text is not text or [str(c) for c in spans] != splitter.split_clauses(text):
+                return False
+            if [len(c) for c in spans] != [len(c) for c in splitter.split_clauses(text)]:
+                return False
+        
+        analysis = ClauseAnalysis(clause=spans[0], summary="s", is_risky=False, risk_reason="None", suggestion="None")
+        dumped = analysis.model_dump()
+        print(f"✅ {len(spans)} sentence-grouped clauses share the contract text")
+        return isinstance(dumped["clause"], str) and dumped["clause"] == str(spans[0])
+        
+    except Exception as e:
+        print(f"❌ Clause span test failed: {e}")
+        return False
+
+def test_layout_extraction():
+    """Test that layout-aware PDF extraction keeps numbered clauses apart"""
+    print("\n🔍 Testing layout-aware PDF extraction...")
+    
+    try:
+        from src.pdf_loader import PDFLoader
+        from src.clause_splitter import ClauseSplitter
+        
+        text = PDFLoader().load_pdf_layout("src/BasicNDA.pdf")
+        clauses = ClauseSplitter().split_clauses(text)
+        numbered = [clause for clause in clauses if clause[:2] in {f"{n}." for n in range(1, 10)}]
+        
+        print(f"✅ Extracted {len(clauses)} clauses, {len(numbered)} numbered")
+        # Running footers ("Page 1 of 2") are dropped
+        return len(numbered) == 9 and "Page 1 of 2" not in text
+        
+    except Exception as e:
+        print(f"❌ Layout extraction test failed: {e}")
+        return False
+
 def test_models():
     """Test Pydantic model creation"""
     print("\n🔍 Testing Pydantic models...")
     
     try:
-        from src.models import ClauseAnalysis, ContractReport, ContractState
+        from src.models import ClauseAnalysis, ClauseAssessment, ContractReport, ContractState
         
         # Test ClauseAnalysis
         clause = ClauseAnalysis(
@@ -103,12 +180,865 @@ def test_models():
         )
         print("✅ ContractReport model created successfully")
         
-        return True
+        # Test ClauseAssessment (structured engine output)
+        assessment = ClauseAssessment(
+            summary="This is a summary",
+            is_risky=False,
+            risk_reason="None",
+            suggestion="Add specific terms"
+        )
+        analysis = ClauseAnalysis(clause="Sample clause text", **assessment.model_dump())
+        print("✅ ClauseAssessment model created successfully")
+        
+        return analysis.suggestion == "Add specific terms"
         
     except Exception as e:
         print(f"❌ Model test failed: {e}")
         return False
 
+def test_cache():
+    """Test the persistent clause analysis cache"""
+    print("\n🔍 Testing clause analysis cache...")
+    
+    try:
+        import tempfile
+        from src.cache import ClauseCache
+        from src.models import ClauseAnalysis
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = ClauseCache(os.path.join(tmp_dir, "cache.sqlite3"))
+            analysis = ClauseAnalysis(
+                clause="1. The Receiving Party shall keep all information confidential.",
+                summary="Keep information secret",
+                is_risky=False,
+                risk_reason="None",
+                suggestion="None"
+            )
+            cache.put(analysis, "v1", "model", "three_call")
+            
+            # Whitespace differences share an entry; other prompt versions do not
+            hit = cache.get("1. The Receiving  Party shall keep\nall information confidential.", "v1", "model", "three_call")
+            miss = cache.get(analysis.clause, "v2", "model", "three_call")
+            removed = cache.invalidate("v2")
+            stats = cache.stats()
+            cache.close()
+        
+        print(f"✅ Cache stats: {stats}")
+        return (hit is not None and hit.summary == "Keep information secret" and miss is None
+                and removed == 1 and stats == {"hits": 1, "misses": 1, "entries": 0})
+        
+    except Exception as e:
+        print(f"❌ Cache test failed: {e}")
+        return False
+
+def test_async_cache_calls():
+    """Test that concurrent analysis makes its blocking cache calls off the event loop"""
+    print("\n🔍 Testing cache calls of concurrent analysis...")
+    
+    try:
+        import asyncio
+        import tempfile
+        from src.cache import ClauseCache
+        from src.fake_llm import FakeChatModel
+        from src.workflow import ContractAnalysisWorkflow
+        
+        class LoopCheckingCache(ClauseCache):
+            """Counts the get/put calls made while an event loop runs in the calling thread"""
+            def __init__(self, path):
+                super().__init__(path)
+                self.calls = self.on_loop = 0
+            
+            def _record(self):
+                self.calls += 1
+                try:
+                    asyncio.get_running_loop()
+                    self.on_loop += 1
+                except RuntimeError:
+                    pass
+            
+            def get(self, *args, **kwargs):
+                self._record()
+                return super().get(*args, **kwargs)
+            
+            def put(self, *args, **kwargs):
+                self._record()
+                return super().put(*args, **kwargs)
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache = LoopCheckingCache(os.path.join(tmp_dir, "cache.sqlite3"))
+            for engine in ("three_call", "batched", "three_call"):
+                workflow = ContractAnalysisWorkflow(
+                    llm=FakeChatModel(latency=0), max_concurrency=4, engine=engine, cache=cache, console=False
+                )
+                workflow.run("sample_contract.txt")
+            stats = cache.stats()
+            cache.close()
+        
+        print(f"✅ {cache.calls} cache calls, {cache.on_loop} on the event loop; {stats['hits']} hits")
+        return cache.calls > 0 and cache.on_loop == 0 and stats["hits"] > 0
+        
+    except Exception as e:
+        print(f"❌ Async cache calls test failed: {e}")
+        return False
+
+def test_near_duplicates():
+    """Test near-duplicate clause detection"""
+    print("\n🔍 Testing near-duplicate index...")
+    
+    try:
+        from src.dedup import NearDuplicateIndex
+        
+        index = NearDuplicateIndex(threshold=0.7)
+        clause = ("This Agreement shall be governed by and construed in accordance with the laws "
+                  "of the State of New York without regard to its conflict of law provisions.")
+        index.add(clause, "analysis", "contract.pdf#7")
+        
+        reworded = clause.replace("shall be governed by", "will be governed by")
+        unrelated = ("The Receiving Party shall return all Confidential Information to the "
+                     "Disclosing Party within ten days of a written request.")
+        match = index.find(reworded)
+        
+        print(f"✅ Reworded clause matched {match[0] if match else None}")
+        return match is not None and match[1] == "analysis" and index.find(unrelated) is None
+        
+    except Exception as e:
+        print(f"❌ Near-duplicate test failed: {e}")
+        return False
+
+def test_checkpoints():
+    """Test checkpoint thread ids and serialization of workflow state"""
+    print("\n🔍 Testing analysis checkpoints...")
+    
+    try:
+        import tempfile
+        from src.checkpoints import AnalysisCheckpoints
+        from src.clause_splitter import ClauseSplitter
+        from src.models import ClauseAnalysis
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            checkpoints = AnalysisCheckpoints(os.path.join(tmp_dir, "checkpoints.sqlite3"))
+            contract = os.path.join(tmp_dir, "contract.txt")
+            with open(contract, "w") as f:
+                f.write("1. First clause of the contract.\n2. Second clause of the contract.")
+            
+            thread = checkpoints.thread_id(contract, "three_call")
+            same_settings = thread == checkpoints.thread_id(contract, "three_call")
+            other_engine = thread != checkpoints.thread_id(contract, "batched")
+            
+            spans = ClauseSplitter().split_clause_spans(open(contract).read())
+            analysis = ClauseAnalysis(clause=spans[0], summary="s", is_risky=False, risk_reason="None", suggestion="None")
+            restored_spans = checkpoints.serde.loads_typed(checkpoints.serde.dumps_typed(spans))
+            restored = checkpoints.serde.loads_typed(checkpoints.serde.dumps_typed([analysis]))
+            checkpoints.close()
+        
+        print(f"✅ Thread {thread[:8]}..., {len(restored_spans)} clause spans restored")
+        return (same_settings and other_engine and restored_spans.to_list() == spans.to_list()
+                and restored[0].clause == str(spans[0]))
+        
+    except Exception as e:
+        print(f"❌ Checkpoint test failed: {e}")
+        return False
+
+def test_checkpoint_resume():
+    """Test that a resumed run re-requests none of the clauses an interrupted run finished"""
+    print("\n🔍 Testing interrupted analysis resume...")
+    
+    try:
+        import shutil
+        import tempfile
+        import threading
+        from src.checkpoints import AnalysisCheckpoints
+        from src.fake_llm import FakeChatModel
+        from src.workflow import ContractAnalysisWorkflow
+        
+        class Interrupted(BaseException):
+            """Stands in for Ctrl-C; not caught by the per-clause fallback"""
+        
+        class InterruptingLLM:
+            """Chat model proxy that records prompts and raises after a number of requests"""
+            def __init__(self, llm, fail_after=None):
+                self.llm = llm
+                self.fail_after = fail_after
+                self.prompts = []
+                self.lock = threading.Lock()
+            
+            def _record(self, messages):
+                with self.lock:
+                    if self.fail_after is not None and len(self.prompts) >= self.fail_after:
+                        raise Interrupted()
+                    self.prompts.append(str(messages[-1].content))
+            
+            def invoke(self, messages, **kwargs):
+                self._record(messages)
+                return self.llm.invoke(messages, **kwargs)
+            
+            async def ainvoke(self, messages, **kwargs):
+                self._record(messages)
+                return await self.llm.ainvoke(messages, **kwargs)
+            
+            def __getattr__(self, name):
+                return getattr(self.llm, name)
+        
+        results = []
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for concurrency in (1, 4):
+                contract = os.path.join(tmp_dir, f"contract_{concurrency}.txt")
+                shutil.copy("sample_contract.txt", contract)
+                checkpoints = AnalysisCheckpoints(os.path.join(tmp_dir, "checkpoints.sqlite3"))
+                
+                interrupted = ContractAnalysisWorkflow(
+                    llm=InterruptingLLM(FakeChatModel(latency=0.01), fail_after=10 if concurrency == 1 else 16),
+                    checkpoints=checkpoints, max_concurrency=concurrency, console=False,
+                )
+                try:
+                    interrupted.run(contract)
+                    return False
+                except Interrupted:
+                    pass
+                thread = checkpoints.thread_id(contract, interrupted.engine, interrupted.prompt_version, "fake-chat")
+                saved = checkpoints.count_analyses(thread)
+                
+                resumed_llm = InterruptingLLM(FakeChatModel(latency=0.01))
+                resumed = ContractAnalysisWorkflow(
+                    llm=resumed_llm, checkpoints=checkpoints, max_concurrency=concurrency, console=False,
+                )
+                report = resumed.run(contract, resume=True)
+                # Clauses none of the resumed requests were about
+                untouched = sum(
+                    1 for analysis in report.clauses
+                    if not any(str(analysis.clause) in prompt for prompt in resumed_llm.prompts)
+                )
+                results.append((saved, len(resumed_llm.prompts), report.total_clauses, untouched,
+                                checkpoints.count_analyses(thread)))
+                checkpoints.close()
+        
+        print(f"✅ (saved, resumed requests, clauses, untouched, rows left) sync {results[0]}, async {results[1]}")
+        return all(
+            0 < saved < total and requests == 3 * (total - saved) and untouched == saved and left == 0
+            for saved, requests, total, untouched, left in results
+        )
+        
+    except Exception as e:
+        print(f"❌ Checkpoint resume test failed: {e}")
+        return False
+
+def test_batch_planning():
+    """Test that batch mode finds documents and skips completed ones"""
+    print("\n🔍 Testing batch planning...")
+    
+    try:
+        import tempfile
+        from src.batch import BatchAnalyzer
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for name in ("a.txt", "b.pdf", "notes.md"):
+                open(os.path.join(tmp_dir, name), "w").close()
+            analyzer = BatchAnalyzer(output_dir=tmp_dir)
+            open(analyzer.output_path(os.path.join(tmp_dir, "a.txt")), "w").close()
+            
+            pending, skipped = analyzer.plan(tmp_dir)
+            manifest = os.path.join(tmp_dir, "manifest.txt")
+            with open(manifest, "w") as f:
+                f.write("# nightly run\nb.pdf\n")
+            from_manifest = analyzer.find_documents(manifest)
+        
+        print(f"✅ {len(pending)} pending, {len(skipped)} skipped")
+        return ([os.path.basename(p) for p in pending] == ["b.pdf"]
+                and [os.path.basename(p) for p in skipped] == ["a.txt"]
+                and [os.path.basename(p) for p in from_manifest] == ["b.pdf"])
+        
+    except Exception as e:
+        print(f"❌ Batch planning test failed: {e}")
+        return False
+
+def test_shared_limit():
+    """Test that cancelling a call waiting for a shared slot does not leak the slot"""
+    print("\n🔍 Testing shared LLM slot release on cancellation...")
+    
+    try:
+        import asyncio
+        import threading
+        from src.batch import SharedLimitLLM
+        from src.fake_llm import FakeChatModel
+        
+        semaphore = threading.BoundedSemaphore(1)
+        llm = SharedLimitLLM(FakeChatModel(latency=0), semaphore)
+        
+        async def cancel_waiting_call() -> bool:
+            semaphore.acquire()  # another process holds the only slot
+            waiting = asyncio.ensure_future(llm.ainvoke("Summarize this clause."))
+            await asyncio.sleep(0.05)
+            waiting.cancel()
+            try:
+                await waiting
+            except asyncio.CancelledError:
+                pass
+            semaphore.release()  # the waiter now takes the slot, and must hand it back
+            await asyncio.sleep(0.05)
+            return waiting.cancelled()
+        
+        cancelled = asyncio.run(cancel_waiting_call())
+        slot_free = semaphore.acquire(timeout=1)
+        if slot_free:
+            semaphore.release()
+            response = asyncio.run(llm.ainvoke("Summarize this clause."))
+        
+        print(f"✅ Cancelled waiter: {cancelled}, slot free afterwards: {slot_free}")
+        return cancelled and slot_free and bool(response.content)
+        
+    except Exception as e:
+        print(f"❌ Shared slot test failed: {e!r}")
+        return False
+
+def test_scheduler():
+    """Test that the request scheduler retries through simulated rate limits"""
+    print("\n🔍 Testing request scheduler...")
+    
+    try:
+        import asyncio
+        from langchain_core.messages import HumanMessage
+        from src.fake_llm import FakeChatModel, FakeAPIError
+        from src.scheduler import RequestScheduler
+        
+        fake = FakeChatModel(latency=0.01, max_concurrent_requests=2, error_rate=0.1, seed=7)
+        scheduler = RequestScheduler(initial_concurrency=8, base_delay=0.02, max_retries=10, seed=7)
+        llm = scheduler.wrap(fake)
+        
+        async def run_all():
+            return await asyncio.gather(*(llm.ainvoke([HumanMessage(content=f"Clause {i}")]) for i in range(20)))
+        
+        responses = asyncio.run(run_all())
+        stats = scheduler.stats()
+        
+        class Rejecting:
+            def invoke(self, messages):
+                raise FakeAPIError("Invalid request", 400)
+        
+        try:
+            scheduler.wrap(Rejecting()).invoke("x")
+            client_error_raised = False
+        except FakeAPIError:
+            client_error_raised = True
+        
+        print(f"✅ {len(responses)} responses, {stats['retries']} retries, concurrency {stats['concurrency']}")
+        return (len(responses) == 20 and stats["throttled"] > 0 and stats["concurrency"] < 8
+                and client_error_raised)
+        
+    except Exception as e:
+        print(f"❌ Scheduler test failed: {e}")
+        return False
+
+def test_metrics():
+    """Test stage and LLM request metrics of a workflow run against the fake model"""
+    print("\n🔍 Testing workflow metrics...")
+    
+    try:
+        import json
+        import tempfile
+        from src.fake_llm import FakeChatModel
+        from src.metrics import WorkflowMetrics
+        from src.workflow import ContractAnalysisWorkflow
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            jsonl_path = os.path.join(tmp_dir, "metrics.jsonl")
+            metrics = WorkflowMetrics(jsonl_path=jsonl_path, prices={"fake-chat": (1.0, 2.0)})
+            workflow = ContractAnalysisWorkflow(llm=FakeChatModel(latency=0), metrics=metrics, console=False)
+            report = workflow.run("sample_contract.txt")
+            with open(jsonl_path) as f:
+                spans = [json.loads(line) for line in f]
+        
+        totals = metrics.summary()
+        prometheus = metrics.prometheus_text()
+        stages = [span["name"] for span in spans if span["kind"] == "stage"]
+        print(f"✅ {len(spans)} spans, {totals['contract_llm_tokens_total']:.0f} tokens, "
+              f"${totals['contract_llm_cost_usd_total']:.4f}")
+        return (stages == ["load_contract", "split_clauses", "analyze_clauses", "generate_report"]
+                and totals["contract_llm_requests_total"] == 3 * report.total_clauses
+                and totals["contract_llm_cost_usd_total"] > 0
+                and 'contract_llm_requests_total{model="fake-chat",status="ok"}' in prometheus
+                and all(span["document"] == "sample_contract.txt" for span in spans))
+        
+    except Exception as e:
+        print(f"❌ Metrics test failed: {e}")
+        return False
+
+def test_service():
+    """Test submitting, streaming and fetching a job from the HTTP service"""
+    print("\n🔍 Testing analysis service...")
+    
+    try:
+        import json
+        try:
+            from fastapi.testclient import TestClient
+        except ImportError:
+            print("⚠️  FastAPI not installed, skipping (pip install -e '.[service]')")
+            return True
+        from src.fake_llm import FakeChatModel
+        from src.service import AnalysisService, create_app
+        from src.workflow import ContractAnalysisWorkflow
+        
+        workflow = ContractAnalysisWorkflow(llm=FakeChatModel(latency=0), max_concurrency=2, console=False)
+        service = AnalysisService(workflow)
+        try:
+            with TestClient(create_app(service)) as client:
+                with open("sample_contract.txt", "rb") as f:
+                    job = client.post("/jobs", files={"file": ("sample_contract.txt", f)}).json()
+                rejected = client.post("/jobs", files={"file": ("contract.docx", b"...")})
+                with client.stream("GET", f"/jobs/{job['job_id']}/stream") as response:
+                    events = [json.loads(line) for line in response.iter_lines() if line]
+                status = client.get(f"/jobs/{job['job_id']}").json()
+                report = client.get(f"/jobs/{job['job_id']}/report").json()
+        finally:
+            service.close()
+        
+        print(f"✅ Job {status['status']}, {len(events) - 1} clauses streamed")
+        return (rejected.status_code == 400
+                and events[-1]["event"] == "done"
+                and [event["index"] for event in events[:-1]] == list(range(report["total_clauses"]))
+                and [event["analysis"] for event in events[:-1]] == report["clauses"]
+                and status["clauses_analyzed"] == report["total_clauses"])
+        
+    except Exception as e:
+        print(f"❌ Service test failed: {e}")
+        return False
+
+def test_prescreen():
+    """Test that benign boilerplate is answered locally and substantive clauses reach the LLM"""
+    print("\n🔍 Testing clause pre-screening...")
+    
+    try:
+        import tempfile
+        from src.fake_llm import FakeChatModel
+        from src.prescreen import ClausePrescreener
+        from src.workflow import ContractAnalysisWorkflow
+        
+        prescreener = ClausePrescreener()
+        benign = [
+            "© 2024 Acme Inc. All rights reserved.",
+            "IN WITNESS WHEREOF the parties have signed below. Signature: ________ Name: ________ Date: ______",
+            "This Agreement constitutes the entire agreement between the parties and supersedes all prior agreements.",
+        ]
+        substantive = [
+            "The Client shall pay a fee of $5,000 per month within 30 days of invoice.",
+            "Signature: ________ The Employee agrees to indemnify the Company against all claims.",
+            # Boilerplate signals next to real terms
+            "Employee shall work 80 hours per week without overtime. Name: ______ Date: ______",
+            "Each party shall bear its own costs. This Agreement constitutes the entire agreement "
+            "between the parties and supersedes all prior agreements.",
+        ]
+        # Contracts set disclaimers and waivers in capitals; they are not headings
+        capitalized = [
+            "ALL SALES ARE FINAL AND NON-REFUNDABLE",
+            "THE SERVICES ARE PROVIDED AS IS WITHOUT WARRANTY",
+            "CUSTOMER RELEASES VENDOR FROM ALL CLAIMS",
+            "NO REFUNDS",
+        ]
+        types = [prescreener.screen(text).clause_type for text in benign + ["NON-DISCLOSURE AGREEMENT"]]
+        all_llm = all(prescreener.screen(text) is None for text in substantive + capitalized)
+        # Two signals give exactly the default threshold
+        boundary = prescreener.classify("Copyright 2024 Acme Inc")
+        at_threshold = boundary.confidence == 0.9 and prescreener.screen("Copyright 2024 Acme Inc") is not None
+        
+        # The NDA's preamble defines the parties and "Agreement" after its copyright footer
+        nda = ContractAnalysisWorkflow(llm=FakeChatModel(latency=0), prescreen=prescreener, console=False).run("src/BasicNDA.pdf")
+        preamble = nda.clauses[0]
+        preamble_to_llm = str(preamble.clause).startswith("Copyright") and preamble.tier == "llm"
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            contract = os.path.join(tmp_dir, "contract.txt")
+            with open(contract, "w") as f:
+                f.write("1. Fees. The Client shall pay a fee of $5,000 per month.\n"
+                        "2. Entire Agreement. This Agreement constitutes the entire agreement between the parties "
+                        "and supersedes all prior agreements, whether written or oral.\n"
+                        "3. Signatures. Signature: ____________ Name: ____________ Date: ________\n")
+            llm = FakeChatModel(latency=0)
+            workflow = ContractAnalysisWorkflow(llm=llm, prescreen=prescreener, console=False)
+            report = workflow.run(contract)
+        tiers = [analysis.tier for analysis in report.clauses]
+        
+        print(f"✅ Types {types}; {tiers.count('prescreen')}/{len(tiers)} clauses pre-screened, "
+              f"{llm.stats['requests']} LLM requests")
+        return (types == ["copyright_notice", "signature_block", "entire_agreement", "heading"] and all_llm
+                and at_threshold
+                and preamble_to_llm
+                and "prescreen" in tiers
+                and llm.stats["requests"] == 3 * tiers.count("llm"))
+        
+    except Exception as e:
+        print(f"❌ Pre-screen test failed: {e}")
+        return False
+
+def test_deferred_suggestions():
+    """Test that deferred suggestions are skipped during analysis and memoized once requested"""
+    print("\n🔍 Testing deferred suggestions...")
+    
+    try:
+        from src.fake_llm import FakeChatModel
+        from src.models import ContractReport
+        from src.workflow import ContractAnalysisWorkflow
+        
+        llm = FakeChatModel(latency=0, risky_rate=0.5, seed=3)
+        workflow = ContractAnalysisWorkflow(llm=llm, defer_suggestions=True, console=False)
+        report = workflow.run("sample_contract.txt")
+        analysis_requests = llm.stats["requests"]
+        pending = report.pending_suggestions
+        risky = sum(1 for analysis in report.clauses if analysis.is_risky)
+        
+        workflow.resolve_suggestions(report)
+        workflow.resolve_suggestions(report)  # memoized: no new requests
+        resolved_requests = llm.stats["requests"] - analysis_requests
+        restored = ContractReport.model_validate_json(report.model_dump_json())
+        
+        print(f"✅ {analysis_requests} requests for {report.total_clauses} clauses, "
+              f"{resolved_requests} suggestions generated for {risky} risky clauses")
+        return (analysis_requests == 2 * report.total_clauses
+                and pending == report.total_clauses
+                and resolved_requests == risky
+                and restored.pending_suggestions == report.total_clauses - risky
+                and all(not analysis.suggestion_pending for analysis in restored.clauses if analysis.is_risky))
+        
+    except Exception as e:
+        print(f"❌ Deferred suggestions test failed: {e}")
+        return False
+
+def test_cache_provenance():
+    """Test that analyses borrowed from a near-duplicate are not cached as the clause's own"""
+    print("\n🔍 Testing cached analysis provenance...")
+    
+    try:
+        import tempfile
+        from src.cache import ClauseCache
+        from src.dedup import NearDuplicateIndex
+        from src.fake_llm import FakeChatModel
+        from src.workflow import ContractAnalysisWorkflow
+        
+        # Sentence-grouped into three clauses of four sentences; the second rewords the first
+        governing_law = ("This Agreement shall be governed by the laws of the State of New York. "
+                         "Its conflict of law provisions do not apply. The courts of New York County "
+                         "have exclusive jurisdiction. Each party waives any objection to that venue.")
+        text = (f"{governing_law} {governing_law.replace('shall be', 'will be')} "
+                "The Receiving Party shall return all Confidential Information within ten days. "
+                "Copies must be destroyed. An officer shall certify the destruction in writing. "
+                "These duties survive termination.")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "c.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+            cache = ClauseCache(os.path.join(tmp_dir, "cache.sqlite3"))
+            deferred = ContractAnalysisWorkflow(
+                llm=FakeChatModel(latency=0), cache=cache, dedup=NearDuplicateIndex(threshold=0.7),
+                defer_suggestions=True, console=False,
+            )
+            report = deferred.run(path)
+            deferred.resolve_suggestions(report, range(report.total_clauses))
+            
+            llm = FakeChatModel(latency=0)
+            plain = ContractAnalysisWorkflow(llm=llm, cache=cache, console=False).run(path)
+            cache.close()
+        
+        borrowed = [analysis.borrowed_from for analysis in report.clauses]
+        print(f"✅ Deferred run borrowed {borrowed}; plain run made {llm.stats['requests']} requests")
+        return (borrowed[1] is not None
+                and all(analysis.borrowed_from is None and analysis.change is None for analysis in plain.clauses)
+                and llm.stats["requests"] == 3)
+        
+    except Exception as e:
+        print(f"❌ Cached analysis provenance test failed: {e}")
+        return False
+
+def test_incremental():
+    """Test that a revised contract only sends its changed clauses to the LLM"""
+    print("\n🔍 Testing incremental re-analysis...")
+    
+    try:
+        import tempfile
+        from src.fake_llm import FakeChatModel
+        from src.workflow import ContractAnalysisWorkflow
+        
+        llm = FakeChatModel(latency=0)
+        workflow = ContractAnalysisWorkflow(llm=llm, console=False)
+        previous = workflow.run("sample_contract.txt")
+        previous_requests = llm.stats["requests"]
+        
+        with open("sample_contract.txt", "r", encoding="utf-8") as f:
+            revised = f.read().replace("$80,000", "$90,000")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            revised_path = os.path.join(tmp_dir, "sample_contract_v2.txt")
+            with open(revised_path, "w", encoding="utf-8") as f:
+                f.write(revised)
+            report = workflow.run(revised_path, previous=previous)
+        revised_requests = llm.stats["requests"] - previous_requests
+        revision = report.revision
+        
+        print(f"✅ {revised_requests} requests for the revision (previous version: {previous_requests}), "
+              f"{revision.unchanged} unchanged, {revision.modified} modified, "
+              f"{revision.added} added, {revision.removed} removed")
+        return (revision.modified == 1 and revision.added == 0 and revision.removed == 0
+                and revision.unchanged == report.total_clauses - 1
+                and revised_requests * report.total_clauses == previous_requests
+                and [analysis.change for analysis in report.clauses].count("modified") == 1)
+        
+    except Exception as e:
+        print(f"❌ Incremental re-analysis test failed: {e}")
+        return False
+
+def test_report_formats():
+    """Test the streamed NDJSON and compact msgpack report formats"""
+    print("\n🔍 Testing report formats...")
+    
+    try:
+        import asyncio
+        import tempfile
+        from src.fake_llm import FakeChatModel
+        from src.report_formats import (NDJSONReportWriter, read_clause_table, read_corpus, read_report,
+                                        write_corpus, write_report)
+        from src.workflow import ContractAnalysisWorkflow
+        
+        workflow = ContractAnalysisWorkflow(llm=FakeChatModel(latency=0), console=False)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # Streamed: each clause is on disk before the next one is analyzed
+            ndjson_path = os.path.join(tmp_dir, "contract_analysis_sample.ndjson")
+            with NDJSONReportWriter(ndjson_path) as writer:
+                report = asyncio.run(workflow.arun_streaming("sample_contract.txt", on_analysis=writer.write_clause))
+                complete_before_finish = os.path.exists(ndjson_path)
+                writer.finish(report)
+            expected = report.model_dump(mode="json")
+            round_trips = [read_report(ndjson_path).model_dump(mode="json") == expected]
+            for extension in (".json", ".msgpack"):
+                path = os.path.join(tmp_dir, f"contract_analysis_sample{extension}")
+                write_report(report, path)
+                round_trips.append(read_report(path).model_dump(mode="json") == expected)
+            
+            corpus_path = os.path.join(tmp_dir, "corpus.msgpack")
+            write_corpus({"a.txt": report, "b.txt": report}, corpus_path)
+            corpus = read_corpus(corpus_path)
+            table = read_clause_table(corpus_path)
+            single_size = os.path.getsize(os.path.join(tmp_dir, "contract_analysis_sample.msgpack"))
+            corpus_size = os.path.getsize(corpus_path)
+        
+        print(f"✅ Round trips {round_trips}, corpus of 2 identical reports: {corpus_size} bytes "
+              f"(one report: {single_size} bytes), {len(table['clause'])} table rows")
+        return (all(round_trips) and not complete_before_finish
+                and list(corpus) == ["a.txt", "b.txt"]
+                and corpus["b.txt"].model_dump(mode="json") == expected
+                and table["document"].count("b.txt") == report.total_clauses
+                and corpus_size < 1.2 * single_size)
+        
+    except Exception as e:
+        print(f"❌ Report formats test failed: {e}")
+        return False
+
+def test_clause_index():
+    """Test full-text search, filters and incremental updates of the clause index"""
+    print("\n🔍 Testing clause index...")
+    
+    try:
+        import tempfile
+        from src.clause_index import ClauseIndex
+        from src.fake_llm import FakeChatModel
+        from src.report_formats import write_report
+        from src.workflow import ContractAnalysisWorkflow
+        
+        workflow = ContractAnalysisWorkflow(llm=FakeChatModel(latency=0, risky_rate=0.5, seed=1), console=False)
+        report = workflow.run("sample_contract.txt")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            index = ClauseIndex(os.path.join(tmp_dir, "clause_index.sqlite3"))
+            write_report(report, os.path.join(tmp_dir, "contract_analysis_a.json"))
+            write_report(report, os.path.join(tmp_dir, "contract_analysis_b.ndjson"))
+            first_update = index.update(tmp_dir)
+            second_update = index.update(tmp_dir)  # nothing changed
+            
+            salary = index.search("salaries")  # stemmed: matches "salary"
+            risky = index.search(risky=True, document="b")
+            termination = index.search("termination notice", document="a")
+            os.remove(os.path.join(tmp_dir, "contract_analysis_a.json"))
+            index.update(tmp_dir)
+            stats = index.stats()
+            index.close()
+        
+        expected_risky = sum(1 for analysis in report.clauses if analysis.is_risky)
+        print(f"✅ Indexed {first_update} reports (then {second_update}), {len(salary)} hits for 'salaries', "
+              f"{len(risky)} risky clauses in b, {stats['documents']} report left after deleting a")
+        return (first_update == 2 and second_update == 0
+                and len(salary) == 2 and all("[salary]" in hit.snippet for hit in salary)
+                and len(risky) == expected_risky and all(hit.analysis.is_risky for hit in risky)
+                and [hit.position for hit in risky] == sorted(hit.position for hit in risky)
+                and termination and all(hit.document == "a" for hit in termination)
+                and stats["documents"] == 1 and stats["clauses"] == report.total_clauses)
+        
+    except Exception as e:
+        print(f"❌ Clause index test failed: {e}")
+        return False
+
+def test_text_loading():
+    """Test that memory-mapped chunked text loading matches cleaning the whole file at once"""
+    print("\n🔍 Testing chunked text loading...")
+    
+    try:
+        import tempfile
+        from src.pdf_loader import PDFLoader
+        
+        loader = PDFLoader()
+        text = "1. Übersicht  der\r\nParteien\u00a0und\u3000Pflichten.\n\n\t2. " + "x" * 300 + " Zahlung 😀 \x0b\n"
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "contract.txt")
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write(text * 50)
+            empty_path = os.path.join(tmp_dir, "empty.txt")
+            open(empty_path, "w").close()
+            
+            expected = " ".join((text * 50).split())
+            loaded = loader.load_text_file(path)
+            chunked = {size: list(loader.iter_text_file(path, chunk_bytes=size)) for size in (1, 16, 100)}
+            empty = loader.load_text_file(empty_path)
+        
+        print(f"✅ {len(loaded)} characters loaded, {len(chunked[16])} chunks of about 16 bytes")
+        return (loaded == expected and empty == ""
+                and all(" ".join(chunks) == expected for chunks in chunked.values())
+                and len(chunked[16]) > 50)
+        
+    except Exception as e:
+        print(f"❌ Chunked text loading test failed: {e}")
+        return False
+
+def test_clause_sizing():
+    """Test that oversized clauses are split and fragments merged to the model's token budget"""
+    print("\n🔍 Testing clause sizing...")
+    
+    try:
+        import tempfile
+        from src.clause_splitter import ClauseSplitter
+        from src.fake_llm import FakeChatModel
+        from src.sizing import ClauseBudget, ClauseSizer
+        from src.tokens import estimate_tokens
+        from src.workflow import ContractAnalysisWorkflow
+        
+        sizer = ClauseSizer({"fake-chat": ClauseBudget(max_tokens=60, min_tokens=8)})
+        long_clause = " ".join(f"The Supplier shall deliver item {i} on time." for i in range(40))
+        text = (f"\n1. Definitions\n2. {long_clause}\n3. Payment is due within thirty days of invoice."
+                f"\n4. Notices\n5. Either party may terminate this Agreement on notice.\n6. {'x' * 500}\n")
+        spans = ClauseSplitter().split_clause_spans(text)
+        resized = sizer.resize(spans, "fake-chat")
+        clauses = [str(clause) for clause in resized]
+        streamed = list(sizer.iter_resize([str(clause) for clause in spans], "fake-chat"))
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "fragments.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("".join(f"\n{i}. Item {i} applies.\n" for i in range(1, 21)))
+            llm = FakeChatModel(latency=0)
+            report = ContractAnalysisWorkflow(llm=llm, sizer=sizer, console=False).run(path)
+        
+        print(f"✅ {len(spans)} split clauses sized to {len(resized)}; "
+              f"20 fragments analyzed as {report.total_clauses} clauses with {llm.stats['requests']} requests")
+        return (all(estimate_tokens(clause) <= 60 for clause in clauses)
+                and clauses[0].startswith("1. Definitions 2. The Supplier")
+                and any(clause.startswith("3. Payment") and clause.endswith("4. Notices") for clause in clauses)
+                and "".join("".join(clauses).split()) == "".join(text.split())
+                and streamed == clauses
+                and report.total_clauses < 20 and llm.stats["requests"] == 3 * report.total_clauses
+                and sizer.budget("gpt-4o-mini-2024-07-18") == sizer.default)
+        
+    except Exception as e:
+        print(f"❌ Clause sizing test failed: {e}")
+        return False
+
+def test_clause_call_graph():
+    """Test that the summary call overlaps the risk and suggestion calls of the same clause"""
+    print("\n🔍 Testing concurrent summary and risk calls...")
+    
+    try:
+        import asyncio
+        import threading
+        from src.fake_llm import FakeChatModel
+        from src.workflow import ContractAnalysisWorkflow
+        
+        class TrackingLLM:
+            """Chat model proxy recording the largest number of requests in flight"""
+            def __init__(self, llm):
+                self.llm = llm
+                self.in_flight = 0
+                self.peak = 0
+                self.lock = threading.Lock()
+            
+            def _enter(self):
+                with self.lock:
+                    self.in_flight += 1
+                    self.peak = max(self.peak, self.in_flight)
+            
+            def _exit(self):
+                with self.lock:
+                    self.in_flight -= 1
+            
+            def invoke(self, messages, **kwargs):
+                self._enter()
+                try:
+                    return self.llm.invoke(messages, **kwargs)
+                finally:
+                    self._exit()
+            
+            async def ainvoke(self, messages, **kwargs):
+                self._enter()
+                try:
+                    return await self.llm.ainvoke(messages, **kwargs)
+                finally:
+                    self._exit()
+            
+            def __getattr__(self, name):
+                return getattr(self.llm, name)
+        
+        sync_llm = TrackingLLM(FakeChatModel(latency=0.02))
+        report = ContractAnalysisWorkflow(llm=sync_llm, console=False).run("sample_contract.txt")
+        async_llm = TrackingLLM(FakeChatModel(latency=0.02))
+        async_report = asyncio.run(ContractAnalysisWorkflow(llm=async_llm, console=False).arun("sample_contract.txt"))
+        deferred_llm = TrackingLLM(FakeChatModel(latency=0.02))
+        deferred = ContractAnalysisWorkflow(llm=deferred_llm, defer_suggestions=True, console=False).run("sample_contract.txt")
+        
+        print(f"✅ Peak requests in flight with one clause at a time: {sync_llm.peak} (sync), "
+              f"{async_llm.peak} (async), {deferred_llm.peak} (deferred suggestions)")
+        return (sync_llm.peak == async_llm.peak == deferred_llm.peak == 2
+                and sync_llm.llm.stats["requests"] == 3 * report.total_clauses
+                and async_llm.llm.stats["requests"] == 3 * async_report.total_clauses
+                and deferred.pending_suggestions == deferred.total_clauses
+                and all(analysis.summary and analysis.suggestion for analysis in report.clauses))
+        
+    except Exception as e:
+        print(f"❌ Concurrent summary and risk test failed: {e}")
+        return False
+
+def test_startup():
+    """Test that text-only splitting stays fast and never loads the PDF or LLM stack"""
+    print("\n🔍 Testing startup imports...")
+    
+    try:
+        import json
+        import subprocess
+        
+        # A fresh interpreter, so modules imported by the other tests do not count
+        script = """
+import json, sys, time
+start = time.perf_counter()
+from src.workflow import ContractAnalysisWorkflow
+import_seconds = time.perf_counter() - start
+workflow = ContractAnalysisWorkflow.shared(console=False)
+clauses = list(workflow.iter_contract_clauses("sample_contract.txt"))
+heavy = [name for name in ("fitz", "langgraph", "langchain_openai", "langchain_core", "openai") if name in sys.modules]
+print(json.dumps({"seconds": import_seconds, "clauses": len(clauses), "heavy": heavy,
+                  "shared": workflow is ContractAnalysisWorkflow.shared(console=False)}))
+"""
+        env = {**os.environ, "OPENAI_API_KEY": ""}
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True, env=env)
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        
+        print(f"✅ src.workflow imported in {result['seconds']:.3f}s, {result['clauses']} clauses split, "
+              f"heavy modules loaded: {result['heavy'] or 'none'}")
+        # The LangChain/LangGraph/OpenAI imports alone take well over a second
+        return result["clauses"] > 0 and not result["heavy"] and result["shared"] and result["seconds"] < 1.0
+        
+    except Exception as e:
+        print(f"❌ Startup test failed: {e}")
+        return False
+
 def main():
     """Run all tests"""
     print("🧪 Contract Analyzer - Basic Functionality Test")
@@ -117,7 +1047,30 @@ def main():
     tests = [
         test_imports,
         test_clause_splitter,
-        test_models
+        test_streaming_splitter,
+        test_clause_spans,
+        test_layout_extraction,
+        test_models,
+        test_cache,
+        test_async_cache_calls,
+        test_near_duplicates,
+        test_checkpoints,
+        test_checkpoint_resume,
+        test_batch_planning,
+        test_shared_limit,
+        test_scheduler,
+        test_metrics,
+        test_service,
+        test_prescreen,
+        test_deferred_suggestions,
+        test_cache_provenance,
+        test_incremental,
+        test_report_formats,
+        test_clause_index,
+        test_text_loading,
+        test_clause_sizing,
+        test_clause_call_graph,
+        test_startup
     ]
     
     passed = 0